@@ -0,0 +1,99 @@
+"""고객 월별 소비 데이터 → /recommend 또래 소비 통계 집계 파일 생성
+
+    python -m app.build_peer_stats --input spending.csv --output app/models/peer_spending_stats.json
+
+입력 행은 age, sex(1=남, 2=여), income(원) 과 SpendingData 카테고리 금액(원) 컬럼을 가집니다.
+나이대(5세 단위) × 성별 × 소득 구간 버킷과, 성별/소득 구간을 합친 상위 버킷별로
+카테고리 평균과 백분위를 계산합니다. 표본이 --min-count 미만인 버킷은 기록하지 않으며,
+서버는 이 경우 상위 버킷으로 대체합니다.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+logger = logging.getLogger("app.build_peer_stats")
+
+DEFAULT_INCOME_BANDS = "0,2000000,3000000,4000000,5000000,7000000"
+DEFAULT_PERCENTILES = "10,25,50,75,90"
+
+
+def parse_ints(text: str):
+    return sorted(int(v) for v in text.split(",") if v.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="JSONL 또는 CSV")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--input-format", choices=["jsonl", "csv"])
+    parser.add_argument("--version", default="", help="집계 기준 (예: 2025Q2)")
+    parser.add_argument("--income-bands", default=DEFAULT_INCOME_BANDS, help="소득 구간 하한(원) 목록")
+    parser.add_argument("--percentiles", default=DEFAULT_PERCENTILES)
+    parser.add_argument("--min-count", type=int, default=30, help="버킷 최소 표본 수")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    from app.bulk_score import detect_format, read_records
+    from app.schemas.recommend_schema import SpendingData
+    from app.services.peer_stats import PeerStatsIndex, age_band
+
+    categories = [name for name in SpendingData.model_fields if name != "income"]
+    income_bands = parse_ints(args.income_bands)
+    levels = parse_ints(args.percentiles)
+    banding = PeerStatsIndex("", categories, levels, income_bands, {})
+
+    rows = defaultdict(list)
+    skipped = 0
+    for record in read_records(args.input, detect_format(args.input, args.input_format)):
+        try:
+            band = age_band(int(float(record["age"])))
+            sex = int(float(record["sex"]))
+            income = banding.income_band(float(record["income"]))
+            amounts = [float(record.get(cat) or 0) for cat in categories]
+        except (KeyError, TypeError, ValueError):
+            skipped += 1
+            continue
+        # 세부 버킷과 성별/소득 구간을 합친 상위 버킷에 모두 반영
+        for key in ((band, sex, income), (band, None, income), (band, sex, None), (band, None, None)):
+            rows[key].append(amounts)
+
+    buckets = []
+    for (band, sex, income), values in sorted(rows.items(), key=lambda item: str(item[0])):
+        if len(values) < args.min_count:
+            continue
+        matrix = np.asarray(values, dtype=np.float64)
+        buckets.append({
+            "age_band": band,
+            "sex": sex,
+            "income_band": income,
+            "count": len(values),
+            "mean": np.round(matrix.mean(axis=0), 1).tolist(),
+            "percentiles": np.round(np.percentile(matrix, levels, axis=0), 1).tolist(),
+        })
+
+    output = {
+        "version": args.version,
+        "categories": categories,
+        "percentiles": levels,
+        "income_bands": income_bands,
+        "buckets": buckets,
+    }
+    tmp_path = f"{args.output}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False)
+    os.replace(tmp_path, args.output)
+    logger.info(
+        f"[Peer Stats] 버킷 {len(buckets)}개 / 후보 {len(rows)}개 (최소 표본 {args.min_count}), "
+        f"건너뛴 행 {skipped}건 → {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
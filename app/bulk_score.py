@@ -0,0 +1,338 @@
+"""JSONL/CSV 포트폴리오 일괄 연체 위험 스코어링
+
+    python -m app.bulk_score --input portfolio.jsonl --output scores.jsonl
+    python -m app.bulk_score --input portfolio.csv --output scores.csv --workers 8 --chunk-size 20000
+    python -m app.bulk_score --input portfolio.jsonl --output scores.jsonl --resume
+
+HTTP API 를 거치지 않고 /predict 와 같은 입력 검증(PredictRequest)·전처리·모델로 채점합니다.
+입력은 고정 크기 청크로 읽어 여러 프로세스에서 병렬로 처리하고, 결과는 입력 순서대로 기록하므로
+파일 전체를 메모리에 올리지 않습니다.
+
+- 모델은 부모 프로세스에서 한 번 로드한 뒤 워커를 fork 해 공유합니다.
+- 청크를 기록할 때마다 <output>.progress 에 진행 상황을 저장하며, --resume 으로 중단된 지점부터
+  이어서 처리합니다. (마지막으로 완료된 청크 이후의 출력은 잘라냄)
+  입력 파일의 크기/수정 시각이 진행 파일에 기록된 값과 다르면 이어서 처리하지 않습니다.
+- JSON 파싱이나 검증에 실패한 행은 error 컬럼에 사유(파싱 실패는 입력 줄 번호 포함)를 기록하고
+  나머지 행은 계속 처리합니다.
+- customer_id 가 있고 증감 피처가 빠진 행은 고객 이력 저장소(python -m app.load_customer_history 로 적재)와
+  같은 고객의 앞 분기 행으로 계산합니다. 이런 행이 있으면 입력은 customer_id 순으로 정렬되어 있어야 하며
+  (숫자 또는 문자열 순서), 한 고객의 행은 항상 같은 청크에 들어가므로 결과가 청크 크기에 따라 달라지지 않습니다.
+  정렬되어 있지 않으면 중단합니다. 일괄 스코어링 결과는 이력에 기록하지 않습니다.
+"""
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+OUTPUT_FIELDS = ["row", "id", "delinquency_probability", "delinquency_label", "model_version", "error"]
+# 파싱할 수 없는 입력 줄 대신 넘기는 레코드의 키 (값은 오류 사유)
+PARSE_ERROR_FIELD = "__parse_error__"
+
+logger = logging.getLogger("app.bulk_score")
+
+# fork 된 워커가 공유하는 모델 번들 (부모에서 로드)
+_bundle = None
+
+
+def detect_format(path: str, explicit: Optional[str] = None) -> str:
+    if explicit:
+        return explicit
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def read_records(path: str, fmt: str) -> Iterator[Dict]:
+    """입력 파일을 한 행씩 읽음 (CSV 의 빈 칸은 기본값이 적용되도록 제외)
+
+    JSONL 의 잘못된 줄은 중단하지 않고 {PARSE_ERROR_FIELD: 사유} 레코드로 넘깁니다.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            for record in csv.DictReader(f):
+                yield {k: v for k, v in record.items() if v not in ("", None)}
+        else:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield {PARSE_ERROR_FIELD: f"line {line_no}: JSON 파싱 실패 ({e})"}
+                    continue
+                if not isinstance(record, dict):
+                    yield {PARSE_ERROR_FIELD: f"line {line_no}: JSON 객체가 아닙니다."}
+                    continue
+                yield record
+
+
+def history_customer(record: Dict) -> Optional[str]:
+    """서버 이력으로 값을 계산해야 하는 행의 customer_id (customer_id 가 없거나 호출자가 모두 보냈으면 None)"""
+    from app.services.customer_history import CHANGE_FEATURES
+
+    customer_id = record.get("customer_id")
+    if customer_id is None or all(record.get(name) is not None for name in CHANGE_FEATURES + ("quarter_order",)):
+        return None
+    return str(customer_id)
+
+
+def read_chunks(records: Iterator[Dict], chunk_size: int, start_row: int = 0) -> Iterator[tuple]:
+    """(시작 행 번호, 레코드 목록) 청크 생성 — start_row 이전 행은 읽고 건너뜀
+
+    이력 계산이 필요한 고객의 행이 한 청크에 모이도록 청크는 고객이 바뀌는 지점에서만 자르고,
+    그런 행이 customer_id 순(숫자 또는 문자열)으로 정렬되어 있지 않으면 SystemExit 로 중단합니다.
+    """
+    records = iter(records)
+    for _ in islice(records, start_row):
+        pass
+    row = start_row
+    chunk = []
+    last_customer = None
+    # 청크 경계 직전 고객 — 다음 청크에 같은 고객이 다시 나오면 그 고객의 분기가 나뉜 것
+    boundary_customer = None
+    text_sorted = numeric_sorted = True
+    for record in records:
+        customer = history_customer(record)
+        if customer is not None:
+            if customer == boundary_customer:
+                raise SystemExit(
+                    f"row {row + len(chunk)}: customer_id={customer} 의 행이 연속되어 있지 않습니다. "
+                    "입력을 customer_id 순으로 정렬해 주세요."
+                )
+            if last_customer is not None and customer != last_customer:
+                text_sorted = text_sorted and customer > last_customer
+                numeric_sorted = (numeric_sorted and customer.isdigit() and last_customer.isdigit()
+                                  and int(customer) > int(last_customer))
+                if not (text_sorted or numeric_sorted):
+                    raise SystemExit(
+                        f"row {row + len(chunk)}: customer_id={customer} 가 {last_customer} 뒤에 있습니다. "
+                        "이력으로 증감 피처를 계산하려면 입력을 customer_id 순으로 정렬해 주세요."
+                    )
+                boundary_customer = None
+        if len(chunk) >= chunk_size and (customer is None or customer != last_customer):
+            yield row, chunk
+            row += len(chunk)
+            chunk = []
+            boundary_customer = last_customer
+        chunk.append(record)
+        if customer is not None:
+            last_customer = customer
+    if chunk:
+        yield row, chunk
+
+
+def _init_worker(parent_pid: int):
+    """부모 프로세스가 강제 종료되면 워커도 스스로 종료 (고아 프로세스 방지)"""
+    def watch():
+        while os.getppid() == parent_pid:
+            time.sleep(1)
+        os._exit(1)
+
+    threading.Thread(target=watch, name="parent-watch", daemon=True).start()
+
+
+def score_chunk(start_row: int, records: List[Dict], id_field: Optional[str]) -> List[Dict]:
+    """청크 하나를 검증 → 전처리 → 한 번의 predict 로 채점 (워커 프로세스에서 실행)"""
+    from pydantic import ValidationError
+    from app.schemas.predict_schema import PredictRequest
+    from app.services.model_service import preprocess_batch
+    from app.services.customer_history import fill_history_features
+
+    bundle = _bundle
+    rows = []
+    valid_indices = []
+    valid_features = []
+    for i, record in enumerate(records):
+        row = {"row": start_row + i, "id": record.get(id_field) if id_field else None,
+               "delinquency_probability": None, "delinquency_label": None,
+               "model_version": bundle.version, "error": None}
+        if PARSE_ERROR_FIELD in record:
+            row["error"] = record[PARSE_ERROR_FIELD]
+            rows.append(row)
+            continue
+        try:
+            valid_features.append(PredictRequest.model_validate(record).model_dump())
+            valid_indices.append(i)
+        except ValidationError as e:
+            row["error"] = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+        rows.append(row)
+
+    if valid_features:
+        # 빠진 증감 피처는 저장된 고객 이력과 청크 안의 앞 분기로 계산 (일괄 스코어링은 이력에 기록하지 않음)
+        fill_history_features(valid_features, record=False)
+        probs = bundle.predict_matrix(preprocess_batch(valid_features, bundle))
+        for i, prob in zip(valid_indices, probs):
+            rows[i]["delinquency_probability"] = round(float(prob), 6)
+            rows[i]["delinquency_label"] = int(prob > bundle.threshold)
+    return rows
+
+
+class OutputWriter:
+    """결과를 입력 순서대로 기록하고 청크마다 진행 상황을 저장"""
+
+    def __init__(self, path: str, fmt: str, progress: Dict, resume: bool):
+        self.path = path
+        self.fmt = fmt
+        self.progress_path = f"{path}.progress"
+        self.progress = progress
+        if resume:
+            # 마지막으로 기록이 끝난 청크 이후의 (부분) 출력 제거
+            self._file = open(path, "r+", encoding="utf-8", newline="")
+            self._file.truncate(progress["output_bytes"])
+            self._file.seek(progress["output_bytes"])
+        else:
+            self._file = open(path, "w", encoding="utf-8", newline="")
+            if fmt == "csv":
+                csv.writer(self._file).writerow(OUTPUT_FIELDS)
+        self._csv = csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS) if fmt == "csv" else None
+
+    def write(self, rows: List[Dict]):
+        if self._csv is not None:
+            self._csv.writerows(rows)
+        else:
+            self._file.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self.progress["rows_done"] += len(rows)
+        self.progress["errors"] += sum(row["error"] is not None for row in rows)
+        self.progress["output_bytes"] = self._file.tell()
+        tmp_path = f"{self.progress_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.progress, f)
+        os.replace(tmp_path, self.progress_path)
+
+    def close(self):
+        self._file.close()
+
+
+def load_progress(args, bundle) -> Dict:
+    """--resume 이면 진행 파일을 읽고 입력(경로·크기·수정 시각)/청크 크기/모델이 같은지 확인"""
+    stat = os.stat(args.input)
+    progress = {
+        "input": os.path.abspath(args.input),
+        "input_size": stat.st_size,
+        "input_mtime_ns": stat.st_mtime_ns,
+        "chunk_size": args.chunk_size,
+        "model_version": bundle.version,
+        "threshold": bundle.threshold,
+        "rows_done": 0,
+        "errors": 0,
+        "output_bytes": 0,
+        "completed": False,
+    }
+    if not args.resume:
+        return progress
+
+    progress_path = f"{args.output}.progress"
+    if not os.path.exists(progress_path) or not os.path.exists(args.output):
+        logger.warning("[Bulk Score] 이어서 처리할 진행 파일이 없어 처음부터 시작합니다.")
+        args.resume = False
+        return progress
+
+    with open(progress_path, "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    # 같은 경로라도 입력 파일이 바뀌었으면 행 번호가 어긋나므로 이어서 처리하지 않음
+    for key in ("input", "input_size", "input_mtime_ns", "chunk_size", "model_version", "threshold"):
+        if saved.get(key) != progress[key]:
+            raise SystemExit(
+                f"진행 파일의 {key}({saved.get(key)})가 현재 값({progress[key]})과 달라 이어서 처리할 수 없습니다."
+            )
+    return saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="PredictRequest 형식 레코드의 JSONL 또는 CSV")
+    parser.add_argument("--output", required=True, help="결과 파일 (.csv 면 CSV, 아니면 JSONL)")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"])
+    parser.add_argument("--output-format", choices=["jsonl", "csv"])
+    parser.add_argument("--id-field", help="결과에 함께 기록할 입력 식별자 컬럼 (예: customer_id)")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--resume", action="store_true", help="<output>.progress 기준으로 이어서 처리")
+    parser.add_argument("--model-version", help="생략 시 서버 기본 모델 (XGB_MODEL_* 설정)")
+    parser.add_argument("--model-path")
+    parser.add_argument("--encode-map-path")
+    parser.add_argument("--threshold", type=float)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    from app.config import XGB_ENCODE_MAP_PATH, XGB_MODEL_PATH, XGB_MODEL_VERSION, XGB_THRESHOLD
+    from app.services.model_registry import load_bundle
+
+    global _bundle
+    _bundle = load_bundle(
+        args.model_version or XGB_MODEL_VERSION,
+        args.model_path or XGB_MODEL_PATH,
+        args.encode_map_path or XGB_ENCODE_MAP_PATH,
+        XGB_THRESHOLD if args.threshold is None else args.threshold,
+    )
+    progress = load_progress(args, _bundle)
+    if progress.get("completed"):
+        logger.info(f"[Bulk Score] 이미 완료된 작업입니다. ({progress['rows_done']}건)")
+        return 0
+
+    in_fmt = detect_format(args.input, args.input_format)
+    out_fmt = detect_format(args.output, args.output_format)
+    chunks = read_chunks(read_records(args.input, in_fmt), args.chunk_size, progress["rows_done"])
+    writer = OutputWriter(args.output, out_fmt, progress, args.resume)
+    logger.info(
+        f"[Bulk Score] 시작: 모델={_bundle.version}, 워커={args.workers}, 청크={args.chunk_size}, "
+        f"시작 행={progress['rows_done']}"
+    )
+
+    start = time.perf_counter()
+    last_log = start
+    scored = 0
+
+    def emit(rows: List[Dict]):
+        nonlocal scored, last_log
+        writer.write(rows)
+        scored += len(rows)
+        now = time.perf_counter()
+        if now - last_log >= 10:
+            last_log = now
+            logger.info(f"[Bulk Score] 진행: 누적 {progress['rows_done']}건 ({scored / (now - start):,.0f}건/s)")
+
+    try:
+        if args.workers <= 1:
+            for start_row, records in chunks:
+                emit(score_chunk(start_row, records, args.id_field))
+        else:
+            # fork 로 부모가 로드한 모델을 공유 (진행 중인 청크 수를 제한해 메모리 사용량 고정)
+            context = multiprocessing.get_context("fork")
+            max_pending = args.workers * 2
+            with ProcessPoolExecutor(max_workers=args.workers, mp_context=context,
+                                     initializer=_init_worker, initargs=(os.getpid(),)) as pool:
+                pending = []
+                for start_row, records in chunks:
+                    pending.append(pool.submit(score_chunk, start_row, records, args.id_field))
+                    if len(pending) >= max_pending:
+                        emit(pending.pop(0).result())
+                for future in pending:
+                    emit(future.result())
+
+        progress["completed"] = True
+        writer.write([])
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"[Bulk Score] 완료: 이번 실행 {scored}건 ({scored / elapsed if elapsed else 0:,.0f}건/s), "
+        f"누적 {progress['rows_done']}건, 검증 오류 {progress['errors']}건 → {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import os
+
+# 서버 설정값 (환경 변수로 덮어쓰기 가능)
+
+# 예측 결과 캐시 (0이면 비활성화)
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "10000"))
+PREDICT_CACHE_TTL_SECONDS = float(os.getenv("PREDICT_CACHE_TTL_SECONDS", "600"))
+
+# LLM 마이크로 배칭 (대기 구간 동안 모인 프롬프트를 한 번에 생성)
+LLM_BATCH_ENABLED = os.getenv("LLM_BATCH_ENABLED", "true").lower() == "true"
+LLM_BATCH_MAX_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", "8"))
+LLM_BATCH_WAIT_MS = float(os.getenv("LLM_BATCH_WAIT_MS", "20"))
+
+# LLM 응답 캐시 (do_sample=False 생성만 대상, 경로가 비어 있으면 디스크 저장 안 함)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "2048"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "app/models/llm_response_cache.sqlite3")
+# 프롬프트 렌더링 전 수치 반올림 단위 (0이면 반올림 안 함)
+LLM_CACHE_AMOUNT_STEP = float(os.getenv("LLM_CACHE_AMOUNT_STEP", "0"))            # 금액(원)
+LLM_CACHE_PERCENT_STEP = float(os.getenv("LLM_CACHE_PERCENT_STEP", "0"))          # 금리/상환진척률(%)
+LLM_CACHE_PROBABILITY_STEP = float(os.getenv("LLM_CACHE_PROBABILITY_STEP", "0"))  # 연체 확률(0~1)
+
+# 서버 시작 시 백그라운드 모델 로드 / 워밍업
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "true").lower() == "true"
+LLM_PRELOAD = os.getenv("LLM_PRELOAD", "true").lower() == "true"
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+# LLM_PRELOAD=false 일 때 첫 인사이트 요청 시점에 백그라운드 로드 시작 (로드 완료 전까지는 503 + Retry-After)
+LLM_LOAD_ON_DEMAND = os.getenv("LLM_LOAD_ON_DEMAND", "true").lower() == "true"
+# /health/ready 판단 시 LLM 로드 완료까지 기다릴지 여부 (기본: XGBoost만 준비되면 ready)
+READY_REQUIRES_LLM = os.getenv("READY_REQUIRES_LLM", "false").lower() == "true"
+
+# 실행 레인 (LLM 생성과 XGBoost 스코어링을 분리된 스레드 풀에서 실행)
+LLM_LANE_WORKERS = int(os.getenv("LLM_LANE_WORKERS", "8"))
+LLM_LANE_QUEUE_DEPTH = int(os.getenv("LLM_LANE_QUEUE_DEPTH", "32"))
+LLM_LANE_DEADLINE_SECONDS = float(os.getenv("LLM_LANE_DEADLINE_SECONDS", "60"))
+SCORING_LANE_WORKERS = int(os.getenv("SCORING_LANE_WORKERS", "8"))
+SCORING_LANE_QUEUE_DEPTH = int(os.getenv("SCORING_LANE_QUEUE_DEPTH", "256"))
+SCORING_LANE_DEADLINE_SECONDS = float(os.getenv("SCORING_LANE_DEADLINE_SECONDS", "10"))
+LANE_RETRY_AFTER_SECONDS = int(os.getenv("LANE_RETRY_AFTER_SECONDS", "5"))
+
+# 고정 system 프롬프트 접두부 KV 캐시 재사용 (단건 생성에만 적용)
+LLM_PREFIX_CACHE_ENABLED = os.getenv("LLM_PREFIX_CACHE_ENABLED", "true").lower() == "true"
+LLM_PREFIX_CACHE_ENTRIES = int(os.getenv("LLM_PREFIX_CACHE_ENTRIES", "4"))
+
+# 코멘트는 첫 줄만 사용하므로 줄바꿈 또는 N 문장 완성 시 생성 중단 (0이면 문장 수 제한 없음)
+LLM_MAX_SENTENCES = int(os.getenv("LLM_MAX_SENTENCES", "2"))
+# 요청당 코멘트 생성 지연 예산(초) — 초과 시 계산된 지표로 만든 정형 문구 반환 (0이면 무제한)
+LLM_LATENCY_BUDGET_SECONDS = float(os.getenv("LLM_LATENCY_BUDGET_SECONDS", "10"))
+
+# LLM 추론 모드 (auto | fp32 | bf16 | int8) — CPU 노드에서는 int8/bf16 권장
+LLM_MODEL_PATH = os.getenv("LLM_MODEL_PATH", "./app/models/phi3-mini-4k-instruct")
+LLM_INFERENCE_MODE = os.getenv("LLM_INFERENCE_MODE", "auto").lower()
+
+# XGBoost 모델 레지스트리 (시작 시 활성화할 기본 모델 / 후보 모델 섀도 스코어링)
+MODEL_DIR = os.getenv("MODEL_DIR", "app/models")
+XGB_MODEL_VERSION = os.getenv("XGB_MODEL_VERSION", "xgb_delinquency_model_v2")
+XGB_MODEL_PATH = os.getenv("XGB_MODEL_PATH", "app/models/xgb_delinquency_model_v2.pkl")
+XGB_ENCODE_MAP_PATH = os.getenv("XGB_ENCODE_MAP_PATH", "app/models/category_encoding_map_v2.json")
+XGB_THRESHOLD = float(os.getenv("XGB_THRESHOLD", "0.88"))
+SHADOW_MAX_PENDING = int(os.getenv("SHADOW_MAX_PENDING", "64"))   # 밀린 섀도 작업이 이보다 많으면 건너뜀
+# 모델 관리 API 토큰 (X-Admin-Token 헤더로 전달, 설정하지 않으면 모델 변경 API 는 모두 거부)
+MODEL_ADMIN_TOKEN = os.getenv("MODEL_ADMIN_TOKEN", "")
+
+# XGBoost 스코어링 엔진 (inplace: DMatrix 없이 float32 배열 직접 예측 | dmatrix: 기존 방식)
+XGB_SCORING_BACKEND = os.getenv("XGB_SCORING_BACKEND", "inplace").lower()
+# 요청당 예측 스레드 수 (레인 워커 스레드와 과다 경합하지 않도록 기본 1)
+XGB_NTHREAD = int(os.getenv("XGB_NTHREAD", "1"))
+
+# 예측 설명 모드(explain=true) 에서 반환할 상위 기여 피처 수
+EXPLAIN_TOP_K = int(os.getenv("EXPLAIN_TOP_K", "5"))
+
+# /recommend 또래 소비 통계 (나이대 × 성별 × 소득 구간 집계, python -m app.build_peer_stats 로 생성)
+PEER_STATS_PATH = os.getenv("PEER_STATS_PATH", "app/models/peer_spending_stats.json")
+
+# 인사이트 생성 작업 대기열 (POST /insight/jobs) 과 미리 생성한 코멘트 저장소
+INSIGHT_JOB_DB_PATH = os.getenv("INSIGHT_JOB_DB_PATH", "app/models/insight_jobs.sqlite3")
+INSIGHT_JOB_WORKERS = int(os.getenv("INSIGHT_JOB_WORKERS", "1"))   # 0이면 이 프로세스에서는 작업을 처리하지 않음
+INSIGHT_JOB_IDLE_ONLY = os.getenv("INSIGHT_JOB_IDLE_ONLY", "true").lower() == "true"   # 실시간 LLM 요청이 없을 때만 처리
+INSIGHT_JOB_MAX_ITEMS = int(os.getenv("INSIGHT_JOB_MAX_ITEMS", "10000"))   # 요청당 최대 작업 수
+# 미리 생성한 코멘트를 실시간 경로에서 재사용하는 기간(초, 기본 36시간 — 전날 밤 생성분까지)
+INSIGHT_COMMENT_TTL_SECONDS = float(os.getenv("INSIGHT_COMMENT_TTL_SECONDS", "129600"))
+
+# 고객별 분기 이력 저장소 (customer_id 가 있는 요청의 증감 피처/quarter_order 를 서버에서 계산)
+CUSTOMER_HISTORY_PATH = os.getenv("CUSTOMER_HISTORY_PATH", "app/models/customer_history.sqlite3")
+# /predict 계열에서 채점한 분기를 이력에 기록 (기본 꺼짐 — 켜면 값을 계산한 행만 백그라운드 스레드가 기록,
+# 시뮬레이션/일괄 스코어링은 항상 조회만 함)
+CUSTOMER_HISTORY_RECORD = os.getenv("CUSTOMER_HISTORY_RECORD", "false").lower() == "true"
+CUSTOMER_HISTORY_MAX_PENDING = int(os.getenv("CUSTOMER_HISTORY_MAX_PENDING", "256"))   # 밀린 기록 작업이 이보다 많으면 버림
+
+# 멀티 프로세스 서빙 (python -m app.serve) — 마스터가 모델을 한 번 로드한 뒤 워커를 fork 해 메모리 페이지 공유
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", "1"))
+# 워커당 torch 연산 스레드 수 (0이면 CPU 수 / 워커 수)
+SERVE_TORCH_THREADS = int(os.getenv("SERVE_TORCH_THREADS", "0"))
+
+# 요청별 프로파일링 (기본 꺼짐 — 꺼져 있으면 미들웨어를 등록하지 않으므로 요청 경로 오버헤드 없음)
+# X-Profile: 1 헤더(MODEL_ADMIN_TOKEN 이 설정되어 있고 X-Admin-Token 이 일치할 때만) 또는 샘플링 비율로 대상 요청을 고름
+# 프로파일 조회 API(/debug/profiles)도 같은 토큰이 설정되어 있어야 사용할 수 있음
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))       # 헤더 없이 프로파일링할 요청 비율 (0~1)
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "5"))       # 스택 샘플링 간격
+PROFILING_MIN_DURATION_MS = float(os.getenv("PROFILING_MIN_DURATION_MS", "0"))   # 샘플링 대상은 이보다 느린 요청만 저장
+PROFILING_MAX_ACTIVE = int(os.getenv("PROFILING_MAX_ACTIVE", "4"))           # 동시에 프로파일링하는 요청 수 상한
+PROFILING_DIR = os.getenv("PROFILING_DIR", "app/profiles")
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", "200"))           # 보관할 최근 프로파일 수
@@ -0,0 +1,68 @@
+"""고객 분기 이력 일괄 적재 (증감 피처 서버 계산용 초기 이력)
+
+    python -m app.load_customer_history --input history.csv
+    python -m app.load_customer_history --input history.jsonl --db app/models/customer_history.sqlite3
+
+입력 행은 customer_id, BAS_YH(YYYYQn) 와 salary, balance, principal_amount, remaining_principal
+(모델 입력과 같은 천원 단위) 컬럼을 가지며, quarter_order 가 있으면 그대로 저장합니다.
+quarter_order 가 없는 행은 직전 분기 순번 + 1 (첫 분기는 1) 로 채우고, 이미 저장된 뒤 분기보다 앞 분기를
+적재하면 그 고객의 뒤 분기 순번을 다시 이어 붙입니다. 같은 고객·분기는 마지막 행으로 덮어씁니다.
+"""
+import argparse
+import logging
+import sys
+import time
+
+logger = logging.getLogger("app.load_customer_history")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="JSONL 또는 CSV")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"])
+    parser.add_argument("--db", help="생략 시 CUSTOMER_HISTORY_PATH")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    from app.bulk_score import detect_format, read_records
+    from app.config import CUSTOMER_HISTORY_PATH
+    from app.services.customer_history import CustomerHistoryStore, HISTORY_FIELDS, quarter_index
+
+    store = CustomerHistoryStore(args.db or CUSTOMER_HISTORY_PATH)
+    start = time.perf_counter()
+    loaded = 0
+    skipped = 0
+    numbered = 0
+    chunk = []
+    for record in read_records(args.input, detect_format(args.input, args.input_format)):
+        try:
+            quarter_order = record.get("quarter_order")
+            chunk.append({
+                "customer_id": str(record["customer_id"]),
+                "quarter": quarter_index(str(record["BAS_YH"])),
+                "bas_yh": str(record["BAS_YH"]),
+                "quarter_order": int(float(quarter_order)) if quarter_order not in (None, "") else None,
+                **{field: float(record[field]) for field in HISTORY_FIELDS},
+            })
+        except (KeyError, TypeError, ValueError):
+            skipped += 1
+            continue
+        numbered += chunk[-1]["quarter_order"] is None
+        if len(chunk) >= args.chunk_size:
+            store.append(chunk)
+            loaded += len(chunk)
+            chunk = []
+    store.append(chunk)
+    loaded += len(chunk)
+
+    logger.info(
+        f"[Customer History] {loaded}건 적재 (quarter_order 계산 {numbered}건, 잘못된 행 {skipped}건 제외, "
+        f"{time.perf_counter() - start:.1f}s) → {store.path}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,15 @@
 import logging
-from fastapi import FastAPI
-from app.routes import predict, recommend, simulation, insight_loan
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.routes import predict, recommend, simulation, insight_loan, health, models, metrics, fast, insight_jobs, profiling
+from app.services.startup import start_background_loading
+from app.services.insight_jobs import insight_workers
+from app.services.execution_lanes import LaneError
+from app.services.metrics import HTTP_REQUEST_SECONDS
+from app.services.profiling import current_profile, attach_thread, choose_trigger, start_profile, finish_profile
+from app.config import PROFILING_ENABLED, MODEL_ADMIN_TOKEN
 
 logging.basicConfig(
     level=logging.INFO,
@@ -9,13 +18,89 @@ logging.basicConfig(
 logger = logging.getLogger("app")
 logger.info("AI API Server 로딩 중")
 
-app = FastAPI(title="AI Risk API", version="1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 모델은 백그라운드에서 로드하고 라우트는 즉시 응답 가능하도록 함
+    start_background_loading()
+    # 인사이트 작업 워커는 LLM 준비 후부터 처리 (pre-fork 서빙에서는 워커 프로세스마다 시작)
+    insight_workers.start()
+    yield
+
+app = FastAPI(title="AI Risk API", version="1.0", lifespan=lifespan)
+
+# 실행 레인 포화/마감 초과 시 429/503 + Retry-After 로 부하 차단
+@app.exception_handler(LaneError)
+async def lane_error_handler(request: Request, exc: LaneError):
+    logger.warning(f"[Load Shedding] {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+# 요청 전체 처리 시간 (라벨은 엔드포인트 이름 기준이라 경로 파라미터가 있어도 카디널리티가 고정됨)
+@app.middleware("http")
+async def observe_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        if route is not None:
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, request.method, route.name, status)
+
+async def _finish_after_body(body_iterator, profile, status, route):
+    # 스트리밍 응답은 본문 전송(생성/정제)이 끝난 뒤에 프로파일을 닫음
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        finish_profile(profile, status, route)
+
+# 요청별 프로파일링 (PROFILING_ENABLED 일 때만 등록 — 꺼져 있으면 요청 경로에 아무것도 추가되지 않음)
+# 이벤트 루프 스레드 샘플에는 같은 시간에 루프에서 처리된 다른 요청의 비동기 코드도 섞일 수 있음
+if PROFILING_ENABLED:
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        # X-Profile 헤더는 관리자 토큰이 설정되어 있고 일치할 때만 인정 (그 외에는 무작위 샘플링만)
+        header_allowed = bool(MODEL_ADMIN_TOKEN) and request.headers.get("x-admin-token") == MODEL_ADMIN_TOKEN
+        trigger = choose_trigger(request.headers.get("x-profile"), header_allowed)
+        profile = start_profile(request.method, request.url.path, trigger) if trigger else None
+        if profile is None:
+            return await call_next(request)
+
+        token = current_profile.set(profile)
+        try:
+            with attach_thread(profile, "event-loop"):
+                response = await call_next(request)
+        except BaseException:
+            finish_profile(profile, None, None)
+            raise
+        finally:
+            current_profile.reset(token)
+
+        route = request.scope.get("route")
+        response.headers["X-Profile-Id"] = profile.profile_id
+        response.body_iterator = _finish_after_body(
+            response.body_iterator, profile, response.status_code, route.name if route is not None else None
+        )
+        return response
+    logger.info("[Profiling] 요청별 프로파일링 사용 (X-Profile: 1 헤더 또는 샘플링)")
 
 # 라우터 등록
 app.include_router(predict.router, prefix="/api/ai", tags=["Risk Prediction"])
 app.include_router(recommend.router, prefix="/api/ai", tags=["Spending Recommendation"])
 app.include_router(simulation.router, prefix="/api/ai", tags=["Simulation Risk"])
+app.include_router(fast.router, prefix="/api/ai", tags=["Fast Scoring"])
 app.include_router(insight_loan.router, prefix="/api/ai", tags=["Loan Insight"])
+app.include_router(insight_jobs.router, prefix="/api/ai", tags=["Insight Jobs"])
+app.include_router(models.router, prefix="/api/ai", tags=["Model Registry"])
+app.include_router(health.router, tags=["Health"])
+app.include_router(metrics.router, tags=["Metrics"])
+app.include_router(profiling.router, tags=["Profiling"])
 
 @app.get("/")
 def root():
@@ -0,0 +1,124 @@
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query
+from app.schemas.fast_schema import (
+    FastPredictRequest,
+    FastPredictBatchRequest,
+    FastPackedPredictRequest,
+    FastPackedSchemaResponse,
+    FastSimulationRequest,
+    FastSimulationSweepRequest,
+)
+from app.schemas.predict_schema import PredictResponse, PredictBatchResponse
+from app.schemas.simulation_schema import SimulationResponse, SimulationSweepResponse
+from app.routes.predict import validate_items
+from app.routes.simulation import run_simulation, run_simulation_sweep
+from app.services.model_loader import get_bundle
+from app.services.model_service import predict_risk, predict_risk_batch, predict_packed
+from app.services.execution_lanes import scoring_lane
+from app.services.customer_history import fill_history_features
+from app.utils.fast_json import FastJSONResponse
+from app.config import EXPLAIN_TOP_K
+import logging
+
+# /predict, /simulation 의 fast 입력 모드
+# - 금액/비율 필드를 Decimal 대신 float 로 바로 검증 (Decimal 계약이 필요하면 기존 경로 사용)
+# - 응답은 응답 모델 검증 없이 orjson 으로 바로 인코딩 (형식은 기존 경로와 같고, 값이 없는 선택 필드는 생략)
+router = APIRouter(prefix="/fast", default_response_class=FastJSONResponse)
+logger = logging.getLogger(__name__)
+
+@router.post("/predict", responses={200: {"model": PredictResponse}})
+async def fast_predict(
+    request: FastPredictRequest,
+    explain: bool = Query(False, description="피처별 기여도 포함 여부"),
+    top_k: int = Query(EXPLAIN_TOP_K, ge=1, le=50, description="반환할 상위 기여 피처 수"),
+):
+    return FastJSONResponse(await scoring_lane.run(run_fast_predict, request, explain, top_k))
+
+def run_fast_predict(request: FastPredictRequest, explain: bool = False, top_k: int = EXPLAIN_TOP_K) -> dict:
+    try:
+        features = request.model_dump()
+        fill_history_features([features])
+        return predict_risk(features, explain=explain, top_k=top_k)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction Error: {str(e)}")
+
+@router.post("/predict/batch", responses={200: {"model": PredictBatchResponse}})
+async def fast_predict_batch(
+    request: FastPredictBatchRequest,
+    explain: bool = Query(False, description="피처별 기여도 포함 여부 (전체 배치를 한 번에 계산)"),
+    top_k: int = Query(EXPLAIN_TOP_K, ge=1, le=50, description="반환할 상위 기여 피처 수"),
+):
+    return FastJSONResponse(await scoring_lane.run(run_fast_predict_batch, request, explain, top_k))
+
+def run_fast_predict_batch(request: FastPredictBatchRequest, explain: bool = False,
+                           top_k: int = EXPLAIN_TOP_K) -> dict:
+    valid_indices, valid_features, errors = validate_items(request.items, FastPredictRequest)
+    try:
+        fill_history_features(valid_features)
+        predictions = predict_risk_batch(valid_features, explain=explain, top_k=top_k)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch Prediction Error: {str(e)}")
+
+    results = [{"index": i, "result": None, "error": errors.get(i)} for i in range(len(request.items))]
+    for i, prediction in zip(valid_indices, predictions):
+        results[i]["result"] = prediction
+    return {
+        "results": results,
+        "success_count": len(valid_indices),
+        "error_count": len(errors),
+    }
+
+# 모델 피처 순서대로 인코딩된 행을 전처리 없이 바로 예측 (행 형식은 /fast/predict/packed/schema)
+@router.post("/predict/packed", responses={200: {"model": PredictBatchResponse}})
+async def fast_predict_packed(
+    request: FastPackedPredictRequest,
+    explain: bool = Query(False, description="피처별 기여도 포함 여부"),
+    top_k: int = Query(EXPLAIN_TOP_K, ge=1, le=50, description="반환할 상위 기여 피처 수"),
+):
+    return FastJSONResponse(await scoring_lane.run(run_fast_predict_packed, request, explain, top_k))
+
+def run_fast_predict_packed(request: FastPackedPredictRequest, explain: bool = False,
+                            top_k: int = EXPLAIN_TOP_K) -> dict:
+    bundle = get_bundle()
+    if request.model_version is not None and request.model_version != bundle.version:
+        raise HTTPException(
+            status_code=409,
+            detail=f"행 형식 기준 모델({request.model_version})이 현재 모델({bundle.version})과 다릅니다.",
+        )
+    num_features = bundle.feature_plan.num_features
+    bad_rows = [i for i, row in enumerate(request.rows) if len(row) != num_features]
+    if bad_rows:
+        raise HTTPException(status_code=422, detail=f"행 길이는 {num_features} 이어야 합니다. (잘못된 행: {bad_rows[:10]})")
+
+    try:
+        matrix = np.asarray(request.rows, dtype=np.float32).reshape(len(request.rows), num_features)
+        predictions = predict_packed(matrix, bundle, explain=explain, top_k=top_k)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Packed Prediction Error: {str(e)}")
+
+    return {
+        "results": [{"index": i, "result": prediction, "error": None} for i, prediction in enumerate(predictions)],
+        "success_count": len(predictions),
+        "error_count": 0,
+    }
+
+@router.get("/predict/packed/schema", response_model=FastPackedSchemaResponse,
+            response_class=FastJSONResponse)
+def fast_packed_schema():
+    bundle = get_bundle()
+    plan = bundle.feature_plan
+    return FastPackedSchemaResponse(
+        model_version=bundle.version,
+        features=plan.feature_names,
+        encoders={name: {str(k): v for k, v in lookup.items()} for name, lookup in plan.encoders.items()},
+    )
+
+@router.post("/simulation", responses={200: {"model": SimulationResponse}})
+async def fast_simulate_risk(request: FastSimulationRequest):
+    response = await scoring_lane.run(run_simulation, request)
+    return FastJSONResponse(response.model_dump())
+
+@router.post("/simulation/sweep", responses={200: {"model": SimulationSweepResponse}})
+async def fast_simulate_sweep(request: FastSimulationSweepRequest):
+    response = await scoring_lane.run(run_simulation_sweep, request)
+    return FastJSONResponse(response.model_dump())
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.config import READY_REQUIRES_LLM
+from app.services.model_state import xgb_state, llm_state
+
+router = APIRouter()
+
+# 프로세스 생존 여부 (모델 로드 상태와 무관)
+@router.get("/health/live")
+def live():
+    return {"status": "alive"}
+
+# 트래픽 수신 가능 여부 (모델별 로드 상태 포함)
+@router.get("/health/ready")
+def ready():
+    is_ready = xgb_state.ready and (llm_state.ready or not READY_REQUIRES_LLM)
+    body = {
+        "status": "ready" if is_ready else "not_ready",
+        "models": {
+            "xgboost": xgb_state.as_dict(),
+            "llm": llm_state.as_dict(),
+        },
+    }
+    return JSONResponse(status_code=200 if is_ready else 503, content=body)
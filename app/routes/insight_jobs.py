@@ -0,0 +1,67 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import ValidationError
+from app.schemas.insight_job_schema import (
+    InsightJobRequest,
+    InsightJobItemResult,
+    InsightJobSubmitResponse,
+    InsightJobStatusResponse,
+    InsightJobStatsResponse,
+)
+from app.schemas.recommend_schema import RecommendRequest
+from app.routes.insight_loan import LoanInsightRequest
+from app.routes.recommend import spending_inputs
+from app.routes.predict import format_validation_error
+from app.services.insight_jobs import insight_store, insight_workers
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# 종류별 요청 검증 → 작업에 저장할 정규화된 입력 (실시간 경로의 저장소 조회 키와 같은 형태)
+NORMALIZERS = {
+    "loan": lambda item: LoanInsightRequest.model_validate(item).model_dump(),
+    "spending": lambda item: spending_inputs(RecommendRequest.model_validate(item)),
+}
+
+# 여러 고객의 코멘트 생성을 대기열에 등록 (LLM 이 한가할 때 우선순위 순으로 미리 생성)
+@router.post("/insight/jobs", response_model=InsightJobSubmitResponse, status_code=202)
+def submit_insight_jobs(request: InsightJobRequest):
+    normalize = NORMALIZERS[request.kind]
+    results = [InsightJobItemResult(index=i) for i in range(len(request.items))]
+
+    valid_indices = []
+    valid_requests = []
+    for i, item in enumerate(request.items):
+        try:
+            valid_requests.append(normalize(item))
+            valid_indices.append(i)
+        except ValidationError as e:
+            results[i].error = format_validation_error(e)
+
+    if valid_requests:
+        job_ids = insight_store.enqueue(request.kind, valid_requests, request.priority)
+        for i, job_id in zip(valid_indices, job_ids):
+            results[i].job_id = job_id
+        insight_workers.notify()
+    logger.info(f"[/insight/jobs] {request.kind} 작업 {len(valid_requests)}건 등록 (우선순위={request.priority})")
+
+    return InsightJobSubmitResponse(
+        jobs=results,
+        accepted_count=len(valid_requests),
+        error_count=len(results) - len(valid_requests),
+    )
+
+@router.get("/insight/jobs", response_model=InsightJobStatsResponse)
+def insight_job_stats():
+    return InsightJobStatsResponse(
+        counts=insight_store.counts(),
+        workers=insight_workers.num_workers,
+        idle_only=insight_workers.idle_only,
+    )
+
+@router.get("/insight/jobs/{job_id}", response_model=InsightJobStatusResponse)
+def get_insight_job(job_id: str):
+    job = insight_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    return InsightJobStatusResponse(**job)
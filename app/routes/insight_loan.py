@@ -1,10 +1,27 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from app.services.llm_service_loan import generate_loan_comment
+from app.schemas.base import TimedRequestModel
+from app.services.llm_service_loan import (
+    generate_loan_comment,
+    prepare_loan_prompt,
+    build_loan_template,
+    GENERATION_KWARGS,
+)
+from app.services.llm_stream import stream_comment_events, precomputed_events
+from app.services.profiling import profiled_iterator
+from app.services.insight_jobs import find_precomputed
+from app.services.llm_loader import MODEL_VERSION, require_llm
+from app.services.llm_stopping import budget_deadline, remaining_budget
+from app.services.metrics import LLM_COMMENTS
+from app.services.model_state import ModelNotReadyError
+from app.services.execution_lanes import llm_lane
 
 router = APIRouter()
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
-class LoanInsightRequest(BaseModel):
+class LoanInsightRequest(TimedRequestModel):
     loan_name: str = Field(..., description="대출 상품명 (예: 농협주택대출)")
     interest_rate: float = Field(..., description="금리(%)")
     repayment_ratio: float = Field(..., description="상환진척률(%)")
@@ -16,11 +33,61 @@ class LoanInsightRequest(BaseModel):
 class LoanInsightResponse(BaseModel):
     comment: str
     model_version: str
+    source: str = Field(
+        "llm",
+        description="코멘트 출처 (llm: 모델 생성, template: 지연 예산 초과 등으로 지표 기반 정형 문구, "
+                    "precomputed: 작업 대기열에서 미리 생성)",
+    )
 
 @router.post("/insight/loan", response_model=LoanInsightResponse)
-def insight_loan(request: LoanInsightRequest):
+async def insight_loan(request: LoanInsightRequest):
+    # 지연 예산은 레인 대기 시간까지 포함해 요청 도착 시점부터 계산
+    deadline = budget_deadline()
+    # 같은 요청으로 미리 생성해 둔 코멘트가 있으면 생성 없이 바로 반환
+    precomputed = await asyncio.to_thread(find_precomputed, "loan", request.model_dump())
+    if precomputed is not None:
+        LLM_COMMENTS.inc("precomputed")
+        return LoanInsightResponse(comment=precomputed, model_version=MODEL_VERSION, source="precomputed")
     try:
-        comment = generate_loan_comment(request.model_dump())
-        return LoanInsightResponse(comment=comment, model_version="phi3-mini-4k-instruct")
+        return await asyncio.wait_for(
+            llm_lane.run(run_insight_loan, request, deadline), timeout=remaining_budget(deadline)
+        )
+    except asyncio.TimeoutError:
+        LLM_COMMENTS.inc("template")
+        return LoanInsightResponse(
+            comment=build_loan_template(request.model_dump()), model_version=MODEL_VERSION, source="template"
+        )
+
+def run_insight_loan(request: LoanInsightRequest, deadline: float = None) -> LoanInsightResponse:
+    try:
+        comment, source = generate_loan_comment(request.model_dump(), deadline=deadline)
+        return LoanInsightResponse(comment=comment, model_version=MODEL_VERSION, source=source)
+    except ModelNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+# 생성되는 토큰을 SSE 로 바로 전송 (마지막 done 이벤트에 정제된 코멘트 포함)
+@router.post("/insight/loan/stream")
+def insight_loan_stream(request: LoanInsightRequest):
+    # 미리 생성해 둔 코멘트는 LLM 상태와 관계없이 바로 전송
+    data = request.model_dump()
+    precomputed = find_precomputed("loan", data)
+    if precomputed is not None:
+        return StreamingResponse(
+            precomputed_events(precomputed, MODEL_VERSION), media_type="text/event-stream", headers=SSE_HEADERS
+        )
+    try:
+        require_llm()
+    except ModelNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    llm_lane.ensure_capacity()
+
+    messages, fallback = prepare_loan_prompt(data)
+    return StreamingResponse(
+        profiled_iterator(
+            stream_comment_events(messages, fallback, MODEL_VERSION, deadline=budget_deadline(), **GENERATION_KWARGS)
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
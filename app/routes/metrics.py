@@ -0,0 +1,9 @@
+from fastapi import APIRouter, Response
+from app.services.metrics import registry, CONTENT_TYPE
+
+router = APIRouter()
+
+# Prometheus 스크레이프용 단계별 지연/토큰 수/대기열 깊이/모델 로드 시간
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,69 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from app.config import MODEL_ADMIN_TOKEN, SERVE_WORKERS
+from app.schemas.model_schema import ModelRegistryResponse, CandidateRequest, ShadowPercentRequest
+from app.services.model_registry import model_registry
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def check_admin_token(token: Optional[str]):
+    # 토큰이 설정되지 않았으면 모델 변경 API 는 열지 않음 (fail closed)
+    if not MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="MODEL_ADMIN_TOKEN 이 설정되지 않아 모델 관리 API 를 사용할 수 없습니다.")
+    if token != MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
+    # pre-fork 멀티 워커에서는 레지스트리가 워커별이라 요청을 받은 워커만 바뀌므로 변경을 막음
+    if SERVE_WORKERS > 1:
+        raise HTTPException(
+            status_code=409,
+            detail=f"멀티 워커({SERVE_WORKERS}) 서빙 중에는 모델을 교체할 수 없습니다. 설정 변경 후 재시작하세요.",
+        )
+
+# 활성/후보 모델 정보와 섀도 스코어링 결과
+@router.get("/models", response_model=ModelRegistryResponse)
+def get_models():
+    return ModelRegistryResponse(**model_registry.as_dict())
+
+# 후보 모델을 백그라운드에서 로드 (활성 모델은 계속 응답)
+@router.post("/models/candidate", response_model=ModelRegistryResponse, status_code=202)
+def load_candidate(request: CandidateRequest, x_admin_token: Optional[str] = Header(None)):
+    check_admin_token(x_admin_token)
+    try:
+        model_registry.load_candidate(
+            request.version,
+            request.model_path,
+            request.encode_map_path,
+            request.threshold,
+            request.shadow_percent,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return ModelRegistryResponse(**model_registry.as_dict())
+
+# 섀도 스코어링 비율 조정
+@router.put("/models/candidate/shadow", response_model=ModelRegistryResponse)
+def set_shadow_percent(request: ShadowPercentRequest, x_admin_token: Optional[str] = Header(None)):
+    check_admin_token(x_admin_token)
+    model_registry.set_shadow_percent(request.shadow_percent)
+    return ModelRegistryResponse(**model_registry.as_dict())
+
+# 후보 모델 폐기
+@router.delete("/models/candidate", response_model=ModelRegistryResponse)
+def discard_candidate(x_admin_token: Optional[str] = Header(None)):
+    check_admin_token(x_admin_token)
+    model_registry.discard_candidate()
+    return ModelRegistryResponse(**model_registry.as_dict())
+
+# 후보 모델을 활성 모델로 원자적 교체
+@router.post("/models/promote", response_model=ModelRegistryResponse)
+def promote_candidate(x_admin_token: Optional[str] = Header(None)):
+    check_admin_token(x_admin_token)
+    try:
+        model_registry.promote()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return ModelRegistryResponse(**model_registry.as_dict())
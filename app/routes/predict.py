@@ -1,13 +1,93 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas.predict_schema import PredictRequest, PredictResponse
-from app.services.model_service import predict_risk
+from typing import Any, Dict, List, Tuple
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import ValidationError
+from app.schemas.predict_schema import (
+    PredictRequest,
+    PredictResponse,
+    PredictBatchRequest,
+    PredictBatchResponse,
+    PredictBatchItemResult,
+    PredictCacheStatsResponse,
+)
+from app.services.model_service import predict_risk, predict_risk_batch
+from app.services.prediction_cache import prediction_cache
+from app.services.customer_history import fill_history_features
+from app.services.execution_lanes import scoring_lane
+from app.config import EXPLAIN_TOP_K
 
 router = APIRouter()
 
+# explain=true 면 모델 기여도(pred_contribs) 기준 상위 피처와 설명을 함께 반환
 @router.post("/predict", response_model=PredictResponse)
-def predict(request: PredictRequest):
+async def predict(
+    request: PredictRequest,
+    explain: bool = Query(False, description="피처별 기여도 포함 여부"),
+    top_k: int = Query(EXPLAIN_TOP_K, ge=1, le=50, description="반환할 상위 기여 피처 수"),
+):
+    return await scoring_lane.run(run_predict, request, explain, top_k)
+
+def run_predict(request: PredictRequest, explain: bool = False, top_k: int = EXPLAIN_TOP_K) -> PredictResponse:
     try:
-        result = predict_risk(request.model_dump())
+        features = request.model_dump()
+        fill_history_features([features])
+        result = predict_risk(features, explain=explain, top_k=top_k)
         return PredictResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction Error: {str(e)}")
+
+# 여러 고객을 한 번의 모델 호출로 예측 (항목별 검증 오류는 해당 항목에만 기록)
+@router.post("/predict/batch", response_model=PredictBatchResponse)
+async def predict_batch(
+    request: PredictBatchRequest,
+    explain: bool = Query(False, description="피처별 기여도 포함 여부 (전체 배치를 한 번에 계산)"),
+    top_k: int = Query(EXPLAIN_TOP_K, ge=1, le=50, description="반환할 상위 기여 피처 수"),
+):
+    return await scoring_lane.run(run_predict_batch, request, explain, top_k)
+
+def run_predict_batch(request: PredictBatchRequest, explain: bool = False,
+                      top_k: int = EXPLAIN_TOP_K) -> PredictBatchResponse:
+    results = [PredictBatchItemResult(index=i) for i in range(len(request.items))]
+
+    valid_indices, valid_features, errors = validate_items(request.items, PredictRequest)
+    for i, error in errors.items():
+        results[i].error = error
+
+    try:
+        # 같은 고객의 여러 분기는 배치 안에서 앞 분기부터 이어서 계산
+        fill_history_features(valid_features)
+        predictions = predict_risk_batch(valid_features, explain=explain, top_k=top_k)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch Prediction Error: {str(e)}")
+
+    for i, prediction in zip(valid_indices, predictions):
+        results[i].result = PredictResponse(**prediction)
+
+    return PredictBatchResponse(
+        results=results,
+        success_count=len(valid_indices),
+        error_count=len(results) - len(valid_indices),
+    )
+
+# 예측 캐시 적중/미스/제거 통계 (캐시 크기 조정용)
+@router.get("/predict/cache", response_model=PredictCacheStatsResponse)
+def predict_cache_stats():
+    return PredictCacheStatsResponse(**prediction_cache.stats())
+
+def validate_items(items: List[Dict[str, Any]], schema) -> Tuple[List[int], List[Dict], Dict[int, str]]:
+    """배치 항목을 하나씩 검증 → (유효 항목 위치, 유효 입력, 위치별 오류 메시지)"""
+    valid_indices = []
+    valid_features = []
+    errors = {}
+    for i, item in enumerate(items):
+        try:
+            valid_features.append(schema.model_validate(item).model_dump())
+            valid_indices.append(i)
+        except ValidationError as e:
+            errors[i] = format_validation_error(e)
+    return valid_indices, valid_features, errors
+
+def format_validation_error(e: ValidationError) -> str:
+    """pydantic 검증 오류를 한 줄 메시지로 변환"""
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+    )
@@ -0,0 +1,35 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse
+from app.config import MODEL_ADMIN_TOKEN, PROFILING_ENABLED, PROFILING_SAMPLE_RATE
+from app.schemas.profiling_schema import ProfileIndexResponse
+from app.services.profiling import list_profiles, profile_path
+
+router = APIRouter()
+
+def check_profile_token(token: Optional[str]):
+    # 프로파일에는 내부 코드 경로가 드러나므로 관리자 토큰이 설정되어 있고 일치할 때만 조회 허용
+    if not MODEL_ADMIN_TOKEN or token != MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
+
+# 최근 요청 프로파일 목록
+@router.get("/debug/profiles", response_model=ProfileIndexResponse)
+def get_profiles(
+    limit: int = Query(50, ge=1, le=1000, description="반환할 최대 프로파일 수"),
+    x_admin_token: Optional[str] = Header(None),
+):
+    check_profile_token(x_admin_token)
+    return ProfileIndexResponse(
+        enabled=PROFILING_ENABLED,
+        sample_rate=PROFILING_SAMPLE_RATE,
+        profiles=list_profiles(limit),
+    )
+
+# folded stack 파일 (flamegraph.pl, speedscope, inferno 등에 바로 입력)
+@router.get("/debug/profiles/{profile_id}")
+def download_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    check_profile_token(x_admin_token)
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"프로파일을 찾을 수 없습니다 (응답 직후라면 아직 저장 중일 수 있음): {profile_id}")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=f"{profile_id}.folded")
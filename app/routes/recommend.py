@@ -1,30 +1,91 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.schemas.recommend_schema import RecommendRequest, RecommendResponse
-from app.services.llm_service_spending import generate_spending_comment
-import traceback
+from app.services.llm_service_spending import generate_spending_comment, prepare_spending_prompt, GENERATION_KWARGS
+from app.services.llm_stream import stream_comment_events, precomputed_events
+from app.services.profiling import profiled_iterator
+from app.services.insight_jobs import find_precomputed
+from app.services.llm_loader import MODEL_VERSION, require_llm
+from app.services.llm_stopping import budget_deadline, remaining_budget
+from app.services.metrics import LLM_COMMENTS
+from app.routes.insight_loan import SSE_HEADERS
+from app.services.model_state import ModelNotReadyError
+from app.services.execution_lanes import llm_lane
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.post("/recommend", response_model=RecommendResponse)
-def recommend(request: RecommendRequest):
+async def recommend(request: RecommendRequest):
+    # 지연 예산은 레인 대기 시간까지 포함해 요청 도착 시점부터 계산
+    deadline = budget_deadline()
+    # 같은 요청으로 미리 생성해 둔 코멘트가 있으면 생성 없이 바로 반환
+    precomputed = await asyncio.to_thread(find_precomputed, "spending", spending_inputs(request))
+    if precomputed is not None:
+        LLM_COMMENTS.inc("precomputed")
+        return RecommendResponse(comment=precomputed, source="precomputed")
+    try:
+        return await asyncio.wait_for(
+            llm_lane.run(run_recommend, request, deadline), timeout=remaining_budget(deadline)
+        )
+    except asyncio.TimeoutError:
+        _, fallback = prepare_spending_prompt(**spending_inputs(request))
+        LLM_COMMENTS.inc("template")
+        return RecommendResponse(comment=fallback, source="template")
+
+def spending_inputs(request: RecommendRequest) -> dict:
+    """요청 → 소비 코멘트 서비스 인자 (평균 소비 데이터가 없으면 나이/성별로 서버 또래 통계 조회)"""
+    return {
+        "spending_data": request.spending_data.model_dump(),
+        "avg_spending_data": request.avg_spending_data.model_dump() if request.avg_spending_data else {},
+        "age": request.age,
+        "sex": request.sex,
+    }
+
+def run_recommend(request: RecommendRequest, deadline: float = None) -> RecommendResponse:
     try:
         # 요청 데이터 추출
-        spending_data = request.spending_data.model_dump()
-        avg_spending_data = request.avg_spending_data.model_dump() if request.avg_spending_data else {}
+        inputs = spending_inputs(request)
 
-        print("입력 spending_data:", spending_data)
-        print("입력 avg_spending_data:", avg_spending_data)
+        # 전체 입력은 DEBUG 레벨에서만 기록 (인자 지연 포맷팅으로 평상시 비용 없음)
+        logger.debug("입력 spending_data: %s", inputs["spending_data"])
+        logger.debug("입력 avg_spending_data: %s", inputs["avg_spending_data"])
 
         # LLM 분석 호출
-        comment = generate_spending_comment(
-            spending_data=spending_data,
-            avg_spending_data=avg_spending_data
-        )
+        comment, source = generate_spending_comment(**inputs, deadline=deadline)
 
-        print("생성된 코멘트:", comment)
-        return RecommendResponse(comment=comment)
+        logger.debug("생성된 코멘트(%s): %s", source, comment)
+        return RecommendResponse(comment=comment, source=source)
 
+    except ModelNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
     except Exception as e:
-        print("에러 발생:")
-        traceback.print_exc()
+        logger.exception("[Recommend] 코멘트 생성 실패")
         raise HTTPException(status_code=500, detail=f"내부 서버 오류: {e}")
+
+# 생성되는 토큰을 SSE 로 바로 전송 (마지막 done 이벤트에 정제된 코멘트 포함)
+@router.post("/recommend/stream")
+def recommend_stream(request: RecommendRequest):
+    # 미리 생성해 둔 코멘트는 LLM 상태와 관계없이 바로 전송
+    inputs = spending_inputs(request)
+    precomputed = find_precomputed("spending", inputs)
+    if precomputed is not None:
+        return StreamingResponse(
+            precomputed_events(precomputed, MODEL_VERSION), media_type="text/event-stream", headers=SSE_HEADERS
+        )
+    try:
+        require_llm()
+    except ModelNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    llm_lane.ensure_capacity()
+
+    messages, fallback = prepare_spending_prompt(**inputs)
+    return StreamingResponse(
+        profiled_iterator(
+            stream_comment_events(messages, fallback, MODEL_VERSION, deadline=budget_deadline(), **GENERATION_KWARGS)
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
@@ -1,45 +1,55 @@
 from fastapi import APIRouter, HTTPException
-from app.schemas.simulation_schema import SimulationRequest, SimulationResponse
-from app.services.model_service import predict_risk
+from app.schemas.simulation_schema import (
+    SimulationRequest,
+    SimulationResponse,
+    SimulationSweepRequest,
+    SimulationSweepResponse,
+    SimulationPoint,
+    CounterfactualRequest,
+    CounterfactualResponse,
+    CounterfactualOption,
+    COUNTERFACTUAL_LEVERS,
+    INCOME_LEVERS,
+)
+from app.services.simulation_service import (
+    sum_changes,
+    score_scenarios,
+    grid_deltas,
+    lever_limit,
+    search_counterfactuals,
+)
+from app.services.customer_history import fill_history_features
+from app.services.model_loader import get_bundle
+from app.services.execution_lanes import scoring_lane
 import logging
-from decimal import Decimal
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+def model_input_features(request) -> dict:
+    """시뮬레이션 기준 입력 (빠진 증감 피처는 고객 이력으로 계산하되, 가상 시나리오이므로 이력에 기록하지 않음)"""
+    model_input = request.model_input.model_dump()
+    fill_history_features([model_input], record=False)
+    return model_input
+
 # ExtraChange(소득/지출 변화)를 반영하여 모델 재추론을 통해 새로운 위험도를 계산
 @router.post("/simulation", response_model=SimulationResponse)
-def simulate_risk(request: SimulationRequest):
+async def simulate_risk(request: SimulationRequest):
+    return await scoring_lane.run(run_simulation, request)
+
+def run_simulation(request: SimulationRequest) -> SimulationResponse:
     try:
         logger.info("[/simulation] 시뮬레이션 요청 수신")
 
-        # 기본 예측 수행
-        base_result = predict_risk(request.model_input.model_dump())
-        base_score = float(base_result["delinquency_probability"])
-        logger.info(f"기본 연체확률: {base_score:.4f}")
-
-        # 기존 입력 복사 및 변화 반영
-        simulated_input = request.model_input.model_dump()
+        model_input = model_input_features(request)
 
         # 변화 금액 계산 (원 단위)
-        income_delta = sum(float(c.amount) for c in request.changes if c.type == "income")
-        expense_delta = sum(float(c.amount) for c in request.changes if c.type == "expense")
+        income_delta, expense_delta = sum_changes(request.changes)
+        logger.info(f"소득 변화(원 단위): +{income_delta}, 지출 변화(원 단위): +{expense_delta}")
 
-        # 단위 변환: 원 → 천원
-        income_delta_thousand = Decimal(str(income_delta)) / Decimal(1000)
-        expense_delta_thousand = Decimal(str(expense_delta)) / Decimal(1000)
-
-        logger.info(f"소득 변화(천원 단위): +{income_delta_thousand}, 지출 변화(천원 단위): +{expense_delta_thousand}")
-
-        # 실제 모델 입력 필드명에 맞게 반영
-        if "salary" in simulated_input:
-            simulated_input["salary"] += income_delta_thousand
-        if "TOT_USE_AM" in simulated_input:
-            simulated_input["TOT_USE_AM"] += expense_delta_thousand
-
-        # 모델 재추론 수행
-        simulated_result = predict_risk(simulated_input)
-        simulated_score = float(simulated_result["delinquency_probability"])
+        # 기본 입력과 변화 반영 입력을 한 번의 모델 추론으로 계산
+        base_score, (simulated_score,) = score_scenarios(model_input, [(income_delta, expense_delta)])
+        logger.info(f"기본 연체확률: {base_score:.4f}")
         logger.info(f"시뮬레이션 후 연체확률: {simulated_score:.4f}")
 
         # 변화량 계산
@@ -68,3 +78,105 @@ def simulate_risk(request: SimulationRequest):
         logger.exception(f"Simulation Error: {e}")
         raise HTTPException(status_code=500, detail=f"Simulation Error: {str(e)}")
 
+
+# 여러 소득/지출 시나리오를 한 번의 행렬 추론으로 계산하여 위험도 곡선 반환
+@router.post("/simulation/sweep", response_model=SimulationSweepResponse)
+async def simulate_sweep(request: SimulationSweepRequest):
+    return await scoring_lane.run(run_simulation_sweep, request)
+
+def run_simulation_sweep(request: SimulationSweepRequest) -> SimulationSweepResponse:
+    try:
+        labels = [scenario.label for scenario in request.scenarios]
+        deltas = [sum_changes(scenario.changes) for scenario in request.scenarios]
+        if request.grid:
+            grid = grid_deltas(request.grid.income_amounts, request.grid.expense_amounts)
+            labels += [None] * len(grid)
+            deltas += grid
+
+        logger.info(f"[/simulation/sweep] 시나리오 {len(deltas)}건 요청 수신")
+        # 스윕 시나리오/격자는 가상 입력이므로 예측 캐시·섀도 스코어링에 기록하지 않음
+        base_score, scores = score_scenarios(model_input_features(request), deltas, record=False)
+
+        points = [
+            SimulationPoint(
+                label=label,
+                income_delta=income_delta,
+                expense_delta=expense_delta,
+                risk_score=score,
+                delta=score - base_score,
+            )
+            for label, (income_delta, expense_delta), score in zip(labels, deltas, scores)
+        ]
+        return SimulationSweepResponse(base_risk_score=base_score, points=points)
+
+    except Exception as e:
+        logger.exception(f"Simulation Sweep Error: {e}")
+        raise HTTPException(status_code=500, detail=f"Simulation Sweep Error: {str(e)}")
+
+
+# 임계값을 넘은 고객이 기준 아래로 내려가려면 항목별로 최소 얼마를 줄이거나(지출) 늘려야(소득) 하는지 탐색
+@router.post("/simulation/counterfactual", response_model=CounterfactualResponse)
+async def simulate_counterfactual(request: CounterfactualRequest):
+    return await scoring_lane.run(run_counterfactual, request)
+
+def run_counterfactual(request: CounterfactualRequest) -> CounterfactualResponse:
+    try:
+        model_input = model_input_features(request)
+        levers = request.levers or list(COUNTERFACTUAL_LEVERS)
+        logger.info(f"[/simulation/counterfactual] 항목 {len(levers)}개 탐색 요청 수신")
+
+        # 탐색 도중 모델이 교체되어도 같은 모델/임계값으로 비교
+        bundle = get_bundle()
+        limits = {
+            lever: lever_limit(model_input, lever, request.max_expense_cut_ratio, request.max_income_increase_ratio)
+            for lever in levers
+        }
+        base_prob, found, steps, evaluated = search_counterfactuals(
+            model_input, levers, limits, bundle, request.grid_points
+        )
+
+        options = []
+        for lever in levers:
+            if lever not in found:
+                continue
+            amount, prob = found[lever]
+            options.append(CounterfactualOption(
+                lever=lever,
+                label=COUNTERFACTUAL_LEVERS[lever],
+                direction="increase" if lever in INCOME_LEVERS else "decrease",
+                # 모델 입력은 천원 단위 → 원 단위로 응답
+                current_amount=float(model_input[lever]) * 1000,
+                change_amount=amount * 1000 if amount is not None else None,
+                risk_score=round(prob, 4),
+                feasible=amount is not None,
+            ))
+        options.sort(key=lambda o: (not o.feasible, o.change_amount or 0))
+        best = options[0] if options and options[0].feasible else None
+
+        already_below = base_prob <= bundle.threshold
+        if already_below:
+            explanation = "현재 연체 위험도가 이미 기준 이하입니다."
+        elif best is None:
+            explanation = "허용 범위 안에서는 한 항목만 조정해 기준 아래로 내려갈 수 없습니다."
+        else:
+            action = "늘리면" if best.direction == "increase" else "줄이면"
+            explanation = (
+                f"{best.label}을(를) {best.change_amount:,.0f}원 {action} 연체 위험도가 "
+                f"{base_prob * 100:.0f}%에서 {best.risk_score * 100:.0f}%로 낮아져 기준 아래가 됩니다."
+            )
+
+        return CounterfactualResponse(
+            base_risk_score=round(base_prob, 4),
+            threshold=bundle.threshold,
+            model_version=bundle.version,
+            already_below=already_below,
+            best=best,
+            options=options,
+            search_steps=steps,
+            evaluated_candidates=evaluated,
+            explanation=explanation,
+        )
+
+    except Exception as e:
+        logger.exception(f"Counterfactual Error: {e}")
+        raise HTTPException(status_code=500, detail=f"Counterfactual Error: {str(e)}")
@@ -0,0 +1,15 @@
+import time
+from pydantic import BaseModel, model_validator
+from app.services.metrics import SCHEMA_VALIDATION_SECONDS
+
+class TimedRequestModel(BaseModel):
+    """요청 스키마 검증 시간을 스키마 이름별로 /metrics 에 기록하는 기본 모델"""
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _observe_validation(cls, data, handler):
+        start = time.perf_counter()
+        try:
+            return handler(data)
+        finally:
+            SCHEMA_VALIDATION_SECONDS.observe(time.perf_counter() - start, cls.__name__)
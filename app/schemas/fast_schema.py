@@ -0,0 +1,84 @@
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, create_model, model_validator
+
+from app.schemas.base import TimedRequestModel
+from app.schemas.predict_schema import PredictRequest, check_history_inputs
+from app.schemas.simulation_schema import check_sweep_points
+
+
+def _float_fields(model) -> Dict[str, Any]:
+    """Decimal 필드를 float 로 바꾼 필드 정의 (설명/기본값은 그대로)"""
+    fields = {}
+    for name, info in model.model_fields.items():
+        annotation = info.annotation
+        default = info.default
+        if annotation is Decimal:
+            annotation = float
+        elif annotation == Optional[Decimal]:
+            annotation = Optional[float]
+        if isinstance(default, Decimal):
+            default = float(default)
+        fields[name] = (annotation, Field(default, description=info.description))
+    return fields
+
+
+# PredictRequest 와 같은 필드를 Decimal 대신 float 로 바로 검증하는 fast 입력 스키마
+# (필드 목록을 PredictRequest 에서 생성하므로 두 스키마가 어긋나지 않음)
+FastPredictRequest = create_model(
+    "FastPredictRequest",
+    __base__=TimedRequestModel,
+    __doc__="PredictRequest 의 float 버전 (금액/비율 필드를 Decimal 없이 float 로 검증)",
+    __validators__={"check_history": model_validator(mode="after")(check_history_inputs)},
+    **_float_fields(PredictRequest),
+)
+
+
+class FastPredictBatchRequest(TimedRequestModel):
+    items: List[Dict[str, Any]] = Field(..., description="FastPredictRequest 형식의 입력 목록 (항목별로 개별 검증)")
+
+
+class FastPackedPredictRequest(TimedRequestModel):
+    rows: List[List[float]] = Field(
+        ..., description="모델 피처 순서대로 인코딩된 값 목록 (순서/인코딩은 GET /fast/predict/packed/schema)"
+    )
+    model_version: Optional[str] = Field(None, description="행을 만들 때 기준으로 한 모델 버전 (다르면 409)")
+
+
+class FastPackedSchemaResponse(BaseModel):
+    model_version: str = Field(..., description="모델 버전")
+    features: List[str] = Field(..., description="행 값 순서")
+    encoders: Dict[str, Dict[str, int]] = Field(..., description="범주형 피처의 범주 → 코드 (없는 범주는 -1)")
+
+
+class FastExtraChange(BaseModel):
+    type: str = Field(..., description="변화 유형 (income=수입, expense=지출)")
+    name: str = Field(..., description="항목명 (예: 해외여행, 상여금)")
+    amount: float = Field(..., description="금액 (원 단위)")
+
+
+class FastSimulationRequest(TimedRequestModel):
+    model_input: FastPredictRequest = Field(..., description="모델 입력 데이터")
+    changes: List[FastExtraChange] = Field(..., description="소득/지출 변화 리스트")
+
+
+class FastSimulationScenario(BaseModel):
+    label: Optional[str] = Field(None, description="시나리오 이름 (예: 여행 취소)")
+    changes: List[FastExtraChange] = Field(..., description="시나리오에 적용할 소득/지출 변화 리스트")
+
+
+class FastSimulationGrid(BaseModel):
+    income_amounts: List[float] = Field(default_factory=lambda: [0.0], description="소득 변화 금액 목록 (원 단위)")
+    expense_amounts: List[float] = Field(default_factory=lambda: [0.0], description="지출 변화 금액 목록 (원 단위)")
+
+
+class FastSimulationSweepRequest(TimedRequestModel):
+    model_input: FastPredictRequest = Field(..., description="모델 입력 데이터")
+    scenarios: List[FastSimulationScenario] = Field(default_factory=list, description="개별 시나리오 목록")
+    grid: Optional[FastSimulationGrid] = Field(None, description="소득 × 지출 변화 격자 (슬라이더용)")
+
+    @model_validator(mode="after")
+    def check_points(self):
+        check_sweep_points(self.scenarios, self.grid)
+        return self
@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, List, Literal, Optional
+from app.schemas.base import TimedRequestModel
+from app.config import INSIGHT_JOB_MAX_ITEMS
+
+class InsightJobRequest(TimedRequestModel):
+    kind: Literal["loan", "spending"] = Field(..., description="코멘트 종류 (loan=/insight/loan, spending=/recommend)")
+    items: List[Dict[str, Any]] = Field(..., description="종류별 요청 본문 목록 (LoanInsightRequest 또는 RecommendRequest, 항목별 검증)")
+    priority: int = Field(0, ge=-100, le=100, description="우선순위 (클수록 먼저 처리)")
+
+    @model_validator(mode="after")
+    def check_items(self):
+        if not self.items:
+            raise ValueError("items 는 비어 있을 수 없습니다.")
+        if len(self.items) > INSIGHT_JOB_MAX_ITEMS:
+            raise ValueError(f"작업은 요청당 최대 {INSIGHT_JOB_MAX_ITEMS}개까지 등록할 수 있습니다. (요청: {len(self.items)})")
+        return self
+
+class InsightJobItemResult(BaseModel):
+    index: int = Field(..., description="요청 목록 내 위치")
+    job_id: Optional[str] = Field(None, description="작업 id (등록 성공 시)")
+    error: Optional[str] = Field(None, description="검증 오류 메시지 (실패 시)")
+
+class InsightJobSubmitResponse(BaseModel):
+    jobs: List[InsightJobItemResult] = Field(..., description="항목별 등록 결과 (요청 순서와 동일)")
+    accepted_count: int = Field(..., description="등록된 작업 수")
+    error_count: int = Field(..., description="검증 실패 항목 수")
+
+class InsightJobStatusResponse(BaseModel):
+    job_id: str = Field(..., description="작업 id")
+    kind: str = Field(..., description="코멘트 종류")
+    priority: int = Field(..., description="우선순위")
+    status: str = Field(..., description="상태 (queued | running | done | failed)")
+    comment: Optional[str] = Field(None, description="생성된 코멘트 (done 일 때)")
+    source: Optional[str] = Field(None, description="코멘트 출처 (llm | template)")
+    model_version: Optional[str] = Field(None, description="생성에 사용한 LLM 버전")
+    error: Optional[str] = Field(None, description="실패 사유 (failed 일 때)")
+    created_at: float = Field(..., description="등록 시각 (epoch 초)")
+    started_at: Optional[float] = Field(None, description="처리 시작 시각")
+    finished_at: Optional[float] = Field(None, description="처리 완료 시각")
+
+class InsightJobStatsResponse(BaseModel):
+    counts: Dict[str, int] = Field(..., description="상태별 작업 수")
+    workers: int = Field(..., description="이 프로세스의 작업 워커 수")
+    idle_only: bool = Field(..., description="실시간 LLM 요청이 없을 때만 처리하는지 여부")
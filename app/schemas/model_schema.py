@@ -0,0 +1,43 @@
+# app/schemas/model_schema.py
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class ModelInfo(BaseModel):
+    version: str = Field(..., description="모델 버전")
+    threshold: float = Field(..., description="연체 판정 임계값")
+    model_path: str = Field(..., description="모델 파일 경로")
+    encode_map_path: str = Field(..., description="인코딩 맵 경로")
+    num_features: int = Field(..., description="입력 피처 수")
+    scoring_backend: str = Field(..., description="스코어링 백엔드 (inplace, dmatrix)")
+    loaded_at: float = Field(..., description="로드 시각 (epoch 초)")
+
+class CandidateInfo(BaseModel):
+    status: str = Field(..., description="후보 모델 상태 (none, loading, ready, failed)")
+    error: Optional[str] = Field(None, description="로드 실패 사유")
+    shadow_percent: float = Field(..., description="섀도 스코어링 대상 트래픽 비율 (%)")
+    model: Optional[ModelInfo] = None
+
+class ShadowStats(BaseModel):
+    requests: int = Field(..., description="섀도 스코어링한 요청 수")
+    rows: int = Field(..., description="비교한 행 수")
+    skipped: int = Field(..., description="밀린 작업이 많아 건너뛴 요청 수")
+    errors: int = Field(..., description="후보 모델 채점 실패 수")
+    label_flips: int = Field(..., description="활성/후보 모델의 라벨이 다른 행 수")
+    label_flip_rate: float
+    mean_abs_diff: float = Field(..., description="확률 차이 절댓값 평균")
+    max_abs_diff: float = Field(..., description="확률 차이 절댓값 최대")
+
+class ModelRegistryResponse(BaseModel):
+    active: Optional[ModelInfo] = None
+    candidate: CandidateInfo
+    shadow: ShadowStats
+
+class CandidateRequest(BaseModel):
+    version: str = Field(..., description="후보 모델 버전 (예: xgb_delinquency_model_v3)")
+    model_path: str = Field(..., description="모델 파일 경로 (MODEL_DIR 하위)")
+    encode_map_path: str = Field(..., description="인코딩 맵 경로 (MODEL_DIR 하위)")
+    threshold: float = Field(..., gt=0, lt=1, description="연체 판정 임계값")
+    shadow_percent: float = Field(0.0, ge=0, le=100, description="섀도 스코어링 대상 트래픽 비율 (%)")
+
+class ShadowPercentRequest(BaseModel):
+    shadow_percent: float = Field(..., ge=0, le=100, description="섀도 스코어링 대상 트래픽 비율 (%)")
@@ -1,8 +1,31 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+import re
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Dict, Any, Union
 from decimal import Decimal
+from app.schemas.base import TimedRequestModel
 
-class PredictRequest(BaseModel):
+# 고객 이력의 분기 키 형식 (예: 2022Q2)
+BAS_YH_PATTERN = re.compile(r"^(\d{4})Q([1-4])$")
+
+def has_history_key(customer_id, bas_yh) -> bool:
+    """서버 이력으로 증감 피처를 계산할 수 있는 입력인지 (customer_id 가 있고 BAS_YH 가 YYYYQn 형식)"""
+    return customer_id is not None and BAS_YH_PATTERN.match(bas_yh) is not None
+
+def check_history_inputs(model):
+    """customer_id 는 문자열로 맞추고, 이력으로 계산할 수 없는 입력은 기존처럼 quarter_order 를 직접 보냈는지 확인
+
+    BAS_YH 가 YYYYQn 형식이 아니면 customer_id 가 있어도 거부하지 않고 이력 계산만 건너뜁니다.
+    """
+    if model.customer_id is not None and not isinstance(model.customer_id, str):
+        model.customer_id = str(model.customer_id)
+    if model.quarter_order is None and not has_history_key(model.customer_id, model.BAS_YH):
+        raise ValueError("customer_id 와 YYYYQn 형식의 BAS_YH 로 이력을 계산할 수 없으면 quarter_order 는 필수입니다.")
+    return model
+
+class PredictRequest(TimedRequestModel):
+    customer_id: Optional[Union[str, int]] = Field(
+        None, description="고객 식별자 (숫자도 허용, 문자열로 변환 — 있으면 서버 이력으로 증감 피처/quarter_order 중 빠진 값을 계산)"
+    )
     BAS_YH: str = Field(..., description="기준 분기 (예: 2022Q2)")
     AGE: int = Field(..., description="고객 나이")
     SEX_CD: int = Field(..., description="성별 코드 (1=남, 2=여)")
@@ -34,31 +57,66 @@ class PredictRequest(BaseModel):
     repayment_method: int
     repayment_date: Optional[str] = Field(None, description="상환일자(YYYY-MM-DD)")
     is_completed: int
-    quarter_order: int
-
-    # 증감률 관련
-    salary_diff: Decimal = Decimal("0.0")
-    salary_pct_change: Decimal = Decimal("0.0")
-    balance_diff: Decimal = Decimal("0.0")
-    balance_pct_change: Decimal = Decimal("0.0")
-    principal_amount_diff: Decimal = Decimal("0.0")
-    principal_amount_pct_change: Decimal = Decimal("0.0")
-    remaining_principal_diff: Decimal = Decimal("0.0")
-    remaining_principal_pct_change: Decimal = Decimal("0.0")
+    quarter_order: Optional[int] = Field(None, description="고객 이력상 분기 순번 (customer_id 가 없거나 BAS_YH 가 YYYYQn 형식이 아니면 필수)")
+
+    # 증감률 관련 (직전 분기 대비 — 생략 시 customer_id 이력으로 계산, customer_id 도 없으면 0)
+    salary_diff: Optional[Decimal] = None
+    salary_pct_change: Optional[Decimal] = None
+    balance_diff: Optional[Decimal] = None
+    balance_pct_change: Optional[Decimal] = None
+    principal_amount_diff: Optional[Decimal] = None
+    principal_amount_pct_change: Optional[Decimal] = None
+    remaining_principal_diff: Optional[Decimal] = None
+    remaining_principal_pct_change: Optional[Decimal] = None
+
+    @model_validator(mode="after")
+    def check_history(self):
+        return check_history_inputs(self)
 
     class Config:
         json_encoders = {
             Decimal: lambda v: float(v)  # FastAPI가 JSON 직렬화 가능하도록 변환
         }
 
+class FeatureContribution(BaseModel):
+    feature: str = Field(..., description="피처명")
+    value: float = Field(..., description="모델에 입력된 값 (인코딩 후)")
+    contribution: float = Field(..., description="연체 위험 기여도 (log-odds, 양수=위험 증가)")
+
 class PredictResponse(BaseModel):
     delinquency_probability: float = Field(..., description="연체 확률 (0~1)")
     delinquency_label: int = Field(..., description="예측 결과 (0=정상, 1=위험)")
     threshold: float = Field(..., description="적용된 임계값")
     model_version: str = Field(..., description="모델 버전")
     explanation: str = Field(..., description="간단한 위험도 설명")
+    base_value: Optional[float] = Field(None, description="기여도 기준값 (explain=true 일 때, log-odds)")
+    top_features: Optional[List[FeatureContribution]] = Field(None, description="기여도 상위 피처 (explain=true 일 때)")
 
     class Config:
         json_encoders = {
             Decimal: lambda v: float(v)
         }
+
+
+class PredictBatchRequest(TimedRequestModel):
+    items: List[Dict[str, Any]] = Field(..., description="PredictRequest 형식의 입력 목록 (항목별로 개별 검증)")
+
+class PredictBatchItemResult(BaseModel):
+    index: int = Field(..., description="요청 목록 내 위치")
+    result: Optional[PredictResponse] = Field(None, description="예측 결과 (성공 시)")
+    error: Optional[str] = Field(None, description="검증 오류 메시지 (실패 시)")
+
+class PredictBatchResponse(BaseModel):
+    results: List[PredictBatchItemResult]
+    success_count: int = Field(..., description="예측 성공 건수")
+    error_count: int = Field(..., description="검증 실패 건수")
+
+class PredictCacheStatsResponse(BaseModel):
+    size: int = Field(..., description="현재 캐시 항목 수")
+    maxsize: int = Field(..., description="최대 캐시 항목 수 (0=비활성화)")
+    ttl_seconds: float = Field(..., description="항목 유효 시간(초)")
+    hits: int
+    misses: int
+    evictions: int = Field(..., description="용량 초과로 제거된 항목 수")
+    expirations: int = Field(..., description="TTL 만료로 제거된 항목 수")
+    hit_rate: float
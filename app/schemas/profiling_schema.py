@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class ProfileSummary(BaseModel):
+    profile_id: str = Field(..., description="프로파일 id (GET /debug/profiles/{profile_id} 로 folded stack 다운로드)")
+    method: str = Field(..., description="HTTP 메서드")
+    path: str = Field(..., description="요청 경로")
+    route: Optional[str] = Field(None, description="처리한 엔드포인트 이름")
+    status: Optional[int] = Field(None, description="응답 상태 코드 (예외로 끝난 경우 없음)")
+    trigger: str = Field(..., description="프로파일링 계기 (header=X-Profile 헤더, sampled=샘플링)")
+    duration_ms: float = Field(..., description="요청 처리 시간 (응답 본문 전송 완료까지)")
+    samples: int = Field(..., description="스택 샘플링 횟수")
+    interval_ms: float = Field(..., description="샘플링 간격")
+    threads: List[str] = Field(..., description="샘플링한 스레드 종류 (folded stack 의 최상단 프레임)")
+    created_at: float = Field(..., description="요청 시작 시각 (unix time)")
+
+class ProfileIndexResponse(BaseModel):
+    enabled: bool = Field(..., description="이 서버에서 프로파일링이 켜져 있는지 (PROFILING_ENABLED)")
+    sample_rate: float = Field(..., description="헤더 없이 프로파일링하는 요청 비율")
+    profiles: List[ProfileSummary] = Field(..., description="최근 프로파일 (최신순)")
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from decimal import Decimal
+from app.schemas.base import TimedRequestModel
 
 class SpendingData(BaseModel):
     interior_am: Optional[Decimal] = Field(None, description="인테리어 관련 지출 금액")
@@ -15,16 +16,23 @@ class SpendingData(BaseModel):
     income: Optional[Decimal] = Field(None, description="월 소득 금액")
 
 
-class RecommendRequest(BaseModel):
+class RecommendRequest(TimedRequestModel):
     spending_data: SpendingData = Field(
         ...,
         description="사용자의 소비 데이터 (각 항목별 금액 포함)"
     )
     avg_spending_data: Optional[SpendingData] = Field(
-        ..., 
-        description="평균 소비 데이터 (비교용)"
+        None,
+        description="평균 소비 데이터 (비교용, 생략 시 서버 또래 통계에서 나이대/성별/소득 구간으로 조회)"
     )
+    age: Optional[int] = Field(None, ge=0, le=120, description="고객 나이 (또래 그룹 조회용)")
+    sex: Optional[int] = Field(None, description="성별 코드 (1=남, 2=여, 또래 그룹 조회용)")
 
 
 class RecommendResponse(BaseModel):
     comment: str = Field(..., description="AI의 코멘트")
+    source: str = Field(
+        "llm",
+        description="코멘트 출처 (llm: 모델 생성, template: 지연 예산 초과 등으로 지표 기반 정형 문구, "
+                    "precomputed: 작업 대기열에서 미리 생성)",
+    )
@@ -1,15 +1,16 @@
 # app/schemas/simulation_schema.py
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from decimal import Decimal
-from typing import List
+from typing import List, Optional
 from app.schemas.predict_schema import PredictRequest
+from app.schemas.base import TimedRequestModel
 
 class ExtraChange(BaseModel):
     type: str = Field(..., description="변화 유형 (income=수입, expense=지출)")
     name: str = Field(..., description="항목명 (예: 해외여행, 상여금)")
     amount: Decimal = Field(..., description="금액 (원 단위)")
 
-class SimulationRequest(BaseModel):
+class SimulationRequest(TimedRequestModel):
     model_input: PredictRequest = Field(..., description="모델 입력 데이터")
     changes: List[ExtraChange] = Field(..., description="소득/지출 변화 리스트")
 
@@ -22,4 +23,100 @@ class SimulationResponse(BaseModel):
 
 # 모델이 JSON으로 직렬화될 때 Decimal을 float으로 변환
 class Config:
-        json_encoders = {Decimal: lambda v: float(v)}
\ No newline at end of file
+        json_encoders = {Decimal: lambda v: float(v)}
+
+MAX_SWEEP_POINTS = 500
+
+def check_sweep_points(scenarios, grid):
+    """시나리오 + 격자 점 수가 1 ~ MAX_SWEEP_POINTS 인지 확인"""
+    grid_points = len(grid.income_amounts) * len(grid.expense_amounts) if grid else 0
+    total = len(scenarios) + grid_points
+    if total == 0:
+        raise ValueError("scenarios 또는 grid 중 하나 이상이 필요합니다.")
+    if total > MAX_SWEEP_POINTS:
+        raise ValueError(f"시나리오는 최대 {MAX_SWEEP_POINTS}개까지 요청할 수 있습니다. (요청: {total})")
+
+class SimulationScenario(BaseModel):
+    label: Optional[str] = Field(None, description="시나리오 이름 (예: 여행 취소)")
+    changes: List[ExtraChange] = Field(..., description="시나리오에 적용할 소득/지출 변화 리스트")
+
+class SimulationGrid(BaseModel):
+    income_amounts: List[Decimal] = Field(default_factory=lambda: [Decimal(0)], description="소득 변화 금액 목록 (원 단위)")
+    expense_amounts: List[Decimal] = Field(default_factory=lambda: [Decimal(0)], description="지출 변화 금액 목록 (원 단위)")
+
+class SimulationSweepRequest(TimedRequestModel):
+    model_input: PredictRequest = Field(..., description="모델 입력 데이터")
+    scenarios: List[SimulationScenario] = Field(default_factory=list, description="개별 시나리오 목록")
+    grid: Optional[SimulationGrid] = Field(None, description="소득 × 지출 변화 격자 (슬라이더용)")
+
+    @model_validator(mode="after")
+    def check_points(self):
+        check_sweep_points(self.scenarios, self.grid)
+        return self
+
+class SimulationPoint(BaseModel):
+    label: Optional[str] = Field(None, description="시나리오 이름 (격자 점은 없음)")
+    income_delta: float = Field(..., description="소득 변화 합계 (원 단위)")
+    expense_delta: float = Field(..., description="지출 변화 합계 (원 단위)")
+    risk_score: float = Field(..., description="시나리오 적용 후 위험도 (0~1)")
+    delta: float = Field(..., description="기존 대비 위험도 변화량")
+
+class SimulationSweepResponse(BaseModel):
+    base_risk_score: float = Field(..., description="기존 위험도 (0~1)")
+    points: List[SimulationPoint] = Field(..., description="시나리오별 위험도 곡선")
+
+# 반사실(counterfactual) 탐색에 쓸 수 있는 입력 항목 → 한글명 (salary 는 증가, 나머지는 감소)
+INCOME_LEVERS = {"salary": "월 소득"}
+EXPENSE_LEVERS = {
+    "TOT_USE_AM": "총 지출",
+    "FSBZ_AM": "식비",
+    "TRVLEC_AM": "여행/레저",
+    "INTERIOR_AM": "인테리어",
+    "INSUHOS_AM": "보험/병원",
+    "OFFEDU_AM": "교육",
+    "SVCARC_AM": "서비스",
+    "DIST_AM": "유통",
+    "PLSANIT_AM": "생활용품",
+    "CLOTHGDS_AM": "의류",
+    "AUTO_AM": "자동차",
+}
+COUNTERFACTUAL_LEVERS = {**INCOME_LEVERS, **EXPENSE_LEVERS}
+
+class CounterfactualRequest(TimedRequestModel):
+    model_input: PredictRequest = Field(..., description="모델 입력 데이터")
+    levers: Optional[List[str]] = Field(
+        None, description=f"탐색할 항목 (생략 시 전체: {', '.join(COUNTERFACTUAL_LEVERS)})"
+    )
+    max_expense_cut_ratio: float = Field(1.0, gt=0, le=1, description="지출 항목별 최대 감소 비율 (현재 금액 대비)")
+    max_income_increase_ratio: float = Field(1.0, gt=0, le=10, description="최대 소득 증가 비율 (현재 소득 대비)")
+    grid_points: int = Field(16, ge=4, le=64, description="탐색 단계마다 항목별로 평가할 후보 수")
+
+    @model_validator(mode="after")
+    def check_levers(self):
+        unknown = [lever for lever in self.levers or [] if lever not in COUNTERFACTUAL_LEVERS]
+        if unknown:
+            raise ValueError(f"지원하지 않는 항목: {unknown} (가능: {list(COUNTERFACTUAL_LEVERS)})")
+        if self.levers is not None and not self.levers:
+            raise ValueError("levers 는 비어 있을 수 없습니다.")
+        return self
+
+class CounterfactualOption(BaseModel):
+    lever: str = Field(..., description="입력 항목명 (예: FSBZ_AM)")
+    label: str = Field(..., description="항목 한글명")
+    direction: str = Field(..., description="변화 방향 (decrease=지출 감소, increase=소득 증가)")
+    current_amount: float = Field(..., description="현재 금액 (원 단위)")
+    change_amount: Optional[float] = Field(None, description="임계값 아래로 내려가는 최소 변화 금액 (원 단위, 불가능하면 없음)")
+    risk_score: float = Field(..., description="변화 적용 후 위험도 (불가능하면 최대 변화 시 위험도)")
+    feasible: bool = Field(..., description="허용 범위 안에서 임계값 아래로 내려갈 수 있는지 여부")
+
+class CounterfactualResponse(BaseModel):
+    base_risk_score: float = Field(..., description="기존 위험도 (0~1)")
+    threshold: float = Field(..., description="적용된 임계값")
+    model_version: str = Field(..., description="모델 버전")
+    already_below: bool = Field(..., description="이미 임계값 이하인지 여부")
+    best: Optional[CounterfactualOption] = Field(None, description="변화 금액이 가장 작은 선택지")
+    options: List[CounterfactualOption] = Field(..., description="항목별 결과 (가능한 항목을 변화 금액 순으로 먼저)")
+    search_steps: int = Field(..., description="일괄 추론 횟수")
+    evaluated_candidates: int = Field(..., description="평가한 후보 입력 수")
+    explanation: str = Field(..., description="결과 요약")
+
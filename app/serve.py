@@ -0,0 +1,211 @@
+"""pre-fork 멀티 프로세스 서빙
+
+    python -m app.serve --workers 4 --port 8000
+
+마스터 프로세스가 XGBoost 모델과 LLM 가중치를 한 번만 로드하고 리스닝 소켓을 연 뒤
+워커를 fork 합니다. 워커는 마스터의 메모리 페이지를 copy-on-write 로 공유하므로
+워커 수를 늘려도 모델 RSS 가 배로 늘지 않습니다. (safetensors 가중치는 파일 mmap 으로 올라와
+페이지 캐시까지 공유됩니다.)
+
+- 마스터는 추론을 실행하지 않습니다. OpenMP/torch 스레드 풀이나 배치 스케줄러 스레드가
+  fork 전에 생기지 않도록 워밍업과 모든 스레드 시작은 각 워커에서 이뤄집니다.
+- 워커당 torch/OpenMP 스레드 수를 CPU 수 / 워커 수로 고정해 코어를 과다 점유하지 않습니다.
+- 워커가 비정상 종료하면 마스터가 다시 fork 합니다 (모델 재로드 없음).
+- 모델 레지스트리와 /metrics 는 워커별 상태입니다. 여러 워커에서는 모델 교체 API 를 막으며,
+  새 버전은 XGB_MODEL_* 설정 후 마스터 재시작으로 배포합니다.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+
+logger = logging.getLogger("app.serve")
+
+# 짧은 시간에 연속으로 죽는 워커는 다시 띄우지 않음 (설정 오류 등으로 무한 재시작 방지)
+RESPAWN_WINDOW_SECONDS = 10
+MAX_RESPAWNS_IN_WINDOW = 5
+
+
+def threads_per_worker(workers: int, torch_threads: int = 0) -> int:
+    if torch_threads > 0:
+        return torch_threads
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def pin_thread_env(threads: int):
+    """torch/XGBoost 가 import 되기 전에 OpenMP/BLAS 스레드 수 고정 (이미 설정된 값은 유지)"""
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ.setdefault(name, str(threads))
+
+
+def file_backed_ratio(model) -> float:
+    """파일 mmap 영역(safetensors)에 그대로 있는 파라미터 비율 (Linux /proc/self/maps 기준)"""
+    try:
+        with open("/proc/self/maps") as f:
+            regions = []
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 6 and parts[5].startswith("/"):
+                    start, end = (int(x, 16) for x in parts[0].split("-"))
+                    regions.append((start, end))
+    except OSError:
+        return 0.0
+
+    params = list(model.parameters())
+    if not params:
+        return 0.0
+    backed = sum(any(start <= p.data_ptr() < end for start, end in regions) for p in params)
+    return backed / len(params)
+
+
+def preload_models(load_llm: bool):
+    """마스터에서 모델만 로드 (추론/워밍업은 하지 않음)"""
+    from tqdm import tqdm
+    from app.services import llm_loader
+    from app.services.model_loader import load_model
+    from app.services.peer_stats import load_peer_stats
+
+    # 가중치 로드 진행 표시줄의 모니터 스레드가 fork 전에 남지 않도록 비활성화
+    tqdm.monitor_interval = 0
+    load_peer_stats()
+    load_model()
+    if load_llm:
+        generator = llm_loader.load_llm()
+        ratio = file_backed_ratio(generator.model)
+        logger.info(f"[Serve] LLM 파라미터 중 파일 mmap 공유 비율: {ratio:.0%}")
+
+
+def run_worker(index: int, sock, config_kwargs: dict, threads: int, cpus=None):
+    """fork 된 워커 프로세스 본체"""
+    import torch
+    import uvicorn
+
+    # 마스터의 시그널 핸들러 제거 (uvicorn 이 자체 핸들러를 설치)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    torch.set_num_threads(threads)
+
+    from app.main import app
+
+    logger.info(f"[Serve] 워커 {index} 시작 (pid={os.getpid()}, torch 스레드={threads}, CPU={cpus or '전체'})")
+    server = uvicorn.Server(uvicorn.Config(app, **config_kwargs))
+    server.run(sockets=[sock])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SERVE_WORKERS", "0")) or os.cpu_count() or 1)
+    parser.add_argument("--torch-threads", type=int, default=int(os.getenv("SERVE_TORCH_THREADS", "0")),
+                        help="워커당 torch 스레드 수 (0이면 CPU 수 / 워커 수)")
+    parser.add_argument("--pin-cpus", action="store_true", help="워커마다 겹치지 않는 CPU 집합에 고정")
+    parser.add_argument("--no-llm", action="store_true", help="마스터에서 LLM 을 로드하지 않음 (/predict 전용 노드)")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    threads = threads_per_worker(args.workers, args.torch_threads)
+    # 설정 모듈이 읽기 전에 환경 변수로 전달
+    os.environ["SERVE_WORKERS"] = str(args.workers)
+    os.environ["SERVE_TORCH_THREADS"] = str(threads)
+    pin_thread_env(threads)
+    if args.no_llm:
+        os.environ["LLM_PRELOAD"] = "false"
+        # /predict 전용 노드는 인사이트 요청이 와도 워커마다 LLM 을 따로 로드하지 않음
+        os.environ["LLM_LOAD_ON_DEMAND"] = "false"
+
+    import uvicorn
+    from app.config import LLM_PRELOAD
+    import app.main  # noqa: F401  (로깅 설정 및 라우트 import 를 fork 전에 완료)
+
+    start = time.perf_counter()
+    preload_models(LLM_PRELOAD)
+    # fork 이후 GC 가 공유 객체의 헤더를 건드려 페이지가 복사되지 않도록 현재 객체를 영구 세대로 이동
+    gc.collect()
+    gc.freeze()
+    logger.info(f"[Serve] 마스터 모델 로드 완료 ({time.perf_counter() - start:.1f}s), 고정 객체 {gc.get_freeze_count()}개")
+
+    extra_threads = [t.name for t in threading.enumerate() if t is not threading.main_thread()]
+    if extra_threads:
+        logger.warning(f"[Serve] fork 전에 실행 중인 스레드가 있습니다: {extra_threads}")
+
+    config_kwargs = dict(host=args.host, port=args.port, backlog=args.backlog, log_level=args.log_level,
+                         lifespan="on")
+    sock = uvicorn.Config(app.main.app, **config_kwargs).bind_socket()
+    sock.set_inheritable(True)
+
+    cpus = sorted(os.sched_getaffinity(0)) if args.pin_cpus else []
+    per_worker = len(cpus) // args.workers if cpus else 0
+    if args.pin_cpus and per_worker == 0:
+        logger.warning("[Serve] 워커 수가 CPU 수보다 많아 CPU 고정을 사용하지 않습니다.")
+
+    def cpu_slice(index: int):
+        return cpus[index * per_worker:(index + 1) * per_worker] if per_worker else None
+
+    children = {}
+    respawns = []
+    stopping = False
+
+    def spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(index, sock, config_kwargs, threads, cpu_slice(index))
+            except BaseException:
+                logger.exception(f"[Serve] 워커 {index} 비정상 종료")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = index
+
+    def shutdown(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    logger.info(f"[Serve] 워커 {args.workers}개 fork (http://{args.host}:{args.port}, 워커당 torch 스레드={threads})")
+    for index in range(args.workers):
+        spawn(index)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+
+        logger.warning(f"[Serve] 워커 {index} 종료 (pid={pid}, status={status}) — 다시 fork 합니다.")
+        now = time.monotonic()
+        respawns = [t for t in respawns if now - t < RESPAWN_WINDOW_SECONDS] + [now]
+        if len(respawns) > MAX_RESPAWNS_IN_WINDOW:
+            logger.error("[Serve] 워커가 짧은 시간에 반복 종료되어 서버를 중단합니다.")
+            shutdown(signal.SIGTERM, None)
+            continue
+        spawn(index)
+
+    sock.close()
+    logger.info("[Serve] 모든 워커 종료")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
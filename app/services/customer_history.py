@@ -0,0 +1,271 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import CUSTOMER_HISTORY_PATH, CUSTOMER_HISTORY_RECORD, CUSTOMER_HISTORY_MAX_PENDING
+from app.schemas.predict_schema import BAS_YH_PATTERN, has_history_key
+from app.services.metrics import HISTORY_FEATURES, HISTORY_WRITES
+
+logger = logging.getLogger(__name__)
+
+# 분기마다 저장하는 값 (모델 입력과 같은 천원 단위) 과 그로부터 계산하는 증감 피처
+HISTORY_FIELDS = ("salary", "balance", "principal_amount", "remaining_principal")
+CHANGE_FEATURES = tuple(f"{field}_{kind}" for field in HISTORY_FIELDS for kind in ("diff", "pct_change"))
+# 한 번에 조회하는 (고객, 분기) 수 (SQLite 변수 개수 제한 이내)
+LOOKUP_CHUNK = 400
+
+
+def quarter_index(bas_yh: str) -> int:
+    """'2022Q2' → 연속된 분기 번호 (정렬/직전 분기 비교용)"""
+    match = BAS_YH_PATTERN.match(bas_yh)
+    if match is None:
+        raise ValueError(f"BAS_YH 형식이 올바르지 않습니다: {bas_yh}")
+    return int(match.group(1)) * 4 + int(match.group(2)) - 1
+
+
+def change_features(current: Dict[str, float], previous: Optional[Dict]) -> Dict[str, float]:
+    """직전 분기 대비 증감/증감률 — 학습 데이터의 groupby diff/pct_change 후 inf·NaN → 0 처리와 같은 값
+
+    첫 분기(직전 분기 없음)는 모두 0, 직전 값이 0 이면 증감률은 0 입니다. 증감률은 비율(0.1 = 10%)입니다.
+    """
+    values = {}
+    for field in HISTORY_FIELDS:
+        if previous is None:
+            values[f"{field}_diff"] = 0.0
+            values[f"{field}_pct_change"] = 0.0
+            continue
+        diff = current[field] - previous[field]
+        values[f"{field}_diff"] = diff
+        values[f"{field}_pct_change"] = diff / previous[field] if previous[field] else 0.0
+    return values
+
+
+class CustomerHistoryStore:
+    """고객 × 분기별 이력 (SQLite, (customer_id, quarter) 기본키 테이블)
+
+    직전 분기 조회는 기본키 범위 탐색 한 번이고, 기록은 같은 분기를 덮어쓰는 upsert 입니다.
+    연결은 처음 사용할 때 만들므로 pre-fork 마스터/일괄 스코어링 부모 프로세스에서는 열리지 않습니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS customer_history ("
+                "customer_id TEXT NOT NULL, quarter INTEGER NOT NULL, bas_yh TEXT NOT NULL, "
+                "salary REAL NOT NULL, balance REAL NOT NULL, principal_amount REAL NOT NULL, "
+                "remaining_principal REAL NOT NULL, quarter_order INTEGER, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (customer_id, quarter)) WITHOUT ROWID"
+            )
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def previous_many(self, keys: List[Tuple[str, int]]) -> List[Optional[Dict]]:
+        """(고객, 분기) 마다 그 분기 이전의 가장 최근 이력 (없으면 None)"""
+        columns = ("quarter",) + HISTORY_FIELDS + ("quarter_order",)
+        query = (
+            f"SELECT {', '.join(columns)} FROM customer_history "
+            "WHERE customer_id = ? AND quarter < ? ORDER BY quarter DESC LIMIT 1"
+        )
+        results = []
+        with self._lock:
+            conn = self._connect()
+            for customer_id, quarter in keys:
+                row = conn.execute(query, (customer_id, quarter)).fetchone()
+                results.append(dict(zip(columns, row)) if row else None)
+        return results
+
+    def append(self, records: Iterable[Dict]):
+        """분기 이력 기록 (같은 고객·분기는 마지막 값으로 덮어씀)
+
+        기록한 가장 이른 분기 이후 그 고객의 quarter_order 를 직전 분기 순번 + 1 로 다시 이어 붙이므로
+        앞 분기를 뒤늦게 기록해도 뒤 분기 순번이 어긋나지 않고, 순번 없이 기록한 분기도 채워집니다.
+        """
+        now = time.time()
+        rows = [
+            (r["customer_id"], r["quarter"], r["bas_yh"], *(r[field] for field in HISTORY_FIELDS),
+             r.get("quarter_order"), now)
+            for r in records
+        ]
+        if not rows:
+            return
+        earliest: Dict[str, int] = {}
+        for row in rows:
+            earliest[row[0]] = min(earliest.get(row[0], row[1]), row[1])
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO customer_history (customer_id, quarter, bas_yh, salary, balance, "
+                "principal_amount, remaining_principal, quarter_order, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            for customer_id, quarter in earliest.items():
+                self._renumber_after(conn, customer_id, quarter)
+
+    @staticmethod
+    def _renumber_after(conn: sqlite3.Connection, customer_id: str, from_quarter: int):
+        """from_quarter 보다 뒤 분기(와 순번이 빈 from_quarter)의 quarter_order 를 직전 분기 순번 + 1 로 맞춤"""
+        cursor = conn.execute(
+            "SELECT quarter, quarter_order FROM customer_history WHERE customer_id = ? ORDER BY quarter",
+            (customer_id,),
+        )
+        updates = []
+        previous_order = None
+        for quarter, quarter_order in cursor.fetchall():
+            if quarter > from_quarter or (quarter == from_quarter and quarter_order is None):
+                expected = previous_order + 1 if previous_order is not None else 1
+                if quarter_order != expected:
+                    updates.append((expected, customer_id, quarter))
+                    quarter_order = expected
+            previous_order = quarter_order
+        conn.executemany(
+            "UPDATE customer_history SET quarter_order = ? WHERE customer_id = ? AND quarter = ?", updates
+        )
+
+    def history(self, customer_id: str) -> List[Dict]:
+        with self._lock:
+            cursor = self._connect().execute(
+                "SELECT bas_yh, salary, balance, principal_amount, remaining_principal, quarter_order "
+                "FROM customer_history WHERE customer_id = ? ORDER BY quarter",
+                (customer_id,),
+            )
+            names = [c[0] for c in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+history_store = CustomerHistoryStore(CUSTOMER_HISTORY_PATH)
+
+# 이력 기록은 스코어링 경로 밖의 단일 스레드에서 (요청은 기록 완료를 기다리지 않음)
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-writer")
+_writer_lock = threading.Lock()
+_writer_pending = 0
+
+
+def record_history(records: List[Dict]):
+    """이력 기록을 백그라운드 작성 스레드에 넘김 (밀린 작업이 상한이면 버림)
+
+    기록은 비동기이므로 직후 요청의 조회에는 아직 반영되지 않았을 수 있습니다.
+    """
+    global _writer_pending
+    if not records:
+        return
+    with _writer_lock:
+        if _writer_pending >= CUSTOMER_HISTORY_MAX_PENDING:
+            HISTORY_WRITES.inc("dropped")
+            logger.warning(f"[Customer History] 기록 대기열이 가득 차 {len(records)}건을 기록하지 않습니다.")
+            return
+        _writer_pending += 1
+
+    def _write():
+        global _writer_pending
+        try:
+            history_store.append(records)
+            HISTORY_WRITES.inc("written")
+        except sqlite3.Error:
+            HISTORY_WRITES.inc("error")
+            logger.exception("[Customer History] 이력 기록 실패")
+        finally:
+            with _writer_lock:
+                _writer_pending -= 1
+
+    _writer.submit(_write)
+
+
+def fill_history_features(features_list: List[Dict], record: bool = CUSTOMER_HISTORY_RECORD):
+    """입력 목록의 빠진 증감 피처/quarter_order 를 채움 (호출자가 보낸 값은 그대로 사용)
+
+    customer_id 가 있는 행은 저장된 이력과 같은 배치 안의 이전 분기 행 중 가장 최근 분기를 직전 분기로 삼고,
+    customer_id 가 없거나 BAS_YH 가 YYYYQn 형식이 아닌 행은 기존처럼 0 으로 채웁니다.
+    record 이면 이번에 값을 계산한 분기를 백그라운드로 이력에 기록합니다. (호출자가 모두 보낸 행은 기록하지 않음)
+    """
+    tracked = []
+    for i, features in enumerate(features_list):
+        if has_history_key(features.get("customer_id"), features["BAS_YH"]):
+            tracked.append(i)
+            continue
+        if features.get("customer_id") is not None:
+            logger.warning(
+                f"[Customer History] BAS_YH 형식이 YYYYQn 이 아니어서 이력 계산을 건너뜁니다. "
+                f"(customer_id={features['customer_id']}, BAS_YH={features['BAS_YH']})"
+            )
+        missing = [name for name in CHANGE_FEATURES if features.get(name) is None]
+        for name in missing:
+            features[name] = 0.0
+        HISTORY_FEATURES.inc("default" if missing else "caller")
+    if not tracked:
+        return
+
+    # 같은 고객의 여러 분기가 한 배치에 있으면 앞 분기부터 계산해 다음 분기의 직전 값으로 사용
+    order = sorted(tracked, key=lambda i: (features_list[i]["customer_id"], quarter_index(features_list[i]["BAS_YH"])))
+    keys = [(features_list[i]["customer_id"], quarter_index(features_list[i]["BAS_YH"])) for i in order]
+    try:
+        stored = []
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            stored.extend(history_store.previous_many(keys[start:start + LOOKUP_CHUNK]))
+        store_ok = True
+    except sqlite3.Error:
+        logger.exception("[Customer History] 이력 조회 실패 — 증감 피처를 0 으로 채웁니다.")
+        stored = [None] * len(keys)
+        store_ok = False
+
+    chains: Dict[str, List[Dict]] = {}
+    records = []
+    for i, (customer_id, quarter), previous in zip(order, keys, stored):
+        features = features_list[i]
+        for candidate in reversed(chains.get(customer_id, [])):
+            if candidate["quarter"] < quarter:
+                if previous is None or candidate["quarter"] > previous["quarter"]:
+                    previous = candidate
+                break
+
+        current = {field: float(features[field]) for field in HISTORY_FIELDS}
+        missing = [name for name in CHANGE_FEATURES if features.get(name) is None]
+        if missing:
+            derived = change_features(current, previous)
+            for name in missing:
+                features[name] = derived[name]
+        if features.get("quarter_order") is None:
+            missing.append("quarter_order")
+            previous_order = previous.get("quarter_order") if previous else None
+            features["quarter_order"] = previous_order + 1 if previous_order is not None else 1
+
+        if not missing:
+            source = "caller"
+        elif not store_ok:
+            source = "store_error"
+        else:
+            source = "derived" if previous is not None else "first_quarter"
+        HISTORY_FEATURES.inc(source)
+
+        entry = {"customer_id": customer_id, "quarter": quarter, "bas_yh": features["BAS_YH"],
+                 "quarter_order": int(features["quarter_order"]), **current}
+        chains.setdefault(customer_id, []).append(entry)
+        if missing:
+            records.append(entry)
+
+    if record and store_ok:
+        record_history(records)
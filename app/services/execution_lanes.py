@@ -0,0 +1,157 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict
+
+from app.services.metrics import registry, Gauge, CollectedCounter, LANE_WAIT_SECONDS
+from app.services.profiling import current_profile, attach_thread
+from app.config import (
+    LLM_LANE_WORKERS,
+    LLM_LANE_QUEUE_DEPTH,
+    LLM_LANE_DEADLINE_SECONDS,
+    SCORING_LANE_WORKERS,
+    SCORING_LANE_QUEUE_DEPTH,
+    SCORING_LANE_DEADLINE_SECONDS,
+    LANE_RETRY_AFTER_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LaneError(RuntimeError):
+    """실행 레인이 요청을 받을 수 없을 때 (HTTP 상태 코드와 Retry-After 포함)"""
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LaneRejectedError(LaneError):
+    """대기열이 가득 차 즉시 거절"""
+
+    status_code = 429
+
+
+class LaneTimeoutError(LaneError):
+    """요청별 마감 시간 안에 처리되지 못함"""
+
+    status_code = 503
+
+
+class ExecutionLane:
+    """전용 스레드 풀 + 제한된 대기열 + 요청별 마감 시간을 갖는 실행 레인
+
+    LLM 생성과 XGBoost 스코어링을 서로 다른 레인에서 실행해
+    느린 생성 요청이 가벼운 /predict 트래픽의 스레드를 점유하지 않도록 합니다.
+    """
+
+    def __init__(self, name: str, max_workers: int, queue_depth: int, deadline_seconds: float,
+                 retry_after: int = LANE_RETRY_AFTER_SECONDS):
+        self.name = name
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.deadline_seconds = deadline_seconds
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"lane-{name}")
+        # 실행 중 + 대기 중인 요청 수의 상한
+        self._slots = threading.BoundedSemaphore(max_workers + queue_depth)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.running = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def has_capacity(self) -> bool:
+        with self._lock:
+            return self.in_flight < self.max_workers + self.queue_depth
+
+    def ensure_capacity(self):
+        """슬롯을 점유하지 않고 수용 가능 여부만 확인 (스트리밍 응답 시작 전 확인용)"""
+        if not self.has_capacity():
+            with self._lock:
+                self.rejected += 1
+            raise LaneRejectedError(f"{self.name} 대기열이 가득 찼습니다.", self.retry_after)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """슬롯을 확보해 작업을 제출 (대기열이 가득 차면 LaneRejectedError)"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise LaneRejectedError(f"{self.name} 대기열이 가득 찼습니다.", self.retry_after)
+
+        with self._lock:
+            self.in_flight += 1
+        submitted_at = time.monotonic()
+        deadline = submitted_at + self.deadline_seconds
+        # 요청 컨텍스트(contextvars)를 작업 스레드로 전달
+        ctx = contextvars.copy_context()
+
+        def task():
+            started_at = time.monotonic()
+            LANE_WAIT_SECONDS.observe(started_at - submitted_at, self.name)
+            if started_at > deadline:
+                raise LaneTimeoutError(f"{self.name} 대기 시간이 마감 시간을 초과했습니다.", self.retry_after)
+            with self._lock:
+                self.running += 1
+            try:
+                # 프로파일링 중인 요청이면 이 작업 스레드도 샘플링 대상에 포함
+                with attach_thread(ctx.get(current_profile)):
+                    return ctx.run(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        future = self._executor.submit(task)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future: Future):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """레인에서 fn 을 실행하고 결과를 기다림 (마감 시간 초과 시 LaneTimeoutError)"""
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.deadline_seconds)
+        except asyncio.TimeoutError:
+            # 아직 시작하지 않은 작업이면 취소됨 (이미 실행 중이면 끝까지 수행 후 슬롯 반환)
+            future.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise LaneTimeoutError(f"{self.name} 처리 시간이 마감 시간을 초과했습니다.", self.retry_after)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queue_depth_limit": self.queue_depth,
+                "in_flight": self.in_flight,
+                "running": self.running,
+                "queued": max(self.in_flight - self.running, 0),
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+
+llm_lane = ExecutionLane("llm", LLM_LANE_WORKERS, LLM_LANE_QUEUE_DEPTH, LLM_LANE_DEADLINE_SECONDS)
+scoring_lane = ExecutionLane("scoring", SCORING_LANE_WORKERS, SCORING_LANE_QUEUE_DEPTH, SCORING_LANE_DEADLINE_SECONDS)
+
+
+def _lane_stat(key: str):
+    return lambda: [((lane.name,), lane.stats()[key]) for lane in (llm_lane, scoring_lane)]
+
+
+# 레인별 대기열 깊이 / 실행 중 작업 수 / 거절·마감 초과 누적 수
+registry.register(Gauge("ai_lane_queued", "Tasks waiting in an execution lane", ["lane"], collect=_lane_stat("queued")))
+registry.register(Gauge("ai_lane_running", "Tasks running in an execution lane", ["lane"], collect=_lane_stat("running")))
+registry.register(CollectedCounter("ai_lane_rejected_total", "Tasks rejected because the lane queue was full", ["lane"],
+                                   collect=_lane_stat("rejected")))
+registry.register(CollectedCounter("ai_lane_timed_out_total", "Tasks that missed their lane deadline", ["lane"],
+                                   collect=_lane_stat("timed_out")))
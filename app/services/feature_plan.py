@@ -0,0 +1,95 @@
+import math
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 모델 입력에서 항상 제외되는 컬럼
+DROP_COLUMNS = ("customer_id", "is_delinquent", "repayment_date")
+
+_MISSING = object()
+
+
+def _to_float(value) -> float:
+    """pd.to_numeric(errors="coerce") → inf/NaN 제거 → fillna(0) 과 동일한 변환"""
+    if type(value) is float:
+        # fast 스키마 입력은 이미 float
+        return value if math.isfinite(value) else 0.0
+    if value is None:
+        return 0.0
+    if isinstance(value, str) and "_" in value:
+        # float()은 '1_000' 을 허용하지만 pandas는 NaN 으로 처리
+        return 0.0
+    try:
+        v = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return v if math.isfinite(v) else 0.0
+
+
+class FeaturePlan:
+    """모델 로드 시 한 번 컴파일되는 전처리 계획
+
+    컬럼 순서, 역인코딩 테이블, 제외 규칙을 미리 고정해두고
+    요청마다 float32 버퍼에 값을 바로 기록합니다.
+    """
+
+    def __init__(self, feature_names: List[str], encoders: Dict[str, Dict], use_feature_names: bool):
+        self.feature_names = feature_names
+        self.encoders = encoders
+        # booster에 피처명이 있을 때만 DMatrix에 이름을 넘겨 검증을 유지
+        self.dmatrix_feature_names = feature_names if use_feature_names else None
+        self._columns = [(name, encoders.get(name)) for name in feature_names]
+
+    @property
+    def num_features(self) -> int:
+        return len(self.feature_names)
+
+    def _fill_row(self, features: Dict) -> List[float]:
+        row = []
+        for name, lookup in self._columns:
+            value = features.get(name, _MISSING)
+            if value is _MISSING:
+                raise ValueError(f"입력 피처 누락: {name}")
+            if lookup is not None:
+                try:
+                    row.append(float(lookup.get(value, -1)))
+                except TypeError:
+                    row.append(-1.0)
+            else:
+                row.append(_to_float(value))
+        return row
+
+    def transform(self, features: Dict) -> np.ndarray:
+        """단건 입력 → (1, n_features) float32 행렬"""
+        return self.transform_batch([features])
+
+    def transform_batch(self, features_list: Sequence[Dict]) -> np.ndarray:
+        """여러 건 입력 → (n_rows, n_features) float32 행렬"""
+        buf = np.empty((len(features_list), self.num_features), dtype=np.float32)
+        for i, features in enumerate(features_list):
+            buf[i] = self._fill_row(features)
+        return buf
+
+
+def compile_feature_plan(bst, encoding_maps: Dict, default_columns: Optional[Sequence[str]] = None) -> FeaturePlan:
+    """booster와 인코딩 맵으로부터 전처리 계획 생성"""
+    booster_names = getattr(bst, "feature_names", None)
+    if booster_names:
+        feature_names = list(booster_names)
+    elif default_columns is not None:
+        feature_names = [c for c in default_columns if c not in DROP_COLUMNS]
+    else:
+        raise ValueError("booster에 피처명이 없어 컬럼 순서를 결정할 수 없습니다.")
+
+    # 인코딩 맵은 {코드: 범주} 형태이므로 {범주: 정수 코드} 로 한 번만 뒤집어둠
+    encoders = {
+        col: {v: int(k) for k, v in mapping.items()}
+        for col, mapping in (encoding_maps or {}).items()
+        if col in feature_names
+    }
+
+    logger.info(f"[Feature Plan] 컴파일 완료 — 피처 {len(feature_names)}개, 인코딩 컬럼 {len(encoders)}개")
+    return FeaturePlan(feature_names, encoders, use_feature_names=bool(booster_names))
@@ -0,0 +1,328 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import (
+    INSIGHT_JOB_DB_PATH,
+    INSIGHT_JOB_WORKERS,
+    INSIGHT_JOB_IDLE_ONLY,
+    INSIGHT_COMMENT_TTL_SECONDS,
+)
+from app.services.execution_lanes import llm_lane
+from app.services.llm_loader import MODEL_VERSION
+from app.services.llm_service_loan import generate_loan_comment
+from app.services.llm_service_spending import generate_spending_comment
+from app.services.metrics import registry, Gauge
+from app.services.model_state import llm_state
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+# 대기 중인 작업이 없거나 LLM 이 바쁠 때 다시 확인하는 간격(초)
+POLL_INTERVAL_SECONDS = 1.0
+# 처리 중인 작업은 HEARTBEAT_SECONDS 마다 heartbeat_at 을 갱신하며,
+# 이보다 오래 갱신되지 않은 running 작업은 처리하던 프로세스가 죽은 것으로 보고 다시 대기열에 넣음
+STALE_JOB_SECONDS = 600
+HEARTBEAT_SECONDS = STALE_JOB_SECONDS / 10
+
+# 작업 종류별 처리 함수 (요청 dict → (코멘트, 출처)), 야간 작업이므로 지연 예산 없음
+JOB_HANDLERS: Dict[str, Callable[[Dict], Tuple[str, str]]] = {
+    "loan": lambda data: generate_loan_comment(data),
+    "spending": lambda data: generate_spending_comment(**data),
+}
+
+
+def request_key(kind: str, data: Dict) -> str:
+    """코멘트 종류 + 정규화된 요청 내용 기준 키 (Decimal 은 float 로 직렬화)"""
+    payload = json.dumps({"kind": kind, "request": data}, sort_keys=True, ensure_ascii=False, default=float)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class InsightJobStore:
+    """인사이트 생성 작업 대기열 + 미리 생성한 코멘트 저장소 (SQLite)
+
+    여러 서빙 프로세스가 같은 파일을 공유해도 작업 선점은 BEGIN IMMEDIATE 트랜잭션으로 한 번만 이뤄집니다.
+    연결은 처음 사용할 때 만들므로 pre-fork 마스터에서는 열리지 않습니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS insight_jobs ("
+                "job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, request TEXT NOT NULL, request_key TEXT NOT NULL, "
+                "priority INTEGER NOT NULL, status TEXT NOT NULL, comment TEXT, source TEXT, model_version TEXT, "
+                "error TEXT, created_at REAL NOT NULL, started_at REAL, finished_at REAL, heartbeat_at REAL)"
+            )
+            # heartbeat_at 이 없던 이전 파일은 컬럼 추가 (여러 프로세스가 동시에 추가하면 한쪽은 실패해도 무방)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(insight_jobs)")}
+            if "heartbeat_at" not in columns:
+                try:
+                    conn.execute("ALTER TABLE insight_jobs ADD COLUMN heartbeat_at REAL")
+                except sqlite3.OperationalError:
+                    pass
+            conn.execute("CREATE INDEX IF NOT EXISTS insight_jobs_queue ON insight_jobs (status, priority, created_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS insight_comments ("
+                "request_key TEXT PRIMARY KEY, kind TEXT NOT NULL, comment TEXT NOT NULL, source TEXT NOT NULL, "
+                "model_version TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        """쓰기 잠금을 먼저 잡는 트랜잭션 (다른 프로세스와 같은 작업을 동시에 선점하지 않도록)"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def enqueue(self, kind: str, requests: List[Dict], priority: int = 0) -> List[str]:
+        """요청 목록을 대기열에 추가하고 작업 id 목록 반환"""
+        now = time.time()
+        rows = []
+        for data in requests:
+            rows.append((uuid.uuid4().hex, kind, json.dumps(data, ensure_ascii=False, default=float),
+                         request_key(kind, data), priority, "queued", now))
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO insight_jobs (job_id, kind, request, request_key, priority, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return [row[0] for row in rows]
+
+    def claim(self) -> Optional[Tuple[str, str, Dict]]:
+        """우선순위가 가장 높은(같으면 먼저 들어온) 대기 작업 하나를 running 으로 바꾸고 반환"""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT job_id, kind, request FROM insight_jobs WHERE status = 'queued' "
+                "ORDER BY priority DESC, created_at, rowid LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                now = time.time()
+                conn.execute(
+                    "UPDATE insight_jobs SET status = 'running', started_at = ?, heartbeat_at = ? WHERE job_id = ?",
+                    (now, now, row[0]),
+                )
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def complete(self, job_id: str, comment: str, source: str, model_version: str):
+        """작업 완료 기록 — LLM 이 생성한 코멘트만 조회용 저장소에 반영 (정형 문구는 낮에 다시 생성 시도)"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE insight_jobs SET status = 'done', comment = ?, source = ?, model_version = ?, finished_at = ? "
+                "WHERE job_id = ?",
+                (comment, source, model_version, now, job_id),
+            )
+            if source == "llm":
+                conn.execute(
+                    "INSERT OR REPLACE INTO insight_comments (request_key, kind, comment, source, model_version, created_at) "
+                    "SELECT request_key, kind, ?, ?, ?, ? FROM insight_jobs WHERE job_id = ?",
+                    (comment, source, model_version, now, job_id),
+                )
+
+    def fail(self, job_id: str, error: str):
+        with self._lock:
+            self._connect().execute(
+                "UPDATE insight_jobs SET status = 'failed', error = ?, finished_at = ? WHERE job_id = ?",
+                (error, time.time(), job_id),
+            )
+
+    def heartbeat(self, job_ids: List[str]):
+        """처리 중인 작업이 살아 있음을 기록 (오래 걸리는 작업이 다른 프로세스에서 다시 선점되지 않도록)"""
+        if not job_ids:
+            return
+        now = time.time()
+        with self._lock:
+            self._connect().executemany(
+                "UPDATE insight_jobs SET heartbeat_at = ? WHERE job_id = ? AND status = 'running'",
+                [(now, job_id) for job_id in job_ids],
+            )
+
+    def requeue_stale(self, stale_seconds: float = STALE_JOB_SECONDS) -> int:
+        """처리하던 프로세스가 중단되어 heartbeat 가 끊긴 running 작업을 다시 대기 상태로"""
+        with self._lock:
+            cursor = self._connect().execute(
+                "UPDATE insight_jobs SET status = 'queued', started_at = NULL, heartbeat_at = NULL "
+                "WHERE status = 'running' AND COALESCE(heartbeat_at, started_at) < ?",
+                (time.time() - stale_seconds,),
+            )
+            return cursor.rowcount
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "SELECT job_id, kind, priority, status, comment, source, model_version, error, "
+                "created_at, started_at, finished_at FROM insight_jobs WHERE job_id = ?",
+                (job_id,),
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([c[0] for c in cursor.description], row))
+
+    def lookup_comment(self, kind: str, key: str, model_version: str = MODEL_VERSION,
+                       ttl_seconds: float = INSIGHT_COMMENT_TTL_SECONDS) -> Optional[str]:
+        """같은 요청으로 미리 생성한 코멘트 (같은 LLM 버전, TTL 이내) — 없으면 None"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT comment FROM insight_comments WHERE request_key = ? AND kind = ? AND model_version = ? "
+                "AND created_at >= ?",
+                (key, kind, model_version, time.time() - ttl_seconds),
+            ).fetchone()
+        return row[0] if row else None
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connect().execute("SELECT status, COUNT(*) FROM insight_jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update(dict(rows))
+        return counts
+
+
+class InsightJobWorkers:
+    """대기열의 작업을 우선순위 순으로 처리하는 백그라운드 스레드 풀
+
+    INSIGHT_JOB_IDLE_ONLY 이면 LLM 레인에 실시간 요청이 있는 동안은 새 작업을 꺼내지 않으므로
+    야간 일괄 생성이 낮 시간 요청의 지연을 늘리지 않습니다. 작업에는 지연 예산을 적용하지 않습니다.
+    """
+
+    def __init__(self, store: InsightJobStore, num_workers: int, idle_only: bool):
+        self.store = store
+        self.num_workers = num_workers
+        self.idle_only = idle_only
+        self._wakeup = threading.Event()
+        self._threads: List[threading.Thread] = []
+        # 이 프로세스에서 처리 중인 작업 id (heartbeat 대상)
+        self._running = set()
+        self._running_lock = threading.Lock()
+
+    def notify(self):
+        self._wakeup.set()
+
+    def start(self):
+        if self._threads or self.num_workers <= 0:
+            return
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._run, name=f"insight-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat, name="insight-job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        logger.info(f"[Insight Jobs] 작업 워커 {self.num_workers}개 시작 (유휴 시에만 처리={self.idle_only})")
+
+    def _can_run(self) -> bool:
+        if not llm_state.ready:
+            return False
+        return not self.idle_only or llm_lane.stats()["in_flight"] == 0
+
+    def _requeue_stale(self):
+        try:
+            requeued = self.store.requeue_stale()
+        except Exception:
+            logger.exception("[Insight Jobs] 중단된 작업 복구 실패")
+            return
+        if requeued:
+            logger.warning(f"[Insight Jobs] 중단된 작업 {requeued}건을 다시 대기열에 넣었습니다.")
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(HEARTBEAT_SECONDS)
+            with self._running_lock:
+                job_ids = list(self._running)
+            try:
+                self.store.heartbeat(job_ids)
+            except Exception:
+                logger.exception("[Insight Jobs] 작업 heartbeat 기록 실패")
+
+    def _run(self):
+        last_requeue = 0.0
+        while True:
+            if time.monotonic() - last_requeue >= STALE_JOB_SECONDS / 10:
+                last_requeue = time.monotonic()
+                self._requeue_stale()
+            if not self._can_run():
+                time.sleep(POLL_INTERVAL_SECONDS)
+                continue
+            try:
+                job = self.store.claim()
+            except Exception:
+                logger.exception("[Insight Jobs] 작업 선점 실패")
+                time.sleep(POLL_INTERVAL_SECONDS)
+                continue
+            if job is None:
+                self._wakeup.wait(POLL_INTERVAL_SECONDS)
+                self._wakeup.clear()
+                continue
+            with self._running_lock:
+                self._running.add(job[0])
+            try:
+                self._process(*job)
+            finally:
+                with self._running_lock:
+                    self._running.discard(job[0])
+
+    def _process(self, job_id: str, kind: str, data: Dict):
+        handler = JOB_HANDLERS.get(kind)
+        if handler is None:
+            self.store.fail(job_id, f"지원하지 않는 작업 종류: {kind}")
+            return
+        start = time.perf_counter()
+        try:
+            comment, source = handler(data)
+        except Exception as e:
+            logger.exception(f"[Insight Jobs] 작업 {job_id} 실패")
+            self.store.fail(job_id, str(e))
+            return
+        self.store.complete(job_id, comment, source, MODEL_VERSION)
+        logger.info(f"[Insight Jobs] 작업 {job_id} 완료 ({kind}, {source}, {time.perf_counter() - start:.2f}s)")
+
+
+insight_store = InsightJobStore(INSIGHT_JOB_DB_PATH)
+insight_workers = InsightJobWorkers(insight_store, INSIGHT_JOB_WORKERS, INSIGHT_JOB_IDLE_ONLY)
+
+
+def find_precomputed(kind: str, data: Dict) -> Optional[str]:
+    """실시간 경로용 미리 생성한 코멘트 조회 (저장소 오류는 조회 실패로 보고 생성으로 진행)"""
+    try:
+        return insight_store.lookup_comment(kind, request_key(kind, data))
+    except Exception:
+        logger.exception("[Insight Jobs] 미리 생성한 코멘트 조회 실패")
+        return None
+
+
+def _job_counts():
+    try:
+        return [((status,), count) for status, count in insight_store.counts().items()]
+    except Exception:
+        return []
+
+
+# 상태별 작업 수 (야간 대기열 소진 여부 확인용)
+registry.register(Gauge("ai_insight_jobs", "Insight generation jobs by status", ["status"], collect=_job_counts))
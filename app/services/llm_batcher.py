@@ -0,0 +1,178 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import ExitStack
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
+
+import torch
+from transformers import StoppingCriteriaList
+
+from app.config import LLM_INFERENCE_MODE
+from app.services.llm_stopping import CommentStoppingCriteria, LatencyBudgetExceeded, remaining_budget
+from app.services.metrics import GENERATED_TOKENS, LLM_BATCH_SIZE, observe_stage, stage_timer
+from app.services.profiling import current_profile, attach_thread
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingRequest:
+    __slots__ = ("messages", "gen_kwargs", "deadline", "key", "future", "enqueued_at", "profile")
+
+    def __init__(self, messages: List[Dict], gen_kwargs: Dict, deadline: Optional[float] = None):
+        self.messages = messages
+        self.gen_kwargs = gen_kwargs
+        self.deadline = deadline
+        # 생성 옵션이 같은 요청끼리만 한 배치로 묶음
+        self.key = tuple(sorted(gen_kwargs.items()))
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+        # 제출한 요청이 프로파일링 중이면 배치 생성 동안 배치 스레드도 그 프로파일에 포함
+        self.profile = current_profile.get()
+
+
+class GenerationBatcher:
+    """동시에 들어온 채팅 프롬프트를 짧은 대기 구간 동안 모아 한 번의 패딩 배치로 생성
+
+    model/tokenizer 만 있으면 동작하므로 작은 로컬 causal LM 으로도 CPU 에서 검증할 수 있습니다.
+    """
+
+    def __init__(self, model, tokenizer, max_batch_size: int = 8, max_wait_ms: float = 20, prefix_cache=None):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.prefix_cache = prefix_cache
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+
+        # decoder-only 모델은 왼쪽 패딩이어야 배치 생성 결과가 단건과 같음
+        # (토크나이저 객체를 직접 바꾸므로 같은 토크나이저를 쓰는 비배치 파이프라인/스트리밍 경로에도 적용됨 —
+        #  이 경로들은 단건만 토크나이즈해 패딩이 없으므로 결과는 같음, python -m benchmarks.llm_batcher 로 확인)
+        self.tokenizer.padding_side = "left"
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def submit(self, messages: List[Dict], deadline: Optional[float] = None, **gen_kwargs) -> str:
+        """프롬프트를 대기열에 넣고 해당 요청의 생성 결과(assistant 응답)를 반환
+
+        deadline(time.monotonic 기준)까지 끝나지 않으면 LatencyBudgetExceeded
+        """
+        self._ensure_worker()
+        request = _PendingRequest(messages, gen_kwargs, deadline)
+        self._queue.put(request)
+        try:
+            return request.future.result(timeout=remaining_budget(deadline))
+        except FutureTimeoutError:
+            raise LatencyBudgetExceeded("코멘트 생성이 지연 예산을 초과했습니다.")
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _ensure_worker(self):
+        # 워커 스레드는 첫 요청 시점에 띄움 (fork 이후 프로세스에서도 안전)
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="llm-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[_PendingRequest]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            for request in batch:
+                observe_stage("batch_wait", started - request.enqueued_at)
+
+            groups = {}
+            for request in batch:
+                groups.setdefault(request.key, []).append(request)
+
+            for group in groups.values():
+                # 대기 중 마감이 지난 요청은 생성하지 않음
+                group = [r for r in group if not self._expire(r)]
+                if not group:
+                    continue
+                # 마감이 없는 요청이 섞여 있으면 시간 제한 없이, 아니면 가장 늦은 마감까지 생성
+                deadlines = [r.deadline for r in group]
+                deadline = None if None in deadlines else max(deadlines)
+                try:
+                    with ExitStack() as stack:
+                        for profile in {r.profile for r in group if r.profile is not None}:
+                            stack.enter_context(attach_thread(profile))
+                        texts = self.generate_batch([r.messages for r in group], deadline=deadline, **group[0].gen_kwargs)
+                    for request, text in zip(group, texts):
+                        # 마감 이후 끝난 결과는 max_time 으로 잘렸을 수 있으므로 사용하지 않음
+                        if not self._expire(request):
+                            request.future.set_result(text)
+                except Exception as e:
+                    logger.exception("[LLM Batcher] 배치 생성 실패")
+                    for request in group:
+                        request.future.set_exception(e)
+
+    @staticmethod
+    def _expire(request: _PendingRequest) -> bool:
+        if request.deadline is None or remaining_budget(request.deadline) > 0:
+            return False
+        if not request.future.done():
+            request.future.set_exception(LatencyBudgetExceeded("코멘트 생성이 지연 예산을 초과했습니다."))
+        return True
+
+    def generate_batch(self, conversations: List[List[Dict]], deadline: Optional[float] = None,
+                       **gen_kwargs) -> List[str]:
+        """여러 대화를 왼쪽 패딩된 하나의 배치로 생성하고 새로 생성된 텍스트만 반환
+
+        행마다 첫 줄(또는 N 문장)이 끝나면 멈추고, deadline 이 있으면 남은 시간 안에서만 생성합니다.
+        """
+        with stage_timer("tokenize"):
+            prompts = [
+                self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+                for messages in conversations
+            ]
+            inputs = self.tokenizer(
+                prompts, return_tensors="pt", padding=True, add_special_tokens=False
+            ).to(self.model.device)
+
+        # 단건이면 고정 system 접두부의 KV 캐시를 재사용 (패딩 배치는 접두부 위치가 달라 제외)
+        if self.prefix_cache is not None and len(conversations) == 1:
+            past = self.prefix_cache.lookup(conversations[0], inputs["input_ids"])
+            if past is not None:
+                gen_kwargs = dict(gen_kwargs, past_key_values=past)
+
+        gen_kwargs["stopping_criteria"] = StoppingCriteriaList([CommentStoppingCriteria(self.tokenizer)])
+        if deadline is not None:
+            gen_kwargs["max_time"] = remaining_budget(deadline)
+
+        start = time.perf_counter()
+        with torch.inference_mode():
+            output_ids = self.model.generate(
+                **inputs, pad_token_id=self.tokenizer.pad_token_id, **gen_kwargs
+            )
+        elapsed = time.perf_counter() - start
+        observe_stage("generate", elapsed)
+        LLM_BATCH_SIZE.observe(len(prompts))
+        logger.info(f"[LLM Batcher] 배치 크기={len(prompts)}, 소요={elapsed:.2f}s")
+
+        new_tokens = output_ids[:, inputs["input_ids"].shape[1]:]
+        # 먼저 끝난 행의 뒤쪽은 pad 토큰으로 채워지므로 제외하고 계산
+        for count in (new_tokens != self.tokenizer.pad_token_id).sum(dim=1).tolist():
+            GENERATED_TOKENS.observe(count, LLM_INFERENCE_MODE)
+        with stage_timer("decode"):
+            return self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
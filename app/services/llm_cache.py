@@ -0,0 +1,105 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.config import LLM_CACHE_ENABLED, LLM_CACHE_MEMORY_SIZE, LLM_CACHE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """결정적(do_sample=False) LLM 응답 캐시 — 메모리 LRU + 재시작 후에도 유지되는 SQLite 저장소"""
+
+    def __init__(self, memory_size: int, path: Optional[str]):
+        self.memory_size = memory_size
+        self.path = path
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        if self._conn is None and self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+            conn = self._connect()
+            row = conn.execute("SELECT response FROM llm_responses WHERE key = ?", (key,)).fetchone() if conn else None
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, key: str, response: str):
+        with self._lock:
+            self._remember(key, response)
+            conn = self._connect()
+            if conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, response, created_at) VALUES (?, ?, ?)",
+                    (key, response, time.time()),
+                )
+                conn.commit()
+
+    def _remember(self, key: str, response: str):
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "memory_size": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+
+def is_cacheable(gen_kwargs: Dict) -> bool:
+    """샘플링을 하지 않는 생성만 같은 프롬프트에 같은 결과를 보장"""
+    return LLM_CACHE_ENABLED and gen_kwargs.get("do_sample") is False
+
+
+def make_key(messages: List[Dict], gen_kwargs: Dict, model_id: str) -> str:
+    """렌더링된 채팅 메시지 + 생성 옵션 + 모델 id 기준 캐시 키"""
+    payload = json.dumps(
+        {"model": model_id, "messages": messages, "kwargs": gen_kwargs},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def quantize(value, step: float):
+    """캐시 적중률을 높이기 위해 수치 입력을 step 단위로 반올림 (step 0 이면 그대로)"""
+    if not step or value is None:
+        return value
+    return round(float(value) / step) * step
+
+
+llm_cache = LLMResponseCache(LLM_CACHE_MEMORY_SIZE, LLM_CACHE_PATH)
@@ -1,35 +1,282 @@
-from transformers import pipeline
+from transformers import (
+    pipeline,
+    AutoTokenizer,
+    AutoModelForCausalLM,
+    TextIteratorStreamer,
+    StoppingCriteria,
+    StoppingCriteriaList,
+)
+from threading import Event
 import logging
+import queue
+import threading
+import torch
+from app.config import (
+    LLM_BATCH_ENABLED,
+    LLM_BATCH_MAX_SIZE,
+    LLM_BATCH_WAIT_MS,
+    LLM_INFERENCE_MODE,
+    LLM_MODEL_PATH,
+    LLM_PREFIX_CACHE_ENABLED,
+    LLM_PREFIX_CACHE_ENTRIES,
+    LLM_LOAD_ON_DEMAND,
+    WARMUP_ENABLED,
+)
+from app.services.llm_batcher import GenerationBatcher
+from app.services.llm_prefix_cache import PrefixKVCache
+from app.services.llm_stopping import CommentStoppingCriteria, LatencyBudgetExceeded, remaining_budget
+from app.services.llm_cache import llm_cache, is_cacheable, make_key
+from app.services.model_state import llm_state, ModelNotReadyError
+from app.services.execution_lanes import llm_lane, LaneTimeoutError
+from app.utils.llm_text import extract_generated_text
+from app.services.metrics import registry, Gauge, CollectedCounter, GENERATED_TOKENS, stage_timer
 
 logger = logging.getLogger(__name__)
 
-try:
-    logger.info("Loading Phi-3 model pipeline (this may take a while)...")
+MODEL_PATH = LLM_MODEL_PATH
+MODEL_NAME = "phi3-mini-4k-instruct"
 
-    generator = pipeline(
-        "text-generation",
-        model="./app/models/phi3-mini-4k-instruct",
-        model_kwargs={"dtype": "auto"},
-        device_map="auto"
-    )
+# auto: 기존 동작 (dtype/device 자동), fp32/bf16: CPU 정밀도 고정, int8: Linear 레이어 동적 양자화
+INFERENCE_MODES = ("auto", "fp32", "bf16", "int8")
+if LLM_INFERENCE_MODE not in INFERENCE_MODES:
+    raise ValueError(f"LLM_INFERENCE_MODE 는 {INFERENCE_MODES} 중 하나여야 합니다. (입력: {LLM_INFERENCE_MODE})")
+
+# 추론 모드를 모델 버전에 기록 (응답 model_version 및 LLM 캐시 키에 사용)
+MODEL_VERSION = MODEL_NAME if LLM_INFERENCE_MODE == "auto" else f"{MODEL_NAME}-{LLM_INFERENCE_MODE}"
+
+generator = None
+batcher = None
+prefix_cache = None
+_load_lock = threading.Lock()
+_background_lock = threading.Lock()
+_background_loader = None
+
+def build_pipeline(model_path: str, mode: str = "auto"):
+    """추론 모드에 맞게 모델을 로드해 text-generation 파이프라인 생성"""
+    if mode == "auto":
+        return pipeline(
+            "text-generation",
+            model=model_path,
+            model_kwargs={"dtype": "auto"},
+            device_map="auto"
+        )
+
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    dtype = torch.bfloat16 if mode == "bf16" else torch.float32
+    model = AutoModelForCausalLM.from_pretrained(model_path, dtype=dtype)
+    if mode == "int8":
+        # 가중치는 int8, 활성값은 실행 시점에 양자화 (CPU 전용)
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.eval()
+    return pipeline("text-generation", model=model, tokenizer=tokenizer)
+
+def load_llm():
+    """Phi-3 파이프라인 로드 (서버 시작 시 백그라운드에서 호출, 중복 호출 시 한 번만 로드)"""
+    global generator, batcher, prefix_cache
+
+    with _load_lock:
+        if llm_state.ready:
+            return generator
+
+        try:
+            llm_state.mark_loading()
+            logger.info(f"Loading Phi-3 model pipeline (mode={LLM_INFERENCE_MODE}, this may take a while)...")
+
+            generator = build_pipeline(MODEL_PATH, LLM_INFERENCE_MODE)
+
+            if LLM_PREFIX_CACHE_ENABLED:
+                prefix_cache = PrefixKVCache(generator.model, generator.tokenizer, max_entries=LLM_PREFIX_CACHE_ENTRIES)
+
+            batcher = GenerationBatcher(
+                generator.model,
+                generator.tokenizer,
+                max_batch_size=LLM_BATCH_MAX_SIZE,
+                max_wait_ms=LLM_BATCH_WAIT_MS,
+                prefix_cache=prefix_cache,
+            )
+
+            llm_state.mark_ready()
+            logger.info(f"Phi-3 model successfully loaded and ready to use. ({llm_state.load_seconds}s)")
+            return generator
+
+        except Exception as e:
+            llm_state.mark_failed(e)
+            logger.exception("Failed to load Phi-3 model.")
+            raise RuntimeError(f"Failed to initialize Phi-3 model: {e}")
+
+def warmup():
+    """짧은 생성을 한 번 수행해 첫 요청이 콜드 패스를 타지 않도록 함"""
+    llm_state.require_ready()
+    batcher.generate_batch([[{"role": "user", "content": "안녕하세요"}]], max_new_tokens=4, do_sample=False)
+
+def load_and_warmup():
+    """LLM 로드 후 (설정 시) 워밍업 — 서버 시작 시 또는 첫 사용 시 백그라운드에서 호출"""
+    try:
+        load_llm()
+        if WARMUP_ENABLED:
+            warmup()
+            llm_state.warmed_up = True
+            logger.info("[LLM] 워밍업 완료")
+    except Exception:
+        logger.exception("[LLM] 로드/워밍업 실패")
 
-    logger.info("Phi-3 model successfully loaded and ready to use.")
+def load_in_background():
+    """아직 로드를 시작하지 않았으면 백그라운드 로드 시작 (이미 로드 중/완료/실패면 무시)"""
+    global _background_loader
+    with _background_lock:
+        if llm_state.status != "not_loaded" or (_background_loader is not None and _background_loader.is_alive()):
+            return
+        logger.info("[LLM] 첫 사용 요청으로 백그라운드 로드를 시작합니다.")
+        _background_loader = threading.Thread(target=load_and_warmup, name="llm-loader", daemon=True)
+        _background_loader.start()
 
-except Exception as e:
-    logger.exception("Failed to load Phi-3 model.")
-    raise RuntimeError(f"Failed to initialize Phi-3 model: {e}")
+def require_llm():
+    """LLM 이 준비되지 않았으면 ModelNotReadyError (LLM_PRELOAD=false 면 첫 호출 시 로드 시작)"""
+    if LLM_LOAD_ON_DEMAND and llm_state.status == "not_loaded":
+        load_in_background()
+    llm_state.require_ready()
 
-def safe_generate(prompt: str, **kwargs):
+def safe_generate(prompt: str, deadline: float = None, **kwargs):
+    """캐시 → 배치 스케줄러(또는 파이프라인) 순으로 생성
+
+    deadline(time.monotonic 기준)까지 끝나지 않으면 LatencyBudgetExceeded 를 그대로 전달합니다.
+    """
     try:
-        result = generator(prompt, **kwargs)
+        # 결정적 생성은 같은 프롬프트에 같은 결과이므로 캐시 우선 조회
+        cache_key = None
+        if isinstance(prompt, list) and is_cacheable(kwargs):
+            cache_key = make_key(prompt, kwargs, MODEL_VERSION)
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return [{"generated_text": prompt + [{"role": "assistant", "content": cached}]}]
+
+        require_llm()
+        if deadline is not None and remaining_budget(deadline) <= 0:
+            raise LatencyBudgetExceeded("생성 시작 전에 지연 예산을 모두 사용했습니다.")
+
+        if LLM_BATCH_ENABLED and isinstance(prompt, list):
+            # 채팅 프롬프트는 스케줄러를 통해 다른 요청과 함께 배치 생성
+            reply = batcher.submit(prompt, deadline=deadline, **kwargs)
+            result = [{"generated_text": prompt + [{"role": "assistant", "content": reply}]}]
+        else:
+            pipeline_kwargs = dict(kwargs, stopping_criteria=StoppingCriteriaList([CommentStoppingCriteria(generator.tokenizer)]))
+            if deadline is not None:
+                pipeline_kwargs["max_time"] = remaining_budget(deadline)
+            with stage_timer("generate"):
+                result = generator(prompt, **pipeline_kwargs)
+            # max_time 으로 잘린 결과는 캐시하지 않고 예산 초과로 처리
+            if deadline is not None and remaining_budget(deadline) <= 0:
+                raise LatencyBudgetExceeded("코멘트 생성이 지연 예산을 초과했습니다.")
         text = result[0]["generated_text"]
 
         if isinstance(text, bytes):
             text = text.decode("utf-8", errors="ignore")
 
         result[0]["generated_text"] = text
+        if cache_key is not None:
+            llm_cache.put(cache_key, extract_generated_text(result))
         return result
 
+    except (ModelNotReadyError, LatencyBudgetExceeded):
+        raise
     except Exception as e:
         logger.exception("LLM generation error")
         return [{"generated_text": f"[LLM Error] {str(e)}"}]
+
+class _StopOnEvent(StoppingCriteria):
+    """스트림 소비 측이 중단을 요청하면 생성을 멈춤"""
+
+    def __init__(self, event: Event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return self.event.is_set()
+
+def stream_generate(messages, stop_event: Event = None, deadline: float = None, **kwargs):
+    """채팅 프롬프트를 생성하면서 새 텍스트 조각을 바로 반환하는 제너레이터
+
+    stop_event 가 설정되면 남은 토큰 생성을 중단하고,
+    deadline(time.monotonic 기준)까지 다음 조각이 오지 않으면 LatencyBudgetExceeded 를 발생시킵니다.
+    """
+    require_llm()
+    tokenizer = generator.tokenizer
+    model = generator.model
+    stop_event = stop_event or Event()
+    # 생성 스레드/레인에서 난 오류 (스트림은 정상 종료되므로 소비 측에서 다시 발생시킴)
+    failures = []
+
+    with stage_timer("tokenize"):
+        inputs = tokenizer.apply_chat_template(
+            messages, add_generation_prompt=True, return_tensors="pt", return_dict=True
+        ).to(model.device)
+    prompt_length = inputs["input_ids"].shape[1]
+    streamer = TextIteratorStreamer(
+        tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=remaining_budget(deadline)
+    )
+
+    def _generate():
+        try:
+            if deadline is not None:
+                # 레인 대기 중 예산을 다 쓴 경우 생성하지 않음
+                if remaining_budget(deadline) <= 0:
+                    streamer.end()
+                    return
+                kwargs["max_time"] = remaining_budget(deadline)
+            # 고정 system 접두부는 캐시된 KV 를 복사해 고객별 부분만 prefill
+            past = prefix_cache.lookup(messages, inputs["input_ids"]) if prefix_cache is not None else None
+            if past is not None:
+                kwargs["past_key_values"] = past
+            with stage_timer("generate"), torch.inference_mode():
+                output_ids = model.generate(
+                    **inputs,
+                    streamer=streamer,
+                    pad_token_id=tokenizer.pad_token_id,
+                    stopping_criteria=StoppingCriteriaList(
+                        [_StopOnEvent(stop_event), CommentStoppingCriteria(tokenizer)]
+                    ),
+                    **kwargs,
+                )
+            GENERATED_TOKENS.observe(output_ids.shape[1] - prompt_length, LLM_INFERENCE_MODE)
+        except Exception as e:
+            logger.exception("LLM streaming generation error")
+            failures.append(e)
+            streamer.end()
+
+    def _on_done(future):
+        # 마감 시간 초과로 시작하지 못한 경우에도 소비 측이 멈추지 않도록 스트림 종료
+        if future.cancelled():
+            failures.append(LatencyBudgetExceeded("스트리밍 생성이 시작 전에 취소되었습니다."))
+            streamer.end()
+        elif future.exception() is not None:
+            error = future.exception()
+            failures.append(LatencyBudgetExceeded(str(error)) if isinstance(error, LaneTimeoutError) else error)
+            streamer.end()
+
+    # 생성 스레드도 LLM 레인에서 실행해 동시 생성 수를 제한
+    llm_lane.submit(_generate).add_done_callback(_on_done)
+    try:
+        for chunk in streamer:
+            yield chunk
+        if failures:
+            raise failures[0]
+    except queue.Empty:
+        raise LatencyBudgetExceeded("스트리밍 생성이 지연 예산을 초과했습니다.")
+    finally:
+        # 클라이언트 연결 종료 등으로 소비가 끝나면 생성도 중단
+        stop_event.set()
+
+# 접두부 KV 캐시 재사용 현황
+registry.register(CollectedCounter(
+    "ai_llm_prefix_cache_total",
+    "Prompt prefix KV cache lookups by result",
+    ["result"],
+    collect=lambda: [((name,), prefix_cache.stats()[name]) for name in ("hits", "misses", "mismatches")]
+    if prefix_cache is not None else [],
+))
+
+# 배치 스케줄러 대기열에 쌓인 프롬프트 수
+registry.register(Gauge(
+    "ai_llm_batcher_queue_depth",
+    "Prompts waiting for the LLM batch scheduler",
+    collect=lambda: [((), batcher.queue_depth())] if batcher is not None else [],
+))
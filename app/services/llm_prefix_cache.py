@@ -0,0 +1,84 @@
+import copy
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixKVCache:
+    """서비스별 고정 system 프롬프트(지시문/규칙/예시) 접두부의 KV 캐시를 한 번만 계산해 재사용
+
+    요청마다 캐시를 깊은 복사해 generate 에 넘기면 모델은 고객별 user 메시지 부분만 prefill 합니다.
+    토큰 단위로 접두부가 정확히 일치할 때만 사용하므로 결과는 전체 prefill 과 같습니다.
+    왼쪽 패딩 배치에서는 접두부 위치가 행마다 달라지므로 단건 생성에만 적용합니다.
+    """
+
+    def __init__(self, model, tokenizer, max_entries: int = 4):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()  # system 메시지 -> (접두부 토큰, KV 캐시)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.mismatches = 0
+
+    @staticmethod
+    def _prefix_messages(messages: List[Dict]) -> List[Dict]:
+        prefix = []
+        for message in messages:
+            if message.get("role") != "system":
+                break
+            prefix.append(message)
+        return prefix
+
+    def _compute(self, prefix: List[Dict]):
+        text = self.tokenizer.apply_chat_template(prefix, tokenize=False)
+        prefix_ids = self.tokenizer(text, return_tensors="pt", add_special_tokens=False)["input_ids"].to(self.model.device)
+        with torch.inference_mode():
+            output = self.model(input_ids=prefix_ids, use_cache=True)
+        logger.info(f"[Prefix KV Cache] 접두부 {prefix_ids.shape[1]} 토큰 캐시 생성")
+        return prefix_ids[0], output.past_key_values
+
+    def lookup(self, messages: List[Dict], input_ids: torch.Tensor):
+        """input_ids (1, L) 의 앞부분이 캐시된 접두부와 같으면 KV 캐시 복사본 반환 (아니면 None)"""
+        prefix = self._prefix_messages(messages)
+        if not prefix or input_ids.shape[0] != 1:
+            return None
+
+        key = json.dumps(prefix, ensure_ascii=False, sort_keys=True)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                # 같은 접두부를 여러 요청이 동시에 계산하지 않도록 락 안에서 한 번만 계산
+                entry = self._entries[key] = self._compute(prefix)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self.hits += 1
+            self._entries.move_to_end(key)
+
+        prefix_ids, cache = entry
+        length = prefix_ids.shape[0]
+        if input_ids.shape[1] <= length or not torch.equal(input_ids[0, :length], prefix_ids):
+            # 토크나이저 경계가 달라진 경우 등은 전체 prefill 로 처리
+            with self._lock:
+                self.mismatches += 1
+            return None
+        # generate 가 캐시에 새 토큰을 덧붙이므로 요청마다 복사본 사용
+        return copy.deepcopy(cache)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "mismatches": self.mismatches,
+            }
@@ -1,24 +1,57 @@
+from typing import Tuple
 from app.services.llm_loader import safe_generate
+from app.services.llm_cache import quantize
+from app.services.llm_stopping import LatencyBudgetExceeded
+from app.utils.llm_text import extract_generated_text, clean_comment
+from app.services.metrics import timed_stage, stage_timer, LLM_COMMENTS
+from app.config import LLM_CACHE_AMOUNT_STEP, LLM_CACHE_PERCENT_STEP, LLM_CACHE_PROBABILITY_STEP
 
-def generate_loan_comment(data: dict) -> str:
+GENERATION_KWARGS = dict(max_new_tokens=250, temperature=0.4, top_p=0.9, do_sample=False)
+
+# 요청마다 바뀌지 않는 지시문/규칙/예시는 system 메시지에 모아 두어
+# 공통 프롬프트 접두부의 KV 캐시를 재사용할 수 있게 함 (고객 데이터는 user 메시지에만)
+SYSTEM_PROMPT = (
+    "You are a financial assistant for a Korean retail banking app. "
+    "Write short, polite, and natural comments in Korean (~습니다 style). "
+    "Avoid redundant phrases such as '즉', '따라서', '결과적으로'. "
+    "The comment should sound like a professional banking insight, not a report.\n\n"
+    "Output Rules:\n"
+    "1. Respond only in Korean.\n"
+    "2. Write exactly one or two sentences.\n"
+    "3. Be concise and avoid repeated or filler words.\n"
+    "4. Use clear, factual tone (~습니다 style).\n"
+    "5. Do not use connectors like '즉', '따라서', '결과적으로'.\n"
+    "6. End with a full Korean sentence.\n\n"
+    "Example outputs:\n"
+    "- 상환 진척률이 높고 연체 위험이 낮아 안정적인 상태입니다.\n"
+    "- 연체 가능성이 있어 납입 일정을 꾸준히 유지하는 것이 좋습니다."
+)
+
+def build_loan_template(data: dict) -> str:
+    """LLM 없이 연체 확률/상환 진척률/납입일만으로 만드는 결정적 코멘트 (지연 예산 초과·빈 응답 시 사용)"""
+    probability = float(data.get("delinquency_probability") or 0)
+    repay = float(data.get("repayment_ratio") or 0)
+    due = data.get("next_due_date") or "다음"
+
+    if probability >= 0.5:
+        return f"연체 가능성이 높아 {due} 납입일 전에 상환 계획을 점검하시는 것이 좋습니다."
+    if probability >= 0.2:
+        return f"연체 가능성이 있어 {due} 납입 일정을 꾸준히 유지하시는 것이 좋습니다."
+    return f"상환 진척률이 {repay:.1f}%이고 연체 위험이 낮아 안정적인 상태입니다."
+
+@timed_stage("prompt_render")
+def prepare_loan_prompt(data: dict):
+    """대출 정보로 LLM 메시지와 기본 문구(정형 코멘트)를 구성"""
     loan_name = data.get("loan_name", "대출 상품")
-    rate = data.get("interest_rate", 0)
-    repay = data.get("repayment_ratio", 0)
-    delinquency = data.get("delinquency_probability", 0)
+    rate = quantize(data.get("interest_rate", 0), LLM_CACHE_PERCENT_STEP)
+    repay = quantize(data.get("repayment_ratio", 0), LLM_CACHE_PERCENT_STEP)
+    delinquency = quantize(data.get("delinquency_probability", 0), LLM_CACHE_PROBABILITY_STEP)
     due = data.get("next_due_date", "")
-    remain = data.get("remaining_principal", 0)
-    total = data.get("principal_amount", 0)
+    remain = quantize(data.get("remaining_principal", 0), LLM_CACHE_AMOUNT_STEP)
+    total = quantize(data.get("principal_amount", 0), LLM_CACHE_AMOUNT_STEP)
 
     messages = [
-        {
-            "role": "system",
-            "content": (
-                "You are a financial assistant for a Korean retail banking app. "
-                "Write short, polite, and natural comments in Korean (~습니다 style). "
-                "Avoid redundant phrases such as '즉', '따라서', '결과적으로'. "
-                "The comment should sound like a professional banking insight, not a report."
-            ),
-        },
+        {"role": "system", "content": SYSTEM_PROMPT},
         {
             "role": "user",
             "content": (
@@ -29,45 +62,23 @@ def generate_loan_comment(data: dict) -> str:
                 f"- Delinquency Probability: {delinquency:.2f}\n"
                 f"- Next Due Date: {due}\n"
                 f"- Remaining Principal: {remain:,.0f}원 / Total: {total:,.0f}원\n\n"
-                "Output Rules:\n"
-                "1. Respond only in Korean.\n"
-                "2. Write exactly one or two sentences.\n"
-                "3. Be concise and avoid repeated or filler words.\n"
-                "4. Use clear, factual tone (~습니다 style).\n"
-                "5. Do not use connectors like '즉', '따라서', '결과적으로'.\n"
-                "6. End with a full Korean sentence.\n\n"
-                "Example outputs:\n"
-                "- 상환 진척률이 높고 연체 위험이 낮아 안정적인 상태입니다.\n"
-                "- 연체 가능성이 있어 납입 일정을 꾸준히 유지하는 것이 좋습니다.\n\n"
                 "Answer:"
             ),
         },
     ]
 
-    result = safe_generate(messages, max_new_tokens=250, temperature=0.4, top_p=0.9, do_sample=False)
-
-    text = ""
-    if isinstance(result, list):
-        if isinstance(result[0], dict):
-            gen_text = result[0].get("generated_text", "")
-            if isinstance(gen_text, list) and len(gen_text) > 0:
-                last_msg = gen_text[-1]
-                if isinstance(last_msg, dict) and "content" in last_msg:
-                    text = last_msg["content"]
-                else:
-                    text = str(last_msg)
-            else:
-                text = str(gen_text)
-    elif isinstance(result, dict):
-        text = result.get("generated_text", "")
-    elif isinstance(result, str):
-        text = result
-
-    if not isinstance(text, str):
-        text = str(text)
-
-    comment = text.strip().split("\n")[0].replace("�", "").strip()
-    if len(comment) < 5:
-        comment = "대출 상환이 안정적으로 진행되고 있습니다."
+    return messages, build_loan_template(data)
 
-    return comment
+def generate_loan_comment(data: dict, deadline: float = None) -> Tuple[str, str]:
+    """(코멘트, 출처) 반환 — 출처는 llm 또는 지연 예산 초과/빈 응답 시 template"""
+    messages, fallback = prepare_loan_prompt(data)
+    try:
+        result = safe_generate(messages, deadline=deadline, **GENERATION_KWARGS)
+    except LatencyBudgetExceeded:
+        LLM_COMMENTS.inc("template")
+        return fallback, "template"
+    with stage_timer("cleanup"):
+        comment = clean_comment(extract_generated_text(result), fallback)
+    source = "template" if comment == fallback else "llm"
+    LLM_COMMENTS.inc(source)
+    return comment, source
@@ -1,62 +1,170 @@
+from typing import Optional, Tuple
+import numpy as np
 from app.services.llm_loader import safe_generate
+from app.services.llm_cache import quantize
+from app.services.llm_stopping import LatencyBudgetExceeded
+from app.utils.llm_text import extract_generated_text, clean_comment
+from app.services.metrics import timed_stage, stage_timer, LLM_COMMENTS
+from app.services.peer_stats import get_peer_index, age_band, age_band_label
+from app.config import LLM_CACHE_AMOUNT_STEP
 
-def generate_spending_comment(
-    spending_data: dict,
-    avg_spending_data: dict,
-    peer_age: str = "20대 후반"
+GENERATION_KWARGS = dict(max_new_tokens=250, temperature=0.4, top_p=0.9, do_sample=False)
+
+# 정형 코멘트에 쓰는 소비 항목 한글명
+CATEGORY_LABELS = {
+    "interior_am": "인테리어",
+    "insuhos_am": "보험/병원",
+    "offedu_am": "교육",
+    "trvlec_am": "여행/레저",
+    "fsbz_am": "식비",
+    "svcarc_am": "서비스",
+    "plsanit_am": "생활용품",
+    "clothgds_am": "의류",
+    "auto_am": "자동차",
+}
+# 나이 정보도 또래 통계도 없을 때의 비교 대상 이름
+DEFAULT_PEER_GROUP = "또래"
+# 이 비율(%) 미만의 차이는 '비슷한 수준' 으로 표현
+SIMILAR_PCT = 5
+
+# 요청마다 바뀌지 않는 지시문/규칙/예시는 system 메시지에 모아 두어
+# 공통 프롬프트 접두부의 KV 캐시를 재사용할 수 있게 함 (고객 데이터는 user 메시지에만)
+SYSTEM_PROMPT = (
+    "You are a financial advisor for a Korean personal finance app. "
+    "Write short, polite, and natural comments in Korean (~습니다 style). "
+    "Summarize how the user's spending compares to their peer group. "
+    "Avoid redundant connectors like '즉', '따라서', '결과적으로'. "
+    "Keep the tone factual, clear, and concise — similar to a banking app insight.\n\n"
+    "Output Rules:\n"
+    "1. Respond only in Korean.\n"
+    "2. Write 1–2 sentences.\n"
+    "3. Always include the peer group in the sentence (예: '20대 후반, 월 300~400만 원대 소비자 평균보다...').\n"
+    "4. Mention categories that stand out (높거나 낮은 항목).\n"
+    "5. Use a polite and factual tone (~습니다 style).\n"
+    "6. Avoid '즉', '따라서', '결과적으로'.\n\n"
+    "Example outputs:\n"
+    "- 20대 후반 소비자 평균과 비슷한 수준입니다.\n"
+    "- 20대 후반 평균보다 식비가 10% 높으며, 교통비는 평균보다 낮습니다."
+)
+
+def build_spending_template(
+    peer_age: str,
+    ratio: float,
+    total_pct_diff: Optional[float],
+    top_diff_cat: Optional[str],
+    top_diff_val: Optional[float],
 ) -> str:
+    """LLM 없이 계산된 비교 지표(소득 대비 비율, 또래 대비 차이)만으로 만드는 결정적 코멘트"""
+    sentences = []
+    if total_pct_diff is None:
+        if ratio:
+            sentences.append(f"이번 달 지출은 월 소득의 {ratio * 100:.0f}% 수준입니다.")
+        else:
+            sentences.append(f"{peer_age} 소비자 평균과 유사한 수준입니다.")
+    elif abs(total_pct_diff) < SIMILAR_PCT:
+        sentences.append(f"{peer_age} 소비자 평균과 비슷한 수준으로 지출하셨습니다.")
+    else:
+        direction = "많이" if total_pct_diff > 0 else "적게"
+        sentences.append(f"{peer_age} 소비자 평균보다 {abs(total_pct_diff):.1f}% {direction} 지출하셨습니다.")
+
+    if top_diff_cat is not None and abs(top_diff_val) >= SIMILAR_PCT:
+        label = CATEGORY_LABELS.get(top_diff_cat, top_diff_cat)
+        direction = "높습니다" if top_diff_val > 0 else "낮습니다"
+        sentences.append(f"{label} 지출은 평균보다 {abs(top_diff_val):.1f}% {direction}.")
+    return " ".join(sentences)
+
+def category_pct_diffs(user: np.ndarray, peer: np.ndarray) -> np.ndarray:
+    """카테고리별 또래 대비 차이(%) — 또래 금액이 0 이하인 항목은 nan"""
+    valid = peer > 0
+    return np.where(valid, (user - peer) / np.where(valid, peer, 1.0) * 100, np.nan)
+
+def resolve_peer_group(salary, avg_spending_data: Optional[dict], age: Optional[int], sex: Optional[int]):
+    """비교 대상 또래 그룹 결정: (또래 그룹 이름, 또래 통계 버킷 또는 None)
+
+    요청에 평균 소비 데이터가 있으면 그대로 쓰고, 없으면 서버의 또래 통계 색인에서
+    나이대/성별/소득 구간 버킷을 찾습니다.
     """
-    사용자 소비 데이터를 또래 평균 소비 데이터와 비교하여 코멘트를 생성합니다.
-    예: '20대 후반 소비자 평균보다 식비를 12% 더 많이 쓰셨습니다.'
-    """
+    if avg_spending_data:
+        return (age_band_label(age_band(age)) if age is not None else DEFAULT_PEER_GROUP), None
+    index = get_peer_index()
+    bucket = index.lookup(age, sex, salary) if index is not None else None
+    if bucket is None:
+        return DEFAULT_PEER_GROUP, None
+    return bucket.label, bucket
+
+@timed_stage("prompt_render")
+def prepare_spending_prompt(
+    spending_data: dict,
+    avg_spending_data: Optional[dict] = None,
+    age: Optional[int] = None,
+    sex: Optional[int] = None,
+):
+    """소비 데이터로 LLM 메시지와 기본 문구(정형 코멘트)를 구성"""
+    # 평균 소비 데이터 없이(None) 호출되면 서버 또래 통계로 비교
+    avg_spending_data = avg_spending_data or {}
+
+    # 캐시 적중률을 위해 금액을 설정된 단위로 반올림
+    spending_data = {k: quantize(v, LLM_CACHE_AMOUNT_STEP) for k, v in spending_data.items()}
+    avg_spending_data = {k: quantize(v, LLM_CACHE_AMOUNT_STEP) for k, v in avg_spending_data.items()}
 
     # 수입 및 소비 항목 분리
     salary = spending_data.get("income", 0)
     spending = {k: v for k, v in spending_data.items() if k != "income"}
-    peer_spending = avg_spending_data or {}
+    peer_age, bucket = resolve_peer_group(salary, avg_spending_data, age, sex)
+
+    # 또래 평균 (서버 통계 버킷이면 색인의 카테고리 순서 배열을 그대로 사용)
+    if bucket is not None:
+        index = get_peer_index()
+        categories = index.categories
+        peer = bucket.mean
+        peer_spending = bucket.mean_dict(categories)
+    else:
+        categories = list(spending)
+        peer_spending = {k: v for k, v in avg_spending_data.items() if k != "income"}
+        peer = np.array([float(peer_spending.get(cat) or 0) for cat in categories])
+    user = np.array([float(spending.get(cat) or 0) for cat in categories])
 
     total_spend = sum(spending.values())
     ratio = round(total_spend / salary, 2) if salary else 0
 
     # 전체 소비 비교
-    peer_total = sum(peer_spending.values()) if peer_spending else 0
+    peer_total = float(peer.sum())
     peer_info = ""
+    pct_diff = None
     if peer_total > 0:
-        diff = total_spend - peer_total
+        diff = float(total_spend) - peer_total
         pct_diff = (diff / peer_total * 100)
         peer_info = f"또래 평균 대비 {abs(pct_diff):.1f}% {'많이' if pct_diff > 0 else '적게'} 소비"
 
-    # 카테고리별 비교
-    category_diffs = {}
-    for cat, val in spending.items():
-        peer_val = peer_spending.get(cat, 0)
-        if peer_val > 0:
-            pct = (val - peer_val) / peer_val * 100
-            category_diffs[cat] = pct
-
-    if category_diffs:
-        top_diff_cat = max(category_diffs, key=lambda k: abs(category_diffs[k]))
-        top_diff_val = category_diffs[top_diff_cat]
+    # 카테고리별 비교 (벡터 연산)
+    category_diffs = category_pct_diffs(user, peer)
+
+    top_diff_cat = top_diff_val = None
+    if not np.isnan(category_diffs).all():
+        top = int(np.nanargmax(np.abs(category_diffs)))
+        top_diff_cat = categories[top]
+        top_diff_val = float(category_diffs[top])
         peer_summary = f"{top_diff_cat} 항목에서 또래보다 {abs(top_diff_val):.1f}% {'많이' if top_diff_val > 0 else '적게'} 사용"
     else:
         peer_summary = "카테고리 비교 정보 없음"
 
+    # 또래 통계 버킷이 있으면 항목별 백분위 위치도 함께 제공
+    positions = {}
+    if bucket is not None:
+        positions = dict(zip(categories, index.percentile_floor(bucket, user).tolist()))
+
+    def breakdown(cat, val):
+        position = positions.get(cat)
+        suffix = f" (또래 {position:.0f}백분위 이상)" if position else ""
+        return f"- {cat}: {val:,.0f}원{suffix}"
+
     # 가장 지출 많은 항목
     top_category = max(spending, key=spending.get)
     top_amount = spending[top_category]
 
     # LLM 프롬프트
     messages = [
-        {
-            "role": "system",
-            "content": (
-                "You are a financial advisor for a Korean personal finance app. "
-                "Write short, polite, and natural comments in Korean (~습니다 style). "
-                "Summarize how the user's spending compares to their peer group. "
-                "Avoid redundant connectors like '즉', '따라서', '결과적으로'. "
-                "Keep the tone factual, clear, and concise — similar to a banking app insight."
-            ),
-        },
+        {"role": "system", "content": SYSTEM_PROMPT},
         {
             "role": "user",
             "content": (
@@ -68,48 +176,43 @@ def generate_spending_comment(
                 f"- Peer Comparison: {peer_info or '정보 없음'}\n"
                 f"- Key Peer Category: {peer_summary or '정보 없음'}\n\n"
                 "[User Category Breakdown]\n" +
-                "\n".join([f"- {cat}: {val:,.0f}원" for cat, val in spending.items()]) +
+                "\n".join([breakdown(cat, val) for cat, val in spending.items()]) +
                 ("\n\n[Peer Average Spending]\n" + "\n".join(
                     [f"- {cat}: {val:,.0f}원" for cat, val in peer_spending.items()]
                 ) if peer_spending else "") +
-                "\n\nOutput Rules:\n"
-                "1. Respond only in Korean.\n"
-                "2. Write 1–2 sentences.\n"
-                "3. Always include the peer group in the sentence (예: '20대 후반, 월 300~400만 원대 소비자 평균보다...').\n"
-                "4. Mention categories that stand out (높거나 낮은 항목).\n"
-                "5. Use a polite and factual tone (~습니다 style).\n"
-                "6. Avoid '즉', '따라서', '결과적으로'.\n\n"
-                "Example outputs:\n"
-                "- 20대 후반 소비자 평균과 비슷한 수준입니다.\n"
-                "- 20대 후반 평균보다 식비가 10% 높으며, 교통비는 평균보다 낮습니다.\n\n"
-                "Answer:"
+                "\n\nAnswer:"
             ),
         },
     ]
 
+    return messages, build_spending_template(peer_age, ratio, pct_diff, top_diff_cat, top_diff_val)
+
+def generate_spending_comment(
+    spending_data: dict,
+    avg_spending_data: Optional[dict] = None,
+    age: Optional[int] = None,
+    sex: Optional[int] = None,
+    deadline: float = None,
+) -> Tuple[str, str]:
+    """
+    사용자 소비 데이터를 또래 평균 소비 데이터와 비교하여 (코멘트, 출처)를 반환합니다.
+    평균 소비 데이터가 없으면 나이/성별/소득으로 서버 또래 통계를 조회합니다.
+    예: '20대 후반 소비자 평균보다 식비를 12% 더 많이 쓰셨습니다.'
+    지연 예산을 넘기거나 응답이 비어 있으면 정형 코멘트를 출처 template 으로 반환합니다.
+    """
+    avg_spending_data = avg_spending_data or {}
+    messages, fallback = prepare_spending_prompt(spending_data, avg_spending_data, age, sex)
+
     # LLM 호출
-    result = safe_generate(messages, max_new_tokens=250, temperature=0.4, top_p=0.9, do_sample=False)
+    try:
+        result = safe_generate(messages, deadline=deadline, **GENERATION_KWARGS)
+    except LatencyBudgetExceeded:
+        LLM_COMMENTS.inc("template")
+        return fallback, "template"
 
     # 결과 정제
-    text = ""
-    if isinstance(result, list):
-        if isinstance(result[0], dict):
-            gen_text = result[0].get("generated_text", "")
-            if isinstance(gen_text, list) and len(gen_text) > 0:
-                last_msg = gen_text[-1]
-                text = last_msg.get("content", str(last_msg)) if isinstance(last_msg, dict) else str(last_msg)
-            else:
-                text = str(gen_text)
-    elif isinstance(result, dict):
-        text = result.get("generated_text", "")
-    elif isinstance(result, str):
-        text = result
-
-    if not isinstance(text, str):
-        text = str(text)
-
-    comment = text.strip().split("\n")[0].replace("�", "").strip()
-    if len(comment) < 5:
-        comment = f"{peer_age} 소비자 평균과 유사한 수준입니다."
-
-    return comment
+    with stage_timer("cleanup"):
+        comment = clean_comment(extract_generated_text(result), fallback)
+    source = "template" if comment == fallback else "llm"
+    LLM_COMMENTS.inc(source)
+    return comment, source
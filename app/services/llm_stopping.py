@@ -0,0 +1,48 @@
+import time
+from typing import Optional
+
+import torch
+from transformers import StoppingCriteria
+
+from app.config import LLM_LATENCY_BUDGET_SECONDS, LLM_MAX_SENTENCES
+from app.utils.llm_text import comment_complete
+
+
+class LatencyBudgetExceeded(TimeoutError):
+    """요청별 코멘트 생성 지연 예산 안에 생성이 끝나지 못함 (정형 문구로 대체)"""
+
+
+def budget_deadline(budget_seconds: float = LLM_LATENCY_BUDGET_SECONDS) -> Optional[float]:
+    """요청 도착 시점 기준 생성 마감 시각 (time.monotonic 기준, 예산 0 이면 None)"""
+    return time.monotonic() + budget_seconds if budget_seconds > 0 else None
+
+
+def remaining_budget(deadline: Optional[float]) -> Optional[float]:
+    """마감까지 남은 시간(초, 음수면 0), 마감이 없으면 None"""
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+class CommentStoppingCriteria(StoppingCriteria):
+    """첫 줄이 끝났거나 N 문장이 완성된 행은 생성 중단
+
+    코멘트는 첫 줄(최대 N 문장)만 사용하므로 이후 토큰은 계산해도 버려집니다.
+    배치의 행마다 판단해 끝난 행만 멈추며, 프롬프트 길이는 첫 호출 시점의 입력 길이로 정합니다.
+    """
+
+    def __init__(self, tokenizer, max_sentences: int = LLM_MAX_SENTENCES):
+        self.tokenizer = tokenizer
+        self.max_sentences = max_sentences
+        self.prompt_length = None
+
+    def __call__(self, input_ids, scores, **kwargs):
+        if self.prompt_length is None:
+            # 첫 호출 시에는 새 토큰이 하나 붙은 상태
+            self.prompt_length = input_ids.shape[1] - 1
+        texts = self.tokenizer.batch_decode(input_ids[:, self.prompt_length:], skip_special_tokens=True)
+        return torch.tensor(
+            [comment_complete(text, self.max_sentences) for text in texts],
+            dtype=torch.bool,
+            device=input_ids.device,
+        )
@@ -0,0 +1,81 @@
+import json
+import logging
+from threading import Event
+from typing import Dict, Iterator, List
+
+from app.services.llm_loader import stream_generate
+from app.services.llm_cache import llm_cache, is_cacheable, make_key
+from app.services.llm_stopping import LatencyBudgetExceeded, remaining_budget
+from app.utils.llm_text import FirstLineStream, clean_comment
+from app.services.metrics import stage_timer, LLM_COMMENTS
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event: str, data: Dict) -> str:
+    """Server-Sent Events 형식 문자열 생성"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def stream_comment_events(messages: List[Dict], fallback: str, model_version: str, deadline: float = None,
+                          **gen_kwargs) -> Iterator[str]:
+    """생성 토큰을 token 이벤트로 흘려보내고, 마지막에 정제된 코멘트를 done 이벤트로 전송
+
+    첫 줄이 끝나면 생성을 바로 중단하며, 최종 코멘트는 비스트리밍 응답과 같은 규칙으로 정제됩니다.
+    deadline 까지 코멘트가 끝나지 않으면 done 이벤트에 정형 코멘트(source=template)를 보냅니다.
+    """
+    first_line = FirstLineStream()
+    budget_exceeded = False
+    cache_key = make_key(messages, gen_kwargs, model_version) if is_cacheable(gen_kwargs) else None
+    cached = llm_cache.get(cache_key) if cache_key else None
+
+    if cached is not None:
+        for piece in first_line.feed(cached):
+            yield sse_event("token", {"text": piece})
+    else:
+        stop_event = Event()
+        try:
+            for chunk in stream_generate(messages, stop_event=stop_event, deadline=deadline, **gen_kwargs):
+                for piece in first_line.feed(chunk):
+                    yield sse_event("token", {"text": piece})
+                if first_line.finished:
+                    stop_event.set()
+                    break
+            # max_time 으로 끊긴 경우 (코멘트가 끝나기 전에 마감 도달)
+            if not first_line.finished and deadline is not None and remaining_budget(deadline) <= 0:
+                raise LatencyBudgetExceeded("스트리밍 생성이 지연 예산을 초과했습니다.")
+            # 첫 줄까지 정상 생성되고 정제 결과가 정형 코멘트가 아닌 경우에만 저장
+            # (생성 오류/중단으로 비었거나 잘린 텍스트가 캐시되어 이후 요청이 계속 정형 코멘트를 받지 않도록)
+            if cache_key and first_line.finished and clean_comment(first_line.text, fallback) != fallback:
+                llm_cache.put(cache_key, first_line.text)
+        except LatencyBudgetExceeded:
+            budget_exceeded = True
+        except Exception as e:
+            logger.exception("LLM streaming error")
+            yield sse_event("error", {"detail": str(e)})
+        finally:
+            stop_event.set()
+
+    if budget_exceeded:
+        comment = fallback
+    else:
+        with stage_timer("cleanup"):
+            comment = clean_comment(first_line.text, fallback)
+    source = "template" if comment == fallback else "llm"
+    LLM_COMMENTS.inc(source)
+    yield sse_event("done", {
+        "comment": comment,
+        "model_version": model_version,
+        "source": source,
+    })
+
+
+def precomputed_events(comment: str, model_version: str) -> Iterator[str]:
+    """미리 생성해 둔 코멘트를 스트리밍 응답과 같은 이벤트 형식으로 한 번에 전송"""
+    LLM_COMMENTS.inc("precomputed")
+    yield sse_event("token", {"text": comment})
+    yield sse_event("done", {
+        "comment": comment,
+        "model_version": model_version,
+        "source": "precomputed",
+    })
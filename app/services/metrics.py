@@ -0,0 +1,235 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Prometheus 텍스트 포맷(0.0.4) 으로 내보내는 최소 메트릭 구현 (외부 의존성 없음)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 초 단위 지연 버킷 (토크나이저 수 ms ~ CPU 생성 수십 초까지)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (1, 5, 10, 25, 50, 100, 150, 200, 250, 500)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Tuple) -> Tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: 라벨 {self.labelnames} 이 필요합니다. (입력: {labels})")
+        return tuple(str(v) for v in labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """값을 직접 기록하거나, 수집 시점에 콜백으로 읽어오는 게이지"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Callable[[], Iterable[Tuple[Tuple, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._collect = collect
+
+    def set(self, value: float, *labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> List[str]:
+        if self._collect is not None:
+            items = [(self._key(tuple(labels)), value) for labels, value in self._collect() if value is not None]
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in sorted(items)
+        ]
+
+
+class CollectedCounter(Gauge):
+    """다른 객체가 이미 누적하고 있는 값을 수집 시점에 읽어오는 카운터"""
+
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 조합 -> [버킷별 개수(누적 아님) + +Inf, 합계]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        lines = self.header()
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    "ai_stage_duration_seconds",
+    "Latency of each scoring/generation stage",
+    ["stage"],
+))
+SCHEMA_VALIDATION_SECONDS = registry.register(Histogram(
+    "ai_schema_validation_duration_seconds",
+    "Latency of request schema validation",
+    ["schema"],
+))
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "ai_http_request_duration_seconds",
+    "End-to-end HTTP request latency (streaming responses: until headers are sent)",
+    ["method", "handler", "status"],
+))
+LANE_WAIT_SECONDS = registry.register(Histogram(
+    "ai_lane_wait_duration_seconds",
+    "Time a task waited in an execution lane queue before starting",
+    ["lane"],
+))
+GENERATED_TOKENS = registry.register(Histogram(
+    "ai_llm_generated_tokens",
+    "Generated tokens per LLM completion",
+    ["mode"],
+    buckets=TOKEN_BUCKETS,
+))
+PREDICTED_ROWS = registry.register(Counter(
+    "ai_predicted_rows_total",
+    "Rows scored, by whether the probability came from the prediction cache or the model",
+    ["source"],
+))
+LLM_COMMENTS = registry.register(Counter(
+    "ai_llm_comments_total",
+    "Insight comments returned, by source (llm, deterministic template fallback, or precomputed by a job)",
+    ["source"],
+))
+HISTORY_FEATURES = registry.register(Counter(
+    "ai_history_features_total",
+    "Scored rows by where the diff/pct-change features came from "
+    "(caller, derived from stored history, first quarter, default zeros without customer_id, store error)",
+    ["source"],
+))
+HISTORY_WRITES = registry.register(Counter(
+    "ai_history_writes_total",
+    "Background customer history writes, by result (written, dropped because the writer queue was full, error)",
+    ["result"],
+))
+LLM_BATCH_SIZE = registry.register(Histogram(
+    "ai_llm_batch_size",
+    "Prompts per batched generate call",
+    buckets=(1, 2, 4, 8, 16, 32),
+))
+
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """with 블록 실행 시간을 stage 지연 히스토그램에 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage)
+
+
+def timed_stage(stage: str):
+    """함수 실행 시간을 stage 지연 히스토그램에 기록하는 데코레이터"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,48 +1,58 @@
-import joblib
-import json
 import logging
 import threading
+from app.config import XGB_MODEL_PATH, XGB_ENCODE_MAP_PATH, XGB_THRESHOLD, XGB_MODEL_VERSION
+from app.services.model_registry import ModelBundle, load_bundle, model_registry
+from app.services.model_state import xgb_state
 
-MODEL_PATH = "app/models/xgb_delinquency_model_v2.pkl"
-ENCODE_MAP_PATH = "app/models/category_encoding_map_v2.json"
+# 시작 시 활성화되는 기본 모델 (이후 버전은 /models API 로 교체)
+MODEL_PATH = XGB_MODEL_PATH
+ENCODE_MAP_PATH = XGB_ENCODE_MAP_PATH
+THRESHOLD = XGB_THRESHOLD
+MODEL_VERSION = XGB_MODEL_VERSION
 
 logger = logging.getLogger(__name__)
 
-bst = None
-encoding_maps = None
-THRESHOLD = 0.88
-MODEL_VERSION = "xgb_delinquency_model_v2"
-
 _model_lock = threading.Lock()
 
-def load_model():
-    global bst, encoding_maps
+def add_load_listener(listener):
+    """활성 모델이 바뀔 때 호출될 콜백 등록 (새 ModelBundle 을 인자로 받음)"""
+    model_registry.add_listener(listener)
 
+def load_model() -> ModelBundle:
     # 이미 로드된 경우 빠르게 반환
-    if bst is not None and encoding_maps is not None:
+    bundle = model_registry.active()
+    if bundle is not None:
         logger.debug("[Model Loader] 캐시된 모델 반환 중...")
-        return bst, encoding_maps
+        return bundle
 
     # 모델 로드 구간 보호
     with _model_lock:
         # 다른 스레드가 이미 로드했는지 한 번 더 확인
-        if bst is not None and encoding_maps is not None:
+        bundle = model_registry.active()
+        if bundle is not None:
             logger.debug("[Model Loader] 락 내에서 이미 모델 로드 완료 — 캐시 사용")
-            return bst, encoding_maps
+            return bundle
 
         try:
+            xgb_state.mark_loading()
             logger.info("[Model Loader] XGBoost 모델 및 인코딩 맵 로드 중...")
-            bst = joblib.load(MODEL_PATH)
-            with open(ENCODE_MAP_PATH, "r", encoding="utf-8") as f:
-                encoding_maps = json.load(f)
+            bundle = load_bundle(MODEL_VERSION, MODEL_PATH, ENCODE_MAP_PATH, THRESHOLD)
             logger.info(f"[Model Loader] 모델 로드 완료 ({MODEL_VERSION}), Threshold={THRESHOLD}")
-            return bst, encoding_maps
+            model_registry.activate(bundle)
+            xgb_state.mark_ready()
+            return bundle
         except Exception as e:
+            xgb_state.mark_failed(e)
             logger.exception(f"[Model Loader] 모델 로드 실패: {e}")
             raise RuntimeError("모델 로드 중 오류 발생")
 
+def get_bundle() -> ModelBundle:
+    """현재 활성 모델 번들 (요청마다 한 번만 읽어 끝까지 사용)"""
+    return model_registry.active() or load_model()
+
 def get_model():
-    global bst, encoding_maps
-    if bst is None or encoding_maps is None:
-        load_model()
-    return bst, encoding_maps
+    bundle = get_bundle()
+    return bundle.booster, bundle.encoding_maps
+
+def get_feature_plan():
+    return get_bundle().feature_plan
@@ -0,0 +1,296 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import joblib
+import numpy as np
+import xgboost as xgb
+
+from app.config import MODEL_DIR, SHADOW_MAX_PENDING
+from app.schemas.predict_schema import PredictRequest
+from app.services.feature_plan import FeaturePlan, compile_feature_plan
+from app.services.scoring_engine import ScoringEngine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """모델 + 인코딩 맵 + 전처리 계획 + 임계값을 하나로 묶은 불변 버전 단위
+
+    요청은 시작 시 번들을 한 번만 읽어 끝까지 사용하므로
+    교체 중에도 서로 다른 버전의 모델/임계값이 섞이지 않습니다.
+    """
+
+    version: str
+    booster: xgb.Booster
+    encoding_maps: Dict
+    feature_plan: FeaturePlan
+    engine: ScoringEngine
+    threshold: float
+    model_path: str
+    encode_map_path: str
+    loaded_at: float
+
+    def predict_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        """전처리된 float32 행렬의 연체 확률"""
+        return self.engine.predict(matrix)
+
+    def predict_matrix_with_contribs(self, matrix: np.ndarray):
+        """전처리된 행렬의 (연체 확률, 피처별 기여도)"""
+        return self.engine.predict_with_contribs(matrix)
+
+    def predict_features(self, features_list: List[Dict]) -> np.ndarray:
+        """원본 입력 → 이 번들의 전처리 계획으로 변환 후 예측 (섀도 스코어링용)"""
+        return self.predict_matrix(self.feature_plan.transform_batch(features_list))
+
+    def as_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "threshold": self.threshold,
+            "model_path": self.model_path,
+            "encode_map_path": self.encode_map_path,
+            "num_features": self.feature_plan.num_features,
+            "scoring_backend": self.engine.backend,
+            "loaded_at": self.loaded_at,
+        }
+
+
+def resolve_model_path(path: str) -> str:
+    """모델 디렉터리 밖의 파일은 로드하지 않음 (joblib 은 pickle 이므로 임의 경로 금지)"""
+    base = os.path.realpath(MODEL_DIR)
+    resolved = os.path.realpath(path)
+    if os.path.commonpath([base, resolved]) != base:
+        raise ValueError(f"모델 디렉터리({MODEL_DIR}) 밖의 경로는 사용할 수 없습니다: {path}")
+    return resolved
+
+
+def load_bundle(version: str, model_path: str, encode_map_path: str, threshold: float) -> ModelBundle:
+    """모델 파일과 인코딩 맵을 읽어 새 번들 생성 (전처리 계획도 함께 컴파일)"""
+    booster = joblib.load(resolve_model_path(model_path))
+    with open(resolve_model_path(encode_map_path), "r", encoding="utf-8") as f:
+        encoding_maps = json.load(f)
+    plan = compile_feature_plan(booster, encoding_maps, default_columns=list(PredictRequest.model_fields))
+    return ModelBundle(
+        version=version,
+        booster=booster,
+        encoding_maps=encoding_maps,
+        feature_plan=plan,
+        engine=ScoringEngine(booster, plan),
+        threshold=float(threshold),
+        model_path=model_path,
+        encode_map_path=encode_map_path,
+        loaded_at=time.time(),
+    )
+
+
+class ShadowStats:
+    """활성 모델 대비 후보 모델 점수 차이 누적"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.rows = 0
+            self.skipped = 0
+            self.errors = 0
+            self.label_flips = 0
+            self.abs_diff_sum = 0.0
+            self.max_abs_diff = 0.0
+
+    def record(self, primary: np.ndarray, shadow: np.ndarray, primary_threshold: float, shadow_threshold: float):
+        diff = np.abs(shadow.astype(np.float64) - primary.astype(np.float64))
+        flips = int(np.count_nonzero((primary > primary_threshold) != (shadow > shadow_threshold)))
+        with self._lock:
+            self.requests += 1
+            self.rows += len(diff)
+            self.label_flips += flips
+            self.abs_diff_sum += float(diff.sum())
+            self.max_abs_diff = max(self.max_abs_diff, float(diff.max(initial=0.0)))
+
+    def record_skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "rows": self.rows,
+                "skipped": self.skipped,
+                "errors": self.errors,
+                "label_flips": self.label_flips,
+                "label_flip_rate": round(self.label_flips / self.rows, 6) if self.rows else 0.0,
+                "mean_abs_diff": round(self.abs_diff_sum / self.rows, 6) if self.rows else 0.0,
+                "max_abs_diff": round(self.max_abs_diff, 6),
+            }
+
+
+class ModelRegistry:
+    """활성 모델 번들 + 후보 번들 관리
+
+    - 후보 모델은 백그라운드 스레드에서 로드하고
+    - 승격 시 참조 하나만 바꿔 원자적으로 교체하며
+    - 후보가 있으면 트래픽 일부를 섀도 스코어링해 점수 차이를 기록합니다.
+    """
+
+    def __init__(self, shadow_max_pending: int = SHADOW_MAX_PENDING):
+        self._active: Optional[ModelBundle] = None
+        self._candidate: Optional[ModelBundle] = None
+        self.candidate_status = "none"  # none | loading | ready | failed
+        self.candidate_error: Optional[str] = None
+        # 후보 로드/폐기마다 증가 — 로드 스레드는 끝났을 때 세대가 바뀌었으면 결과를 버림
+        self._candidate_generation = 0
+        self.shadow_percent = 0.0
+        self.shadow_stats = ShadowStats()
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[ModelBundle], None]] = []
+        self._shadow_max_pending = shadow_max_pending
+        self._shadow_pending = 0
+        self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow-scoring")
+
+    def add_listener(self, listener: Callable[[ModelBundle], None]):
+        """활성 모델이 바뀔 때 호출될 콜백 등록 (새 번들을 인자로 받음)"""
+        self._listeners.append(listener)
+
+    def active(self) -> Optional[ModelBundle]:
+        return self._active
+
+    def candidate(self) -> Optional[ModelBundle]:
+        return self._candidate
+
+    def activate(self, bundle: ModelBundle):
+        """번들을 활성 모델로 지정 (참조 교체 한 번으로 원자적)"""
+        with self._lock:
+            previous = self._active
+            self._active = bundle
+        logger.info(
+            f"[Model Registry] 활성 모델 교체: {previous.version if previous else None} → {bundle.version} "
+            f"(Threshold={bundle.threshold})"
+        )
+        for listener in self._listeners:
+            listener(bundle)
+
+    def load_candidate(self, version: str, model_path: str, encode_map_path: str, threshold: float,
+                       shadow_percent: float = 0.0) -> threading.Thread:
+        """후보 모델을 백그라운드에서 로드 (로드 중에도 활성 모델은 계속 응답)"""
+        # 경로 검증은 요청 시점에 바로 실패시킴
+        resolve_model_path(model_path)
+        resolve_model_path(encode_map_path)
+
+        with self._lock:
+            if self.candidate_status == "loading":
+                raise RuntimeError("이미 후보 모델을 로드하는 중입니다.")
+            self._candidate = None
+            self.candidate_status = "loading"
+            self.candidate_error = None
+            self.shadow_percent = 0.0
+            self._candidate_generation += 1
+            generation = self._candidate_generation
+        self.shadow_stats.reset()
+
+        def _load():
+            try:
+                logger.info(f"[Model Registry] 후보 모델 로드 중... ({version})")
+                bundle = load_bundle(version, model_path, encode_map_path, threshold)
+                with self._lock:
+                    if generation != self._candidate_generation:
+                        logger.info(f"[Model Registry] 로드 중 폐기/교체된 후보 모델 결과를 버립니다. ({version})")
+                        return
+                    self._candidate = bundle
+                    self.candidate_status = "ready"
+                    self.shadow_percent = shadow_percent
+                logger.info(f"[Model Registry] 후보 모델 로드 완료 ({version}), 섀도 비율={shadow_percent}%")
+            except Exception as e:
+                with self._lock:
+                    if generation != self._candidate_generation:
+                        return
+                    self.candidate_status = "failed"
+                    self.candidate_error = str(e)
+                logger.exception(f"[Model Registry] 후보 모델 로드 실패: {e}")
+
+        thread = threading.Thread(target=_load, name="candidate-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def promote(self) -> ModelBundle:
+        """로드가 끝난 후보 모델을 활성 모델로 승격"""
+        with self._lock:
+            bundle = self._candidate
+            if bundle is None or self.candidate_status != "ready":
+                raise RuntimeError(f"승격할 후보 모델이 없습니다. (상태: {self.candidate_status})")
+            self._candidate = None
+            self.candidate_status = "none"
+            self.shadow_percent = 0.0
+        self.activate(bundle)
+        return bundle
+
+    def discard_candidate(self):
+        with self._lock:
+            # 로드 중이면 그 로드 결과도 무효화
+            self._candidate_generation += 1
+            self._candidate = None
+            self.candidate_status = "none"
+            self.candidate_error = None
+            self.shadow_percent = 0.0
+
+    def set_shadow_percent(self, percent: float):
+        with self._lock:
+            self.shadow_percent = percent
+
+    def shadow(self, features_list: List[Dict], primary_probs: np.ndarray, primary: ModelBundle):
+        """트래픽 일부를 후보 모델로 별도 스레드에서 채점 (주 응답 지연 없음)"""
+        candidate = self._candidate
+        if candidate is None or not features_list or random.random() * 100 >= self.shadow_percent:
+            return
+
+        with self._lock:
+            if self._shadow_pending >= self._shadow_max_pending:
+                self.shadow_stats.record_skip()
+                return
+            self._shadow_pending += 1
+
+        primary_probs = np.array(primary_probs, copy=True)
+
+        def _score():
+            try:
+                shadow_probs = candidate.predict_features(features_list)
+                self.shadow_stats.record(primary_probs, shadow_probs, primary.threshold, candidate.threshold)
+            except Exception as e:
+                self.shadow_stats.record_error()
+                logger.warning(f"[Model Registry] 섀도 스코어링 실패 ({candidate.version}): {e}")
+            finally:
+                with self._lock:
+                    self._shadow_pending -= 1
+
+        self._shadow_executor.submit(_score)
+
+    def as_dict(self) -> Dict:
+        active = self._active
+        candidate = self._candidate
+        return {
+            "active": active.as_dict() if active else None,
+            "candidate": {
+                "status": self.candidate_status,
+                "error": self.candidate_error,
+                "shadow_percent": self.shadow_percent,
+                "model": candidate.as_dict() if candidate else None,
+            },
+            "shadow": self.shadow_stats.as_dict(),
+        }
+
+
+model_registry = ModelRegistry()
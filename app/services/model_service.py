@@ -1,69 +1,194 @@
 import xgboost as xgb
 import numpy as np
-import pandas as pd
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 import logging
-import matplotlib.pyplot as plt
-from app.services.model_loader import get_model, THRESHOLD, MODEL_VERSION
+from app.services.model_loader import get_bundle
+from app.services.model_registry import ModelBundle, model_registry
+from app.services.prediction_cache import prediction_cache, make_key
+from app.services.metrics import stage_timer, PREDICTED_ROWS
+from app.config import EXPLAIN_TOP_K
 
 logger = logging.getLogger(__name__)
 
-# 서버 시작 시 자동으로 모델 불러오기
-bst, encoding_maps = get_model()
-
-def preprocess_input(features: Dict):
+def preprocess_input(features: Dict, bundle: Optional[ModelBundle] = None) -> np.ndarray:
     """모델 입력 데이터 전처리"""
     logger.debug(f"[입력 데이터 수신] features keys: {list(features.keys())}")
-    df = pd.DataFrame([features])
-
-    # 불필요 컬럼 제거
-    drop_cols = ["customer_id", "is_delinquent"]
-    df.drop(columns=[c for c in drop_cols if c in df.columns], inplace=True, errors="ignore")
-
-    # 인코딩 처리
-    for col, mapping in encoding_maps.items():
-        if col in df.columns:
-            rev_map = {v: k for k, v in mapping.items()}
-            df[col] = df[col].map(rev_map).fillna(-1).astype(int)
-
-    # 형변환
-    for col in df.columns:
-        if df[col].dtype == "object":
-            if col.lower() == "repayment_date":
-                df.drop(columns=[col], inplace=True)
-            else:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    df.replace([np.inf, -np.inf], np.nan, inplace=True)
-    df.fillna(0, inplace=True)
-    df = df.astype(np.float32)
-
-    logger.debug(f"[전처리 완료] 컬럼 수: {df.shape[1]}, 결측치 수: {df.isna().sum().sum()}")
-    return df
-
-def predict_risk(features: Dict):
-    """연체 위험 예측 수행"""
+    return preprocess_batch([features], bundle)
+
+def preprocess_batch(features_list: List[Dict], bundle: Optional[ModelBundle] = None) -> np.ndarray:
+    """여러 건의 입력을 하나의 float32 피처 행렬로 전처리"""
+    bundle = bundle or get_bundle()
+    with stage_timer("preprocess"):
+        matrix = bundle.feature_plan.transform_batch(features_list)
+    logger.debug(f"[전처리 완료] 행렬 크기: {matrix.shape}")
+    return matrix
+
+def to_dmatrix(matrix: np.ndarray, bundle: Optional[ModelBundle] = None) -> xgb.DMatrix:
+    """전처리 행렬을 컴파일된 컬럼 순서 그대로 DMatrix로 변환"""
+    bundle = bundle or get_bundle()
+    return xgb.DMatrix(matrix, feature_names=bundle.feature_plan.dmatrix_feature_names)
+
+def predict_risk(features: Dict, explain: bool = False, top_k: int = EXPLAIN_TOP_K):
+    """연체 위험 예측 수행 (explain=True 면 상위 기여 피처 포함)"""
     try:
-        df = preprocess_input(features)
-        dtest = xgb.DMatrix(df)
-
-        prob = float(bst.predict(dtest)[0])
-        label = int(prob > THRESHOLD)
-        explanation = generate_explanation(features, prob, label)
-
-        logger.info(f"[예측 결과] 확률={prob:.4f}, 라벨={label}, 버전={MODEL_VERSION}")
-        return {
-            "delinquency_probability": round(prob, 4),
-            "delinquency_label": label,
-            "threshold": THRESHOLD,
-            "model_version": MODEL_VERSION,
-            "explanation": explanation,
-        }
+        # 요청 처리 중 모델이 교체되어도 같은 번들(모델/임계값/버전)로 응답
+        bundle = get_bundle()
+        matrix, probs, contribs = score_batch([features], bundle, explain)
+        prob = float(probs[0])
+        result = build_result(features, prob, bundle)
+        if explain:
+            result.update(build_attribution(bundle, matrix[0], contribs[0], top_k))
+
+        logger.info(f"[예측 결과] 확률={prob:.4f}, 라벨={result['delinquency_label']}, 버전={bundle.version}")
+        return result
 
     except Exception as e:
         logger.exception(f"Prediction Error: {e}")
         raise
 
+def predict_risk_batch(features_list: List[Dict], explain: bool = False, top_k: int = EXPLAIN_TOP_K) -> List[Dict]:
+    """여러 건을 하나의 행렬로 묶어 한 번의 predict 호출로 예측 (기여도도 같은 행렬에서 계산)"""
+    if not features_list:
+        return []
+
+    try:
+        bundle = get_bundle()
+        matrix, probs, contribs = score_batch(features_list, bundle, explain)
+
+        results = []
+        for i, (features, prob) in enumerate(zip(features_list, probs)):
+            result = build_result(features, float(prob), bundle)
+            if explain:
+                result.update(build_attribution(bundle, matrix[i], contribs[i], top_k))
+            results.append(result)
+        logger.info(f"[배치 예측 결과] 건수={len(results)}, 버전={bundle.version}")
+        return results
+
+    except Exception as e:
+        logger.exception(f"Batch Prediction Error: {e}")
+        raise
+
+def predict_proba_batch(features_list: List[Dict], bundle: Optional[ModelBundle] = None,
+                        record: bool = True) -> np.ndarray:
+    """여러 건의 연체 확률만 한 번의 predict 호출로 계산 (캐시에 없는 행만 추론)"""
+    return score_batch(features_list, bundle or get_bundle(), record=record)[1]
+
+def score_batch(features_list: List[Dict], bundle: ModelBundle, explain: bool = False, record: bool = True
+                ) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """전처리 행렬, 연체 확률, (explain 시) 피처별 기여도를 반환
+
+    record=False 는 반사실 후보/스윕 격자처럼 실제 고객이 아닌 가상 입력용으로,
+    예측 캐시를 거치지 않고 섀도 스코어링에도 넣지 않습니다.
+    """
+    matrix = preprocess_batch(features_list, bundle)
+    probs, contribs = score_matrix(matrix, bundle, explain, record)
+
+    # 후보 모델이 있으면 일부 요청을 별도 스레드에서 섀도 스코어링
+    if record:
+        model_registry.shadow(features_list, probs, bundle)
+    return matrix, probs, contribs
+
+def score_matrix(matrix: np.ndarray, bundle: ModelBundle, explain: bool = False, record: bool = True
+                 ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """전처리된 행렬의 연체 확률과 (explain 시) 기여도 — 캐시에 없는 행만 추론
+
+    캐시에는 행마다 (확률, 기여도) 를 함께 저장하며,
+    기여도 없이 저장된 행을 설명 모드로 요청하면 그 행만 다시 계산합니다.
+    record=False 이면 캐시를 조회/저장하지 않습니다. (가상 입력이 실제 요청의 캐시 항목을 밀어내거나 적중률을 왜곡하지 않도록)
+    """
+    probs = np.empty(len(matrix), dtype=np.float32)
+    contribs = np.empty((len(matrix), matrix.shape[1] + 1), dtype=np.float32) if explain else None
+
+    keys = [make_key(row, bundle.version, bundle.threshold) for row in matrix] if record else []
+    missed = [] if record else list(range(len(matrix)))
+    for i, key in enumerate(keys):
+        cached = prediction_cache.get(key)
+        if cached is None or (explain and cached[1] is None):
+            missed.append(i)
+            continue
+        probs[i] = cached[0]
+        if explain:
+            contribs[i] = cached[1]
+
+    if missed:
+        if explain:
+            with stage_timer("predict_contribs"):
+                predicted, predicted_contribs = bundle.predict_matrix_with_contribs(matrix[missed])
+        else:
+            with stage_timer("predict"):
+                predicted = bundle.predict_matrix(matrix[missed])
+            predicted_contribs = [None] * len(missed)
+        for i, prob, row_contribs in zip(missed, predicted, predicted_contribs):
+            probs[i] = prob
+            if explain:
+                contribs[i] = row_contribs
+            if record:
+                prediction_cache.put(keys[i], (prob, row_contribs))
+
+    PREDICTED_ROWS.inc("model", amount=len(missed))
+    PREDICTED_ROWS.inc("cache", amount=len(matrix) - len(missed))
+    return probs, contribs
+
+def predict_packed(matrix: np.ndarray, bundle: ModelBundle, explain: bool = False,
+                   top_k: int = EXPLAIN_TOP_K) -> List[Dict]:
+    """이미 피처 순서대로 인코딩된 행렬을 전처리 없이 예측 (fast packed 입력용)
+
+    설명 문구에 쓰는 원본 값은 행렬 값으로 대신하며, 원본 입력이 없으므로 섀도 스코어링은 하지 않습니다.
+    """
+    probs, contribs = score_matrix(matrix, bundle, explain)
+    names = bundle.feature_plan.feature_names
+    results = []
+    for i, prob in enumerate(probs):
+        result = build_result(dict(zip(names, matrix[i].tolist())), float(prob), bundle)
+        if explain:
+            result.update(build_attribution(bundle, matrix[i], contribs[i], top_k))
+        results.append(result)
+    return results
+
+def build_result(features: Dict, prob: float, bundle: Optional[ModelBundle] = None) -> Dict:
+    """예측 확률을 응답 형식으로 변환"""
+    bundle = bundle or get_bundle()
+    label = int(prob > bundle.threshold)
+    return {
+        "delinquency_probability": round(prob, 4),
+        "delinquency_label": label,
+        "threshold": bundle.threshold,
+        "model_version": bundle.version,
+        "explanation": generate_explanation(features, prob, label),
+    }
+
+def build_attribution(bundle: ModelBundle, row: np.ndarray, row_contribs: np.ndarray, top_k: int) -> Dict:
+    """기여도 절댓값 기준 상위 피처와 그에 맞는 설명 문구 (기여도는 log-odds 단위, 양수=위험 증가)"""
+    names = bundle.feature_plan.feature_names
+    feature_contribs = row_contribs[:-1]
+    order = np.argsort(-np.abs(feature_contribs), kind="stable")[:top_k]
+    top_features = [
+        {
+            "feature": names[j],
+            "value": float(row[j]),
+            "contribution": round(float(feature_contribs[j]), 6),
+        }
+        for j in order
+    ]
+    return {
+        "base_value": round(float(row_contribs[-1]), 6),
+        "top_features": top_features,
+        "explanation": generate_attribution_explanation(top_features),
+    }
+
+def generate_attribution_explanation(top_features: List[Dict]) -> str:
+    """모델이 실제로 사용한 기여도로 설명 문구 생성"""
+    raising = [f["feature"] for f in top_features if f["contribution"] > 0][:3]
+    lowering = [f["feature"] for f in top_features if f["contribution"] < 0][:3]
+    parts = []
+    if raising:
+        parts.append(f"연체 위험을 높인 주요 요인은 {', '.join(raising)}")
+    if lowering:
+        parts.append(f"위험을 낮춘 주요 요인은 {', '.join(lowering)}")
+    if not parts:
+        return "개별 피처의 영향이 거의 없어 기준 위험도 수준으로 예측되었습니다."
+    return "이고, ".join(parts) + "입니다."
+
 def generate_explanation(features: Dict, prob: float, label: int):
     """간단한 예측 설명"""
     salary = float(features.get("salary", 0) or 0)
@@ -83,6 +208,7 @@ def generate_explanation(features: Dict, prob: float, label: int):
         return f"소득 대비 소비 비율이 {spending_ratio*100:.0f}%로 안정적이며, 잔액이 충분해 연체 위험이 낮습니다."
 
 
-# 특성 중요도 시각화 코드 추가 
-xgb.plot_importance(bst, importance_type="gain", max_num_features=38)
-plt.show()
\ No newline at end of file
+def warmup():
+    """합성 입력으로 한 번 추론해 첫 요청이 콜드 패스를 타지 않도록 함 (캐시는 사용하지 않음)"""
+    bundle = get_bundle()
+    bundle.predict_matrix(np.zeros((1, bundle.feature_plan.num_features), dtype=np.float32))
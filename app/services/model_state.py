@@ -0,0 +1,74 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from app.services.metrics import registry, Gauge
+
+
+class ModelNotReadyError(RuntimeError):
+    """모델이 아직 로드되지 않았거나 로드에 실패한 상태에서 추론을 요청한 경우"""
+
+
+class ModelState:
+    """모델별 로드 상태 (not_loaded → loading → ready / failed)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = "not_loaded"
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmed_up = False
+        self._started_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def mark_loading(self):
+        with self._lock:
+            self.status = "loading"
+            self.error = None
+            self._started_at = time.perf_counter()
+
+    def mark_ready(self):
+        with self._lock:
+            self.status = "ready"
+            if self._started_at is not None:
+                self.load_seconds = round(time.perf_counter() - self._started_at, 3)
+
+    def mark_failed(self, error: Exception):
+        with self._lock:
+            self.status = "failed"
+            self.error = str(error)
+
+    def require_ready(self):
+        if not self.ready:
+            raise ModelNotReadyError(f"{self.name} 모델이 준비되지 않았습니다. (상태: {self.status})")
+
+    def as_dict(self) -> Dict:
+        return {
+            "status": self.status,
+            "load_seconds": self.load_seconds,
+            "warmed_up": self.warmed_up,
+            "error": self.error,
+        }
+
+
+xgb_state = ModelState("xgboost")
+llm_state = ModelState("llm")
+
+
+# 모델별 로드 소요 시간 / 준비 여부
+registry.register(Gauge(
+    "ai_model_load_seconds",
+    "Time taken to load each model",
+    ["model"],
+    collect=lambda: [((state.name,), state.load_seconds) for state in (xgb_state, llm_state)],
+))
+registry.register(Gauge(
+    "ai_model_ready",
+    "Whether each model is loaded and ready (1) or not (0)",
+    ["model"],
+    collect=lambda: [((state.name,), int(state.ready)) for state in (xgb_state, llm_state)],
+))
@@ -0,0 +1,145 @@
+import bisect
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import PEER_STATS_PATH
+
+logger = logging.getLogger(__name__)
+
+# 또래 그룹 나이 구간 폭 (20대 초반 / 20대 후반 ...)
+AGE_BAND_WIDTH = 5
+
+BucketKey = Tuple[int, Optional[int], Optional[int]]
+
+
+def age_band(age: int) -> int:
+    return int(age) // AGE_BAND_WIDTH * AGE_BAND_WIDTH
+
+
+def age_band_label(band: int) -> str:
+    return f"{band // 10 * 10}대 {'초반' if band % 10 < 5 else '후반'}"
+
+
+def income_band_label(income_bands: List[int], band: int) -> str:
+    """소득 구간 하한(원) → '월 300~400만 원대' 형식"""
+    index = income_bands.index(band)
+    if index + 1 >= len(income_bands):
+        return f"월 {band / 10000:,.0f}만 원 이상"
+    upper = income_bands[index + 1]
+    if band <= 0:
+        return f"월 {upper / 10000:,.0f}만 원 미만"
+    return f"월 {band / 10000:,.0f}~{upper / 10000:,.0f}만 원대"
+
+
+@dataclass(frozen=True)
+class PeerBucket:
+    """나이대 × 성별 × 소득 구간 하나의 소비 통계 (배열은 index.categories 순서)"""
+
+    label: str
+    count: int
+    mean: np.ndarray          # (카테고리 수,)
+    percentiles: np.ndarray   # (백분위 수, 카테고리 수)
+
+    def mean_dict(self, categories: List[str]) -> Dict[str, float]:
+        return dict(zip(categories, self.mean.tolist()))
+
+
+class PeerStatsIndex:
+    """오프라인 집계 파일(app.build_peer_stats 출력)을 메모리에 올린 또래 소비 통계 색인
+
+    (나이대, 성별, 소득 구간) 키로 dict 조회 한 번에 버킷을 찾습니다.
+    세부 버킷이 없거나 표본이 부족해 집계에서 빠진 경우 성별 → 소득 구간 순으로 넓힌 버킷을 사용합니다.
+    (집계 파일에서 sex/income_band 가 null 인 버킷이 '전체')
+    """
+
+    def __init__(self, version: str, categories: List[str], percentile_levels: List[int],
+                 income_bands: List[int], buckets: Dict[BucketKey, PeerBucket]):
+        self.version = version
+        self.categories = categories
+        self.percentile_levels = np.asarray(percentile_levels, dtype=np.float64)
+        self.income_bands = income_bands
+        self._buckets = buckets
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    @classmethod
+    def load(cls, path: str) -> "PeerStatsIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        categories = data["categories"]
+        income_bands = sorted(int(b) for b in data["income_bands"])
+        buckets = {}
+        for entry in data["buckets"]:
+            band = int(entry["age_band"])
+            income = entry.get("income_band")
+            label = age_band_label(band)
+            if income is not None:
+                income = int(income)
+                label = f"{label}, {income_band_label(income_bands, income)}"
+            key = (band, entry.get("sex"), income)
+            buckets[key] = PeerBucket(
+                label=label,
+                count=int(entry["count"]),
+                mean=np.asarray(entry["mean"], dtype=np.float64),
+                percentiles=np.asarray(entry["percentiles"], dtype=np.float64),
+            )
+        return cls(data.get("version", ""), categories, data["percentiles"], income_bands, buckets)
+
+    def income_band(self, income) -> Optional[int]:
+        if income is None or not self.income_bands:
+            return None
+        index = bisect.bisect_right(self.income_bands, float(income)) - 1
+        return self.income_bands[max(index, 0)]
+
+    def lookup(self, age: Optional[int], sex: Optional[int], income) -> Optional[PeerBucket]:
+        if age is None:
+            return None
+        band = age_band(age)
+        income = self.income_band(income)
+        for key in ((band, sex, income), (band, None, income), (band, sex, None), (band, None, None)):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                return bucket
+        return None
+
+    def percentile_floor(self, bucket: PeerBucket, values: np.ndarray) -> np.ndarray:
+        """카테고리별로 사용자 금액 이하인 가장 높은 백분위 (어느 백분위보다도 작으면 0)"""
+        below = (bucket.percentiles <= values[np.newaxis, :]).sum(axis=0)
+        return np.where(below > 0, self.percentile_levels[np.maximum(below - 1, 0)], 0.0)
+
+    def as_dict(self) -> Dict:
+        return {"version": self.version, "buckets": len(self._buckets), "categories": self.categories}
+
+
+_index: Optional[PeerStatsIndex] = None
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_peer_stats(path: str = PEER_STATS_PATH) -> Optional[PeerStatsIndex]:
+    """집계 파일을 한 번만 읽음 (파일이 없으면 None — 요청의 avg_spending_data 로만 비교)"""
+    global _index, _loaded
+    with _lock:
+        if _loaded:
+            return _index
+        _loaded = True
+        if not path or not os.path.exists(path):
+            logger.warning(f"[Peer Stats] 또래 통계 파일이 없습니다: {path}")
+            return None
+        try:
+            _index = PeerStatsIndex.load(path)
+            logger.info(f"[Peer Stats] 또래 통계 로드 완료 (버전={_index.version}, 버킷 {len(_index)}개)")
+        except Exception:
+            logger.exception(f"[Peer Stats] 또래 통계 로드 실패: {path}")
+        return _index
+
+
+def get_peer_index() -> Optional[PeerStatsIndex]:
+    return _index if _loaded else load_peer_stats()
@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import numpy as np
+
+from app.config import PREDICT_CACHE_SIZE, PREDICT_CACHE_TTL_SECONDS
+from app.services.model_loader import add_load_listener
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionCache:
+    """전처리된 피처 벡터 기준 LRU + TTL 예측 캐시"""
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()  # key -> (만료 시각, 값)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, key: Hashable) -> Optional[object]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: object):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def make_key(row: np.ndarray, model_version: str, threshold: float) -> tuple:
+    """float32 피처 행을 정규화한 캐시 키 (-0.0 은 0.0 으로 통일)"""
+    return model_version, threshold, (row + np.float32(0)).tobytes()
+
+
+prediction_cache = PredictionCache(PREDICT_CACHE_SIZE, PREDICT_CACHE_TTL_SECONDS)
+
+
+def _on_model_loaded(*_):
+    prediction_cache.clear()
+    logger.info("[Prediction Cache] 모델 로드로 캐시 초기화")
+
+
+# 모델이 (재)로드되면 이전 모델의 결과는 더 이상 유효하지 않음
+add_load_listener(_on_model_loaded)
@@ -0,0 +1,295 @@
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from app.config import (
+    PROFILING_SAMPLE_RATE,
+    PROFILING_INTERVAL_MS,
+    PROFILING_MIN_DURATION_MS,
+    PROFILING_MAX_ACTIVE,
+    PROFILING_DIR,
+    PROFILING_MAX_FILES,
+)
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+FOLDED_SUFFIX = ".folded"
+META_SUFFIX = ".json"
+
+# 현재 요청의 프로파일 (레인 작업/스트리밍 스레드에는 contextvars 로 전달됨)
+current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    """요청 하나의 스택 샘플 (요청을 처리하는 스레드들에 붙여 folded stack 으로 집계)"""
+
+    def __init__(self, method: str, path: str, trigger: str):
+        self.profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.created_at = time.time()
+        self.started = time.perf_counter()
+        self.stacks = Counter()
+        self.samples = 0
+        # thread id → (스택 최상단 이름, 붙인 횟수)
+        self._threads: Dict[int, List] = {}
+        self._thread_names = set()
+        self._lock = threading.Lock()
+
+    def attach(self, label: str):
+        thread_id = threading.get_ident()
+        with self._lock:
+            entry = self._threads.setdefault(thread_id, [label, 0])
+            entry[1] += 1
+            self._thread_names.add(label)
+
+    def detach(self):
+        thread_id = threading.get_ident()
+        with self._lock:
+            entry = self._threads.get(thread_id)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._threads[thread_id]
+
+    def sample(self, frames: Dict):
+        with self._lock:
+            for thread_id, (label, _) in self._threads.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.stacks[f"{label};{fold_stack(frame)}"] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, duration_ms: float, status: Optional[int], route: Optional[str]) -> Dict:
+        return {
+            "profile_id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "route": route,
+            "status": status,
+            "trigger": self.trigger,
+            "duration_ms": round(duration_ms, 2),
+            "samples": self.samples,
+            "interval_ms": PROFILING_INTERVAL_MS,
+            "threads": sorted(self._thread_names),
+            "created_at": self.created_at,
+        }
+
+
+# code 객체 → 프레임 이름 (같은 함수는 한 번만 포맷)
+_frame_labels: Dict = {}
+
+
+def _short_path(filename: str) -> str:
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    cwd = os.getcwd() + os.sep
+    if filename.startswith(cwd):
+        return filename[len(cwd):]
+    return os.path.basename(filename)
+
+
+def _frame_label(code) -> str:
+    label = _frame_labels.get(code)
+    if label is None:
+        # folded 형식에서 ';' 는 프레임 구분자이므로 이름에서 제거
+        label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+        _frame_labels[code] = label
+    return label
+
+
+def fold_stack(frame) -> str:
+    """프레임을 바깥쪽 → 안쪽 순서의 ';' 구분 문자열로 (flamegraph.pl / speedscope folded 형식)"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class StackSampler:
+    """프로파일링 중인 요청이 있을 때만 돌아가는 샘플링 스레드 (sys._current_frames 기반 wall-clock 샘플링)"""
+
+    def __init__(self, interval_ms: float, max_active: int):
+        self.interval = interval_ms / 1000
+        self.max_active = max_active
+        self._active = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add(self, profile: RequestProfile) -> bool:
+        with self._lock:
+            if len(self._active) >= self.max_active:
+                return False
+            self._active.add(profile)
+            self._wakeup.set()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        return True
+
+    def remove(self, profile: RequestProfile):
+        with self._lock:
+            self._active.discard(profile)
+            if not self._active:
+                self._wakeup.clear()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                profiles = list(self._active)
+            if not profiles:
+                continue
+            frames = sys._current_frames()
+            for profile in profiles:
+                profile.sample(frames)
+            del frames
+            time.sleep(self.interval)
+
+
+sampler = StackSampler(PROFILING_INTERVAL_MS, PROFILING_MAX_ACTIVE)
+
+
+def thread_label() -> str:
+    # 레인 워커 번호(lane-scoring_3)는 빼고 스레드 종류로만 묶음
+    return re.sub(r"_\d+$", "", threading.current_thread().name)
+
+
+@contextmanager
+def attach_thread(profile: Optional[RequestProfile], label: Optional[str] = None):
+    """현재 스레드가 profile 의 요청을 처리하는 동안 샘플링 대상에 포함"""
+    if profile is None:
+        yield
+        return
+    profile.attach(label or thread_label())
+    try:
+        yield
+    finally:
+        profile.detach()
+
+
+def profiled_iterator(iterator: Iterator) -> Iterator:
+    """스레드 풀에서 한 항목씩 소비되는 동기 제너레이터(스트리밍 응답)를 매 next 마다 현재 요청에 붙임"""
+    profile = current_profile.get()
+    if profile is None:
+        return iterator
+
+    def iterate():
+        it = iter(iterator)
+        while True:
+            with attach_thread(profile):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+
+    return iterate()
+
+
+def choose_trigger(header_value: Optional[str], header_allowed: bool) -> Optional[str]:
+    """프로파일링 대상 요청이면 계기(header/sampled), 아니면 None"""
+    if header_value == "1" and header_allowed:
+        return "header"
+    if PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def start_profile(method: str, path: str, trigger: str) -> Optional[RequestProfile]:
+    """프로파일 시작 (동시 프로파일 수 상한이면 None)"""
+    profile = RequestProfile(method, path, trigger)
+    if not sampler.add(profile):
+        return None
+    return profile
+
+
+# 프로파일 파일 저장/정리는 이벤트 루프 밖의 단일 스레드에서 (저장 순서대로 정리되도록 하나만 둠)
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-writer")
+
+
+def finish_profile(profile: RequestProfile, status: Optional[int], route: Optional[str]):
+    """샘플링을 멈추고 저장할 프로파일이면 파일 저장을 작성 스레드에 넘김 (이벤트 루프에서 바로 반환)"""
+    sampler.remove(profile)
+    duration_ms = (time.perf_counter() - profile.started) * 1000
+    if profile.trigger == "sampled" and duration_ms < PROFILING_MIN_DURATION_MS:
+        return
+    if not profile.stacks:
+        return
+    _writer.submit(save_profile, profile, profile.summary(duration_ms, status, route))
+
+
+def save_profile(profile: RequestProfile, summary: Dict) -> Optional[Dict]:
+    """folded stack 파일과 메타데이터를 저장하고 오래된 프로파일 정리 (실패하면 None)"""
+    duration_ms = summary["duration_ms"]
+    try:
+        os.makedirs(PROFILING_DIR, exist_ok=True)
+        base = os.path.join(PROFILING_DIR, profile.profile_id)
+        with open(base + FOLDED_SUFFIX, "w", encoding="utf-8") as f:
+            f.write(profile.folded())
+        with open(base + META_SUFFIX, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False)
+        _rotate()
+    except OSError:
+        logger.exception("[Profiling] 프로파일 저장 실패")
+        return None
+    logger.info(
+        f"[Profiling] {profile.method} {profile.path} 프로파일 저장 "
+        f"({profile.profile_id}, {duration_ms:.1f}ms, 샘플 {profile.samples}개)"
+    )
+    return summary
+
+
+def _rotate():
+    """최근 PROFILING_MAX_FILES 개만 남기고 오래된 프로파일 삭제 (id 가 시간순 정렬됨)"""
+    ids = sorted(name[:-len(META_SUFFIX)] for name in os.listdir(PROFILING_DIR) if name.endswith(META_SUFFIX))
+    for profile_id in ids[:max(len(ids) - PROFILING_MAX_FILES, 0)]:
+        for suffix in (FOLDED_SUFFIX, META_SUFFIX):
+            try:
+                os.remove(os.path.join(PROFILING_DIR, profile_id + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(limit: int) -> List[Dict]:
+    """최근 프로파일 메타데이터 (최신순, 멀티 워커도 같은 디렉터리를 보므로 함께 나열됨)"""
+    if not os.path.isdir(PROFILING_DIR):
+        return []
+    names = sorted((name for name in os.listdir(PROFILING_DIR) if name.endswith(META_SUFFIX)), reverse=True)
+    profiles = []
+    for name in names[:limit]:
+        try:
+            with open(os.path.join(PROFILING_DIR, name), encoding="utf-8") as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """folded stack 파일 경로 (형식이 맞지 않거나 없으면 None)"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = os.path.join(PROFILING_DIR, profile_id + FOLDED_SUFFIX)
+    return path if os.path.exists(path) else None
@@ -0,0 +1,58 @@
+import logging
+from typing import Tuple
+
+import numpy as np
+import xgboost as xgb
+
+from app.config import XGB_SCORING_BACKEND, XGB_NTHREAD
+from app.services.feature_plan import FeaturePlan
+
+logger = logging.getLogger(__name__)
+
+SCORING_BACKENDS = ("inplace", "dmatrix")
+
+
+class ScoringEngine:
+    """전처리 계획의 컬럼 순서에 고정된 XGBoost 예측기
+
+    단건 요청은 DMatrix 생성 비용이 트리 순회보다 크므로
+    기본(inplace) 백엔드는 연속 float32 배열을 booster.inplace_predict 에 바로 넘깁니다.
+    dmatrix 백엔드는 기존 DMatrix 경로 그대로이며 비교/대체용으로 남겨둡니다.
+    """
+
+    def __init__(self, booster: xgb.Booster, feature_plan: FeaturePlan,
+                 backend: str = XGB_SCORING_BACKEND, nthread: int = XGB_NTHREAD):
+        if backend not in SCORING_BACKENDS:
+            raise ValueError(f"지원하지 않는 스코어링 백엔드: {backend} (가능: {', '.join(SCORING_BACKENDS)})")
+        if booster.num_features() != feature_plan.num_features:
+            raise ValueError(
+                f"모델 피처 수({booster.num_features()})와 전처리 계획 피처 수({feature_plan.num_features})가 다릅니다."
+            )
+
+        self.booster = booster
+        self.feature_plan = feature_plan
+        self.backend = backend
+        self.nthread = nthread
+        # 스레드 수는 booster 파라미터라 로드 시 한 번만 설정 (예측 중 set_param 은 스레드 안전하지 않음)
+        if nthread > 0:
+            booster.set_param({"nthread": nthread})
+        logger.info(f"[Scoring Engine] 백엔드={backend}, nthread={nthread}, 피처 {feature_plan.num_features}개")
+
+    def predict(self, matrix: np.ndarray) -> np.ndarray:
+        """(n_rows, n_features) 행렬의 연체 확률 (float32)"""
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        if self.backend == "inplace":
+            # 여러 스레드에서 inplace_predict 만 호출하는 것은 락 없이 안전
+            return self.booster.inplace_predict(matrix)
+        return self.booster.predict(xgb.DMatrix(matrix, feature_names=self.feature_plan.dmatrix_feature_names))
+
+    def predict_with_contribs(self, matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """확률과 피처별 기여도(SHAP, log-odds 단위)를 같은 DMatrix 한 번으로 계산
+
+        기여도 행렬은 (n_rows, n_features + 1) 이며 마지막 열은 기준값(bias) 입니다.
+        확률은 기여도 합에서 다시 계산하지 않고 같은 DMatrix 의 예측값을 그대로 사용해
+        설명 모드 여부와 관계없이 같은 확률을 반환합니다.
+        """
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        dmatrix = xgb.DMatrix(matrix, feature_names=self.feature_plan.dmatrix_feature_names)
+        return self.booster.predict(dmatrix), self.booster.predict(dmatrix, pred_contribs=True)
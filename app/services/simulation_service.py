@@ -0,0 +1,161 @@
+import logging
+import math
+from decimal import Decimal
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+
+from app.schemas.simulation_schema import INCOME_LEVERS
+from app.services.model_registry import ModelBundle
+from app.services.model_service import predict_proba_batch
+
+logger = logging.getLogger(__name__)
+
+
+def sum_changes(changes) -> Tuple[float, float]:
+    """ExtraChange 목록을 (소득 변화, 지출 변화) 원 단위 합계로 변환"""
+    income_delta = sum(float(c.amount) for c in changes if c.type == "income")
+    expense_delta = sum(float(c.amount) for c in changes if c.type == "expense")
+    return income_delta, expense_delta
+
+
+def add_amount(value, delta):
+    """입력 값의 타입에 맞춰 더함 (Decimal 입력은 정확한 Decimal 연산, fast 스키마의 float 입력은 float 연산)"""
+    if isinstance(value, Decimal):
+        return value + (delta if isinstance(delta, Decimal) else Decimal(str(delta)))
+    return float(value) + float(delta)
+
+
+def apply_deltas(model_input: Dict, income_delta: float, expense_delta: float) -> Dict:
+    """원 단위 소득/지출 변화를 천원 단위로 변환해 모델 입력에 반영한 사본 반환"""
+    simulated_input = dict(model_input)
+
+    income_delta_thousand = Decimal(str(income_delta)) / Decimal(1000)
+    expense_delta_thousand = Decimal(str(expense_delta)) / Decimal(1000)
+
+    # 실제 모델 입력 필드명에 맞게 반영
+    if "salary" in simulated_input:
+        simulated_input["salary"] = add_amount(simulated_input["salary"], income_delta_thousand)
+    if "TOT_USE_AM" in simulated_input:
+        simulated_input["TOT_USE_AM"] = add_amount(simulated_input["TOT_USE_AM"], expense_delta_thousand)
+
+    return simulated_input
+
+
+def score_scenarios(model_input: Dict, deltas: List[Tuple[float, float]],
+                    record: bool = True) -> Tuple[float, List[float]]:
+    """기본 입력과 모든 시나리오를 하나의 행렬로 묶어 한 번에 추론
+
+    record=False 이면 예측 캐시/섀도 스코어링에 남기지 않음 (대량 격자 스윕용)
+
+    반환값: (기본 연체확률, 시나리오별 연체확률) — /predict 와 같이 소수 4자리 반올림
+    """
+    rows = [model_input] + [apply_deltas(model_input, inc, exp) for inc, exp in deltas]
+    probs = [round(float(p), 4) for p in predict_proba_batch(rows, record=record)]
+    logger.info(f"[Simulation] 기본 + 시나리오 {len(deltas)}건 일괄 추론 완료")
+    return probs[0], probs[1:]
+
+
+def grid_deltas(income_amounts, expense_amounts) -> List[Tuple[float, float]]:
+    """소득 변화 × 지출 변화 격자를 (소득, 지출) 쌍 목록으로 전개"""
+    return [(float(inc), float(exp)) for inc, exp in product(income_amounts, expense_amounts)]
+
+
+# 반사실 탐색 최대 단계 수 (단계마다 후보 구간이 grid_points 분의 1로 줄어듦)
+MAX_COUNTERFACTUAL_STEPS = 8
+
+
+def apply_lever(model_input: Dict, lever: str, amount: int) -> Dict:
+    """천원 단위 변화를 한 항목에 반영한 사본 반환
+
+    소득(salary)은 늘리고 지출 항목은 줄입니다. 업종별 지출은 총 지출(TOT_USE_AM)에 포함되므로
+    업종 지출을 줄이면 총 지출도 같은 금액만큼 줄입니다.
+    """
+    row = dict(model_input)
+    if lever in INCOME_LEVERS:
+        row[lever] = add_amount(row[lever], amount)
+    else:
+        row[lever] = add_amount(row[lever], -amount)
+        if lever != "TOT_USE_AM":
+            row["TOT_USE_AM"] = max(add_amount(row["TOT_USE_AM"], -amount), 0)
+    return row
+
+
+def lever_limit(model_input: Dict, lever: str, max_expense_cut_ratio: float, max_income_increase_ratio: float) -> int:
+    """항목별 탐색 상한 (천원 단위 정수)"""
+    ratio = max_income_increase_ratio if lever in INCOME_LEVERS else max_expense_cut_ratio
+    return max(int(math.floor(float(model_input[lever]) * ratio)), 0)
+
+
+def candidate_amounts(low: int, high: int, points: int) -> List[int]:
+    """(low, high] 구간의 후보 금액 — 구간이 좁으면 천원 단위로 전부, 아니면 등간격 points 개 (high 포함)"""
+    if high - low <= points:
+        return list(range(low + 1, high + 1))
+    return sorted({math.ceil(low + (high - low) * k / points) for k in range(1, points + 1)})
+
+
+def search_counterfactuals(
+    model_input: Dict,
+    levers: List[str],
+    limits: Dict[str, int],
+    bundle: ModelBundle,
+    points: int,
+) -> Tuple[float, Dict[str, Tuple[Optional[int], float]], int, int]:
+    """항목별로 위험도가 임계값 이하가 되는 최소 변화 금액(천원)을 다단계 격자로 탐색
+
+    단계마다 아직 탐색 중인 모든 항목의 후보를 하나의 행렬로 묶어 한 번에 추론하고,
+    임계값 이하가 처음 나온 후보와 직전 후보 사이 구간만 다음 단계에서 더 촘촘히 봅니다.
+    트리 모델은 금액에 대해 단조롭지 않을 수 있으므로 결과는 격자 기준 최소 금액입니다.
+
+    반환값: (기본 연체확률, 항목별 (최소 금액 또는 None, 그 금액/최대 변화 시 연체확률), 단계 수, 평가 후보 수)
+    """
+    threshold = bundle.threshold
+    active = {lever: (0, limits[lever]) for lever in levers if limits[lever] > 0}
+    # 변화 여지가 없는 항목은 현재 위험도 그대로 불가능으로 처리
+    results: Dict[str, Tuple[Optional[int], float]] = {}
+    base_prob = None
+    steps = 0
+    evaluated = 0
+
+    while True:
+        candidates = [(lever, amount) for lever, (low, high) in active.items()
+                      for amount in candidate_amounts(low, high, points)]
+        rows = [apply_lever(model_input, lever, amount) for lever, amount in candidates]
+        if base_prob is None:
+            rows.insert(0, model_input)
+        # 가상 후보 행은 예측 캐시를 밀어내거나 섀도 비교에 섞이지 않도록 기록하지 않음
+        probs = [float(p) for p in predict_proba_batch(rows, bundle, record=False)]
+        steps += 1
+        evaluated += len(rows)
+        if base_prob is None:
+            base_prob = probs.pop(0)
+            if base_prob <= threshold:
+                return base_prob, {}, steps, evaluated
+        if not active:
+            break
+
+        by_lever: Dict[str, List[Tuple[int, float]]] = {}
+        for (lever, amount), prob in zip(candidates, probs):
+            by_lever.setdefault(lever, []).append((amount, prob))
+
+        for lever, scored in by_lever.items():
+            low, high = active.pop(lever)
+            hit = next((i for i, (_, prob) in enumerate(scored) if prob <= threshold), None)
+            if hit is None:
+                results[lever] = (None, scored[-1][1])
+                continue
+            amount, prob = scored[hit]
+            previous = scored[hit - 1][0] if hit > 0 else low
+            if amount - previous <= 1 or steps >= MAX_COUNTERFACTUAL_STEPS:
+                results[lever] = (amount, prob)
+            else:
+                # 마지막 미달 후보 ~ 첫 통과 후보 사이를 다음 단계에서 다시 탐색
+                active[lever] = (previous, amount)
+                results[lever] = (amount, prob)
+
+        if not active:
+            break
+
+    for lever in levers:
+        results.setdefault(lever, (None, base_prob))
+    logger.info(f"[Counterfactual] 항목 {len(levers)}개, {steps}단계 / 후보 {evaluated}건 일괄 추론 완료")
+    return base_prob, results, steps, evaluated
@@ -0,0 +1,35 @@
+import logging
+import threading
+
+from app.config import MODEL_PRELOAD, LLM_PRELOAD, WARMUP_ENABLED
+from app.services import model_service, llm_loader
+from app.services.model_loader import load_model
+from app.services.peer_stats import load_peer_stats
+from app.services.model_state import xgb_state
+
+logger = logging.getLogger(__name__)
+
+
+def load_models():
+    """XGBoost → LLM 순서로 로드 (가벼운 /predict 가 먼저 준비되도록)"""
+    load_peer_stats()
+    if MODEL_PRELOAD:
+        try:
+            load_model()
+            if WARMUP_ENABLED:
+                model_service.warmup()
+                xgb_state.warmed_up = True
+                logger.info("[Startup] XGBoost 워밍업 완료")
+        except Exception:
+            logger.exception("[Startup] XGBoost 로드/워밍업 실패")
+
+    # LLM_PRELOAD=false 면 첫 인사이트 요청 시 llm_loader.require_llm 이 백그라운드 로드를 시작
+    if LLM_PRELOAD:
+        llm_loader.load_and_warmup()
+
+
+def start_background_loading() -> threading.Thread:
+    """요청 처리를 막지 않도록 별도 스레드에서 모델 로드 시작"""
+    thread = threading.Thread(target=load_models, name="model-loader", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,11 @@
+import orjson
+from fastapi.responses import Response
+
+
+class FastJSONResponse(Response):
+    """orjson 으로 직렬화하는 JSON 응답 (응답 모델 검증/변환 없이 dict 를 바로 인코딩)"""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
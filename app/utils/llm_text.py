@@ -0,0 +1,89 @@
+import re
+from typing import Iterator, Optional
+
+from app.config import LLM_MAX_SENTENCES
+
+# 한글 바로 뒤의 마침표/물음표/느낌표를 문장 끝으로 간주 (10.5% 같은 숫자는 제외)
+SENTENCE_END = re.compile(r"(?<=[가-힣])[.!?]")
+
+
+def extract_generated_text(result) -> str:
+    """safe_generate 결과에서 assistant 응답 텍스트만 추출"""
+    text = ""
+    if isinstance(result, list):
+        if isinstance(result[0], dict):
+            gen_text = result[0].get("generated_text", "")
+            if isinstance(gen_text, list) and len(gen_text) > 0:
+                last_msg = gen_text[-1]
+                text = last_msg.get("content", str(last_msg)) if isinstance(last_msg, dict) else str(last_msg)
+            else:
+                text = str(gen_text)
+    elif isinstance(result, dict):
+        text = result.get("generated_text", "")
+    elif isinstance(result, str):
+        text = result
+
+    if not isinstance(text, str):
+        text = str(text)
+    return text
+
+
+def sentence_cut(text: str, max_sentences: int) -> Optional[int]:
+    """max_sentences 번째 문장이 끝나는 위치 (아직 완성되지 않았거나 제한이 없으면 None)"""
+    if max_sentences <= 0:
+        return None
+    for count, match in enumerate(SENTENCE_END.finditer(text), start=1):
+        if count == max_sentences:
+            return match.end()
+    return None
+
+
+def comment_complete(text: str, max_sentences: int = LLM_MAX_SENTENCES) -> bool:
+    """첫 줄이 끝났거나 문장 수 제한에 도달해 이후 토큰이 버려질 상태인지 여부"""
+    text = text.lstrip().replace("�", "")
+    return "\n" in text or sentence_cut(text, max_sentences) is not None
+
+
+def clean_comment(text: str, fallback: str, max_sentences: int = LLM_MAX_SENTENCES) -> str:
+    """첫 줄(최대 max_sentences 문장)만 남기고 깨진 문자 제거, 너무 짧으면 기본 문구로 대체"""
+    comment = text.strip().split("\n")[0].replace("�", "")
+    cut = sentence_cut(comment, max_sentences)
+    if cut is not None:
+        comment = comment[:cut]
+    comment = comment.strip()
+    if len(comment) < 5:
+        comment = fallback
+    return comment
+
+
+class FirstLineStream:
+    """스트리밍 토큰에 clean_comment 와 같은 규칙(앞 공백 무시, 첫 줄·N 문장까지, '�' 제거)을 점진 적용"""
+
+    def __init__(self, max_sentences: int = LLM_MAX_SENTENCES):
+        self.text = ""
+        self.finished = False
+        self.max_sentences = max_sentences
+        self._line = ""
+        self._started = False
+
+    def feed(self, chunk: str) -> Iterator[str]:
+        """새 토큰 조각을 받아 클라이언트로 보낼 조각을 반환 (첫 줄이 끝나면 finished=True)"""
+        if self.finished:
+            return
+        self.text += chunk
+        if not self._started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return
+            self._started = True
+        if "\n" in chunk:
+            chunk = chunk.split("\n")[0]
+            self.finished = True
+        chunk = chunk.replace("�", "")
+        cut = sentence_cut(self._line + chunk, self.max_sentences)
+        if cut is not None:
+            chunk = chunk[:cut - len(self._line)]
+            self.finished = True
+        self._line += chunk
+        if chunk:
+            yield chunk
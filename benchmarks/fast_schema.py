@@ -0,0 +1,73 @@
+"""Decimal 입력 스키마 + 응답 모델 경로와 fast(float 스키마 + orjson) 경로의 단건 처리 비용 비교
+
+    python -m benchmarks.fast_schema --repeat 20000
+
+JSON 본문 파싱·검증 → 전처리 행렬 → 응답 인코딩까지를 단계별로 측정합니다. (모델 추론은 두 경로가 같아 제외)
+두 경로의 전처리 행렬이 다르면 종료 코드 1 을 반환합니다.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+
+def time_per_call(fn, repeat: int) -> float:
+    """호출당 평균 지연 (us)"""
+    for _ in range(min(repeat, 500)):
+        fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    import orjson
+    from app.schemas.fast_schema import FastPredictRequest
+    from app.schemas.predict_schema import PredictRequest, PredictResponse
+    from app.services.feature_plan import compile_feature_plan
+    from benchmarks.fixtures import ENCODING_MAP, sample_predict_record
+
+    body = json.dumps(sample_predict_record(3)).encode()
+    plan = compile_feature_plan(None, ENCODING_MAP, default_columns=list(PredictRequest.model_fields))
+    response = {
+        "delinquency_probability": 0.1234,
+        "delinquency_label": 0,
+        "threshold": 0.88,
+        "model_version": "bench",
+        "explanation": "소득 대비 소비 비율이 47%로 안정적이며, 잔액이 충분해 연체 위험이 낮습니다.",
+    }
+
+    decimal_matrix = plan.transform(PredictRequest.model_validate(json.loads(body)).model_dump())
+    fast_matrix = plan.transform(FastPredictRequest.model_validate(json.loads(body)).model_dump())
+    mismatch = not np.array_equal(decimal_matrix, fast_matrix)
+
+    stages = {
+        "decimal": {
+            "validate": lambda: PredictRequest.model_validate(json.loads(body)).model_dump(),
+            "preprocess": (lambda f=PredictRequest.model_validate(json.loads(body)).model_dump(): plan.transform(f)),
+            "encode": lambda: PredictResponse(**response).model_dump_json(),
+        },
+        "fast": {
+            "validate": lambda: FastPredictRequest.model_validate(json.loads(body)).model_dump(),
+            "preprocess": (lambda f=FastPredictRequest.model_validate(json.loads(body)).model_dump(): plan.transform(f)),
+            "encode": lambda: orjson.dumps(response),
+        },
+    }
+
+    print(f"{'path':<8} {'validate(us)':>13} {'preprocess(us)':>15} {'encode(us)':>11} {'total(us)':>10}")
+    for label, fns in stages.items():
+        timings = [time_per_call(fns[stage], args.repeat) for stage in ("validate", "preprocess", "encode")]
+        print(f"{label:<8} {timings[0]:>13.1f} {timings[1]:>15.1f} {timings[2]:>11.1f} {sum(timings):>10.1f}")
+    print(f"preprocessed matrices identical: {not mismatch}")
+    return 1 if mismatch else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
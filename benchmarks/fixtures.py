@@ -0,0 +1,163 @@
+"""벤치마크용 오프라인 대체 모델 생성 (네트워크/실제 모델 파일 없이 동작)"""
+import os
+
+# Phi-3 와 같은 형식의 채팅 템플릿
+CHAT_TEMPLATE = (
+    "{% for message in messages %}"
+    "{{ '<|' + message['role'] + '|>\n' + message['content'] + '<|end|>\n' }}"
+    "{% endfor %}"
+    "{% if add_generation_prompt %}{{ '<|assistant|>\n' }}{% endif %}"
+)
+SPECIAL_TOKENS = ["<|endoftext|>", "<|system|>", "<|user|>", "<|assistant|>", "<|end|>"]
+
+
+def sample_corpus():
+    """실제 서비스 프롬프트와 예시 문장으로 토크나이저 학습용 말뭉치 구성"""
+    texts = [
+        "상환 진척률이 높고 연체 위험이 낮아 안정적인 상태입니다.",
+        "연체 가능성이 있어 납입 일정을 꾸준히 유지하는 것이 좋습니다.",
+        "20대 후반 평균보다 식비가 10% 높으며, 교통비는 평균보다 낮습니다.",
+    ]
+    for messages in (sample_loan_messages(), sample_spending_messages()):
+        texts += [m["content"] for m in messages]
+    return texts
+
+
+def sample_loan_request(i: int = 0):
+    """/insight/loan 요청 본문"""
+    return {
+        "loan_name": "농협주택대출",
+        "interest_rate": 3.5 + (i % 10) * 0.1,
+        "repayment_ratio": 20.0 + (i % 7) * 5,
+        "delinquency_probability": (i % 10) / 10,
+        "next_due_date": "2025-12-10",
+        "remaining_principal": 30_000_000 - i * 100_000,
+        "principal_amount": 50_000_000,
+    }
+
+
+SPENDING_CATEGORIES = ["interior_am", "insuhos_am", "offedu_am", "trvlec_am", "fsbz_am",
+                       "svcarc_am", "plsanit_am", "clothgds_am", "auto_am"]
+
+
+def sample_recommend_request(i: int = 0):
+    """/recommend 요청 본문"""
+    spending = {c: 100_000 + ((i + k) % 9) * 20_000 for k, c in enumerate(SPENDING_CATEGORIES)}
+    spending["income"] = 3_000_000 + (i % 5) * 250_000
+    peer = {c: 120_000 for c in SPENDING_CATEGORIES}
+    peer["income"] = 3_100_000
+    return {"spending_data": spending, "avg_spending_data": peer}
+
+
+def sample_loan_messages(i: int = 0):
+    from app.services.llm_service_loan import prepare_loan_prompt
+
+    messages, _ = prepare_loan_prompt(sample_loan_request(i))
+    return messages
+
+
+def sample_spending_messages(i: int = 0):
+    from app.services.llm_service_spending import prepare_spending_prompt
+
+    body = sample_recommend_request(i)
+    messages, _ = prepare_spending_prompt(body["spending_data"], body["avg_spending_data"])
+    return messages
+
+
+def build_tiny_llm(path: str, hidden_size: int = 256, num_layers: int = 4, vocab_size: int = 2000, seed: int = 0) -> str:
+    """바이트 단위 BPE 토크나이저 + 무작위 초기화 Llama 구조의 작은 causal LM 저장"""
+    import torch
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+    from transformers import LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
+
+    if os.path.exists(os.path.join(path, "config.json")):
+        return path
+
+    tokenizer = Tokenizer(models.BPE())
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=vocab_size,
+        special_tokens=SPECIAL_TOKENS,
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet(),
+    )
+    tokenizer.train_from_iterator(sample_corpus() * 20, trainer)
+
+    fast = PreTrainedTokenizerFast(tokenizer_object=tokenizer, eos_token="<|endoftext|>", pad_token="<|endoftext|>")
+    fast.chat_template = CHAT_TEMPLATE
+    fast.save_pretrained(path)
+
+    config = LlamaConfig(
+        vocab_size=len(fast),
+        hidden_size=hidden_size,
+        intermediate_size=hidden_size * 2,
+        num_hidden_layers=num_layers,
+        num_attention_heads=4,
+        num_key_value_heads=4,
+        max_position_embeddings=4096,
+        bos_token_id=fast.eos_token_id,
+        eos_token_id=fast.eos_token_id,
+        pad_token_id=fast.pad_token_id,
+    )
+    torch.manual_seed(seed)
+    LlamaForCausalLM(config).save_pretrained(path)
+    return path
+
+
+ENCODING_MAP = {"BAS_YH": {"0": "2022Q1", "1": "2022Q2", "2": "2022Q3", "3": "2022Q4"}}
+
+
+def sample_predict_record(i: int = 0):
+    """PredictRequest 형식의 입력 (i 에 따라 금액/분기가 바뀜)"""
+    from typing import Optional
+
+    from app.schemas.predict_schema import PredictRequest
+
+    record = {}
+    for k, name in enumerate(PredictRequest.model_fields):
+        if name == "customer_id":
+            continue
+        if name == "BAS_YH":
+            record[name] = ENCODING_MAP["BAS_YH"][str(i % 4)]
+        elif name == "repayment_date":
+            record[name] = "2025-01-10"
+        elif PredictRequest.model_fields[name].annotation in (int, Optional[int]):
+            record[name] = (i + k) % 5
+        else:
+            record[name] = float((i * 7919 + k * 104729) % 5000)
+    return record
+
+
+def build_synthetic_xgb(model_path: str, encode_map_path: str, num_rounds: int = 100, max_depth: int = 6,
+                        seed: int = 0) -> str:
+    """실제 모델과 같은 입력 스키마(피처명 포함)의 binary:logistic booster 저장"""
+    import json
+
+    import joblib
+    import numpy as np
+    import xgboost as xgb
+
+    from app.schemas.predict_schema import PredictRequest
+    from app.services.feature_plan import DROP_COLUMNS
+
+    if os.path.exists(model_path) and os.path.exists(encode_map_path):
+        return model_path
+
+    columns = [c for c in PredictRequest.model_fields if c not in DROP_COLUMNS]
+    rng = np.random.default_rng(seed)
+    n = 5000
+    X = rng.uniform(0, 5000, size=(n, len(columns))).astype(np.float32)
+    X[:, columns.index("BAS_YH")] = rng.integers(0, 4, n)
+    noise = rng.normal(size=n) * 200
+    y = (X[:, columns.index("TOT_USE_AM")] - X[:, columns.index("salary")] + noise > 0).astype(int)
+
+    bst = xgb.train(
+        {"objective": "binary:logistic", "max_depth": max_depth, "seed": seed},
+        xgb.DMatrix(X, label=y, feature_names=columns),
+        num_rounds,
+    )
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    joblib.dump(bst, model_path)
+    with open(encode_map_path, "w", encoding="utf-8") as f:
+        json.dump(ENCODING_MAP, f)
+    return model_path
@@ -0,0 +1,87 @@
+"""GenerationBatcher 배치 생성 결과가 단건 생성과 같은지 확인하고 처리량 비교
+
+    python -m benchmarks.llm_batcher                            # 오프라인 소형 대체 모델 사용
+    python -m benchmarks.llm_batcher --model ./app/models/phi3-mini-4k-instruct
+
+길이가 서로 다른 프롬프트를 왼쪽 패딩 배치로 생성한 결과와, 동시에 submit 해 스케줄러가 묶어 생성한 결과를
+한 건씩 생성한 greedy 결과와 비교합니다. 한 건이라도 다르면 종료 코드 1 을 반환합니다.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fixtures import build_tiny_llm, sample_loan_messages, sample_spending_messages
+
+
+def build_conversations(count: int):
+    """대출/소비 프롬프트를 섞고, 일부는 user 메시지를 잘라 프롬프트 길이가 모두 다르도록 구성"""
+    conversations = []
+    for i in range(count):
+        messages = sample_loan_messages(i) if i % 2 == 0 else sample_spending_messages(i)
+        if i % 3 == 2:
+            messages = [dict(m) for m in messages]
+            messages[-1]["content"] = messages[-1]["content"][: len(messages[-1]["content"]) // 2]
+        conversations.append(messages)
+    return conversations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="로컬 causal LM 경로 (생략 시 소형 대체 모델 생성)")
+    parser.add_argument("--mode", default="auto")
+    parser.add_argument("--prompts", type=int, default=6)
+    parser.add_argument("--max-new-tokens", type=int, default=16)
+    args = parser.parse_args()
+
+    import torch
+    from app.services.llm_batcher import GenerationBatcher
+    from app.services.llm_loader import build_pipeline
+
+    torch.manual_seed(0)
+    model_path = args.model or build_tiny_llm(os.path.join(tempfile.gettempdir(), "ai-server-bench-tiny-llm"))
+    generator = build_pipeline(model_path, args.mode)
+    # 접두부 캐시 없이 비교 (단건/배치 모두 전체 prefill)
+    batcher = GenerationBatcher(generator.model, generator.tokenizer, max_batch_size=args.prompts, max_wait_ms=200)
+    gen_kwargs = {"max_new_tokens": args.max_new_tokens, "do_sample": False}
+
+    conversations = build_conversations(args.prompts)
+    tokenizer = generator.tokenizer
+    lengths = [
+        len(tokenizer(tokenizer.apply_chat_template(m, tokenize=False, add_generation_prompt=True),
+                      add_special_tokens=False)["input_ids"])
+        for m in conversations
+    ]
+
+    start = time.perf_counter()
+    reference = [batcher.generate_batch([messages], **gen_kwargs)[0] for messages in conversations]
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = batcher.generate_batch(conversations, **gen_kwargs)
+    batch_seconds = time.perf_counter() - start
+
+    # 동시 요청을 스케줄러가 대기 구간 안에서 묶는 경로
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.prompts) as pool:
+        submitted = list(pool.map(lambda messages: batcher.submit(messages, **gen_kwargs), conversations))
+    submit_seconds = time.perf_counter() - start
+
+    batch_mismatches = [i for i, (r, b) in enumerate(zip(reference, batched)) if r != b]
+    submit_mismatches = [i for i, (r, s) in enumerate(zip(reference, submitted)) if r != s]
+
+    print(f"model={model_path} prompts={args.prompts} max_new_tokens={args.max_new_tokens}")
+    print(f"prompt lengths (tokens): {lengths}")
+    print(f"{'variant':<16} {'total(s)':>9} {'per prompt(ms)':>15}")
+    for label, seconds in (("single", single_seconds), ("padded batch", batch_seconds),
+                           ("concurrent submit", submit_seconds)):
+        print(f"{label:<16} {seconds:>9.3f} {seconds / args.prompts * 1000:>15.1f}")
+    print(f"padded batch mismatches: {batch_mismatches}")
+    print(f"concurrent submit mismatches: {submit_mismatches}")
+    return 1 if batch_mismatches or submit_mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""고정 system 접두부 KV 캐시 재사용 전/후 단건 생성 지연과 출력 일치 비교
+
+    python -m benchmarks.llm_prefix_cache                       # 오프라인 소형 대체 모델 사용
+    python -m benchmarks.llm_prefix_cache --model ./app/models/phi3-mini-4k-instruct
+
+greedy 생성 결과가 한 건이라도 다르면 종료 코드 1 을 반환합니다.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.fixtures import build_tiny_llm, sample_loan_messages, sample_spending_messages
+
+
+def generate(model, tokenizer, messages, max_new_tokens: int, prefix_cache=None):
+    import torch
+
+    inputs = tokenizer.apply_chat_template(
+        messages, add_generation_prompt=True, return_tensors="pt", return_dict=True
+    ).to(model.device)
+    kwargs = {}
+    if prefix_cache is not None:
+        past = prefix_cache.lookup(messages, inputs["input_ids"])
+        if past is not None:
+            kwargs["past_key_values"] = past
+    with torch.inference_mode():
+        output_ids = model.generate(
+            **inputs, max_new_tokens=max_new_tokens, do_sample=False, pad_token_id=tokenizer.pad_token_id, **kwargs
+        )
+    return output_ids[0, inputs["input_ids"].shape[1]:].tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="로컬 causal LM 경로 (생략 시 소형 대체 모델 생성)")
+    parser.add_argument("--mode", default="auto")
+    parser.add_argument("--prompts", type=int, default=8)
+    parser.add_argument("--max-new-tokens", type=int, default=16)
+    args = parser.parse_args()
+
+    import torch
+    from app.services.llm_loader import build_pipeline
+    from app.services.llm_prefix_cache import PrefixKVCache
+
+    torch.manual_seed(0)
+    model_path = args.model or build_tiny_llm(os.path.join(tempfile.gettempdir(), "ai-server-bench-tiny-llm"))
+    generator = build_pipeline(model_path, args.mode)
+    model, tokenizer = generator.model, generator.tokenizer
+    prefix_cache = PrefixKVCache(model, tokenizer)
+
+    conversations = [
+        sample_loan_messages(i) if i % 2 == 0 else sample_spending_messages(i) for i in range(args.prompts)
+    ]
+    # 접두부 계산(서비스별 최초 1회)은 측정에서 제외
+    for messages in conversations[:2]:
+        prefix_cache.lookup(messages, tokenizer.apply_chat_template(
+            messages, add_generation_prompt=True, return_tensors="pt", return_dict=True
+        )["input_ids"])
+
+    results = {}
+    for label, cache in (("full prefill", None), ("prefix cache", prefix_cache)):
+        outputs = []
+        start = time.perf_counter()
+        for messages in conversations:
+            outputs.append(generate(model, tokenizer, messages, args.max_new_tokens, cache))
+        results[label] = (time.perf_counter() - start, outputs)
+
+    baseline_seconds, reference = results["full prefill"]
+    mismatches = sum(r != o for r, o in zip(reference, results["prefix cache"][1]))
+
+    print(f"model={model_path} prompts={args.prompts} max_new_tokens={args.max_new_tokens}")
+    print(f"{'variant':<13} {'total(s)':>9} {'per prompt(ms)':>15} {'speedup':>8}")
+    for label, (seconds, _) in results.items():
+        print(f"{label:<13} {seconds:>9.3f} {seconds / args.prompts * 1000:>15.1f} {baseline_seconds / seconds:>7.2f}x")
+    print(f"cache stats: {prefix_cache.stats()}")
+    print(f"output mismatches: {mismatches}/{args.prompts}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""LLM 추론 모드(fp32/bf16/int8)별 tokens/sec, 최대 RSS, fp32 대비 출력 일치율 비교
+
+    python -m benchmarks.llm_quantization                       # 오프라인 소형 대체 모델 사용
+    python -m benchmarks.llm_quantization --model ./app/models/phi3-mini-4k-instruct
+
+모드마다 별도 프로세스에서 실행해 최대 RSS 가 서로 섞이지 않도록 합니다.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fixtures import build_tiny_llm, sample_loan_messages, sample_spending_messages
+
+
+def run_mode(model_path: str, mode: str, prompts: int, max_new_tokens: int) -> dict:
+    """단일 모드 측정 (하위 프로세스에서 실행)"""
+    import torch
+    from app.services.llm_loader import build_pipeline
+
+    torch.manual_seed(0)
+    start = time.perf_counter()
+    generator = build_pipeline(model_path, mode)
+    load_seconds = time.perf_counter() - start
+
+    tokenizer, model = generator.tokenizer, generator.model
+    conversations = [
+        sample_loan_messages(i) if i % 2 == 0 else sample_spending_messages(i) for i in range(prompts)
+    ]
+
+    outputs = []
+    generated = 0
+    start = time.perf_counter()
+    for messages in conversations:
+        inputs = tokenizer.apply_chat_template(
+            messages, add_generation_prompt=True, return_tensors="pt", return_dict=True
+        ).to(model.device)
+        with torch.inference_mode():
+            output_ids = model.generate(
+                **inputs, max_new_tokens=max_new_tokens, do_sample=False, pad_token_id=tokenizer.pad_token_id
+            )
+        new_tokens = output_ids[0, inputs["input_ids"].shape[1]:].tolist()
+        generated += len(new_tokens)
+        outputs.append(new_tokens)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "load_seconds": round(load_seconds, 3),
+        "tokens_per_second": round(generated / elapsed, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "outputs": outputs,
+    }
+
+
+def agreement(reference, outputs):
+    """(완전 일치 비율, 토큰 위치별 일치 비율)"""
+    exact = sum(r == o for r, o in zip(reference, outputs)) / len(reference)
+    matched = total = 0
+    for r, o in zip(reference, outputs):
+        total += max(len(r), len(o))
+        matched += sum(a == b for a, b in zip(r, o))
+    return exact, (matched / total if total else 1.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="로컬 causal LM 경로 (생략 시 소형 대체 모델 생성)")
+    parser.add_argument("--modes", default="fp32,bf16,int8")
+    parser.add_argument("--prompts", type=int, default=8)
+    parser.add_argument("--max-new-tokens", type=int, default=48)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_mode(args.model, args.worker, args.prompts, args.max_new_tokens)))
+        return 0
+
+    model_path = args.model or build_tiny_llm(os.path.join(tempfile.gettempdir(), "ai-server-bench-tiny-llm"))
+    modes = args.modes.split(",")
+    if "fp32" not in modes:
+        modes.insert(0, "fp32")
+
+    results = {}
+    for mode in modes:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.llm_quantization", "--worker", mode, "--model", model_path,
+             "--prompts", str(args.prompts), "--max-new-tokens", str(args.max_new_tokens)],
+            capture_output=True, text=True, check=True,
+        )
+        results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    reference = results["fp32"]["outputs"]
+    print(f"model={model_path} prompts={args.prompts} max_new_tokens={args.max_new_tokens}")
+    print(f"{'mode':<6} {'load(s)':>8} {'tok/s':>8} {'peak RSS(MB)':>13} {'exact':>7} {'token agree':>12}")
+    for mode in modes:
+        r = results[mode]
+        exact, token_agree = agreement(reference, r["outputs"])
+        print(f"{mode:<6} {r['load_seconds']:>8} {r['tokens_per_second']:>8} {r['peak_rss_mb']:>13} "
+              f"{exact:>7.2%} {token_agree:>12.2%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+"""기록된(또는 합성) 요청 믹스를 재생해 처리량과 p50/p95/p99 지연을 측정하는 부하 테스트
+
+    # 합성 XGBoost 모델 + 소형 LLM 으로 서버를 띄워 오프라인 측정
+    python -m benchmarks.load_test --concurrency 1,4,16 --requests 200
+
+    # 재현 가능한 요청 기록 생성 후 재생
+    python -m benchmarks.load_test --write-recording bench/mix.jsonl --requests 500
+    python -m benchmarks.load_test --recording bench/mix.jsonl --output bench/after.json \\
+        --compare bench/before.json --max-regression 0.2
+
+    # 이미 떠 있는 서버 대상
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --recording bench/mix.jsonl
+
+기록 파일은 한 줄에 하나씩 {"method": "POST", "path": "/api/ai/predict", "body": {...}} 형식입니다.
+(method 생략 시 POST) --compare 로 이전 결과와 비교해 p95 가 허용치 이상 나빠지면 종료 코드 1 로 끝납니다.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+from benchmarks.fixtures import (
+    build_synthetic_xgb,
+    build_tiny_llm,
+    sample_loan_request,
+    sample_predict_record,
+    sample_recommend_request,
+)
+
+ROUTES = {
+    "predict": "/api/ai/predict",
+    "simulation": "/api/ai/simulation",
+    "recommend": "/api/ai/recommend",
+    "insight": "/api/ai/insight/loan",
+}
+DEFAULT_MIX = "predict=70,simulation=20,recommend=5,insight=5"
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ---------------------------------------------------------------------------
+# 요청 믹스
+# ---------------------------------------------------------------------------
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ROUTES:
+            raise ValueError(f"알 수 없는 라우트: {name} (가능: {', '.join(ROUTES)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def synthetic_body(route: str, i: int) -> Dict:
+    if route == "predict":
+        return sample_predict_record(i)
+    if route == "simulation":
+        return {
+            "model_input": sample_predict_record(i),
+            "changes": [
+                {"type": "expense", "name": "해외여행", "amount": 300_000 + (i % 5) * 100_000},
+                {"type": "income", "name": "상여금", "amount": (i % 3) * 200_000},
+            ],
+        }
+    if route == "recommend":
+        return sample_recommend_request(i)
+    return sample_loan_request(i)
+
+
+def synthetic_recording(count: int, mix: str, seed: int) -> List[Dict]:
+    """라우트 비율에 맞춘 결정적 요청 목록 (같은 seed 면 항상 같은 순서/본문)"""
+    weights = parse_mix(mix)
+    rng = random.Random(seed)
+    names = list(weights)
+    routes = rng.choices(names, weights=[weights[n] for n in names], k=count)
+    return [{"method": "POST", "path": ROUTES[route], "body": synthetic_body(route, i)} for i, route in enumerate(routes)]
+
+
+def load_recording(path: str) -> List[Dict]:
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if "path" not in entry:
+                raise ValueError(f"{path}:{lineno} 에 path 가 없습니다. 요청 기록 형식이 아닙니다.")
+            entry.setdefault("method", "POST")
+            entries.append(entry)
+    if not entries:
+        raise ValueError(f"{path} 에 요청이 없습니다.")
+    return entries
+
+
+# ---------------------------------------------------------------------------
+# 오프라인 서버
+# ---------------------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _log_tail(path: str, lines: int = 30) -> str:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return "".join(f.readlines()[-lines:])
+
+
+def start_offline_server(workdir: str, extra_env: Dict[str, str], cache: bool, timeout: float = 300):
+    """합성 모델/소형 LLM 을 만들어 uvicorn 하위 프로세스로 서버 실행"""
+    model_dir = os.path.join(workdir, "models")
+    xgb_path = os.path.join(model_dir, "xgb_synthetic.pkl")
+    encode_map_path = os.path.join(model_dir, "encoding_map.json")
+    llm_path = os.path.join(model_dir, "tiny-llm")
+    build_synthetic_xgb(xgb_path, encode_map_path)
+    build_tiny_llm(llm_path, hidden_size=64, num_layers=2)
+
+    env = dict(os.environ)
+    env.update({
+        "MODEL_DIR": model_dir,
+        "XGB_MODEL_PATH": xgb_path,
+        "XGB_ENCODE_MAP_PATH": encode_map_path,
+        "XGB_MODEL_VERSION": "xgb_synthetic",
+        "LLM_MODEL_PATH": llm_path,
+        "LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.sqlite3"),
+        "READY_REQUIRES_LLM": "true",
+        "HF_HUB_OFFLINE": "1",
+        "TRANSFORMERS_OFFLINE": "1",
+        "PYTHONPATH": REPO_ROOT + os.pathsep + env.get("PYTHONPATH", ""),
+    })
+    if not cache:
+        # 반복 요청이 캐시에 맞아 실제 추론 비용이 가려지지 않도록 함
+        env.update({"PREDICT_CACHE_SIZE": "0", "LLM_CACHE_ENABLED": "false"})
+    env.update(extra_env)
+
+    port = _free_port()
+    log = open(os.path.join(workdir, "server.log"), "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    url = f"http://127.0.0.1:{port}"
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"서버가 종료되었습니다.\n{_log_tail(log.name)}")
+        try:
+            status, _ = _request(http.client.HTTPConnection("127.0.0.1", port, timeout=5), "GET", "/health/ready")
+            if status == 200:
+                return process, url
+        except OSError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"서버가 {timeout}s 안에 준비되지 않았습니다.\n{_log_tail(log.name)}")
+
+
+# ---------------------------------------------------------------------------
+# 부하 생성
+# ---------------------------------------------------------------------------
+
+def _request(conn: http.client.HTTPConnection, method: str, path: str, body: Optional[Dict] = None):
+    payload = json.dumps(body).encode("utf-8") if body is not None else None
+    headers = {"Content-Type": "application/json"} if payload is not None else {}
+    conn.request(method, path, body=payload, headers=headers)
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def run_level(url: str, entries: List[Dict], concurrency: int, total: int, timeout: float) -> Dict:
+    """concurrency 개의 keep-alive 연결로 entries 를 순서대로 total 건 재생"""
+    parsed = urlparse(url)
+    lock = threading.Lock()
+    next_index = [0]
+    samples = []  # (path, status, 지연 초)
+
+    def worker():
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=timeout)
+        local = []
+        while True:
+            with lock:
+                i = next_index[0]
+                if i >= total:
+                    break
+                next_index[0] += 1
+            entry = entries[i % len(entries)]
+            start = time.perf_counter()
+            try:
+                status, _ = _request(conn, entry["method"], entry["path"], entry.get("body"))
+            except (OSError, http.client.HTTPException):
+                status = 0
+                conn.close()
+                conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=timeout)
+            local.append((entry["path"], status, time.perf_counter() - start))
+        conn.close()
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    by_path = defaultdict(list)
+    for path, status, latency in samples:
+        by_path[path].append((status, latency))
+    by_path["ALL"] = [(status, latency) for _, status, latency in samples]
+
+    routes = {}
+    for path, rows in sorted(by_path.items()):
+        latencies = np.array([latency for _, latency in rows]) * 1000
+        errors = sum(1 for status, _ in rows if status != 200)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        routes[path] = {
+            "requests": len(rows),
+            "errors": errors,
+            "throughput_rps": round(len(rows) / elapsed, 2),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+        }
+    return {"concurrency": concurrency, "elapsed_seconds": round(elapsed, 3), "routes": routes}
+
+
+def print_level(result: Dict):
+    print(f"\n[concurrency={result['concurrency']}] {result['elapsed_seconds']}s")
+    print(f"{'route':<28} {'reqs':>6} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for path, r in result["routes"].items():
+        print(f"{path:<28} {r['requests']:>6} {r['errors']:>5} {r['throughput_rps']:>9.2f} "
+              f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+
+def compare(results: List[Dict], baseline: List[Dict], max_regression: float) -> List[str]:
+    """같은 concurrency / 라우트끼리 p95 비교 후 허용치를 넘는 악화 목록 반환"""
+    base = {(b["concurrency"], path): r for b in baseline for path, r in b["routes"].items()}
+    regressions = []
+    for level in results:
+        for path, r in level["routes"].items():
+            before = base.get((level["concurrency"], path))
+            if before is None or not before["p95_ms"]:
+                continue
+            change = r["p95_ms"] / before["p95_ms"] - 1
+            if change > max_regression:
+                regressions.append(
+                    f"concurrency={level['concurrency']} {path}: p95 {before['p95_ms']}ms → {r['p95_ms']}ms (+{change:.0%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recording", help="재생할 요청 기록 JSONL (생략 시 합성 믹스)")
+    parser.add_argument("--write-recording", help="합성 믹스를 이 경로에 JSONL 로 저장하고 종료")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"합성 믹스 비율 (기본: {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="대상 서버 (생략 시 오프라인 서버를 직접 실행)")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--requests", type=int, default=200, help="concurrency 단계별 요청 수")
+    parser.add_argument("--warmup", type=int, default=10, help="측정 전 버리는 요청 수")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--cache", action="store_true", help="오프라인 서버의 예측/LLM 캐시를 켜둠")
+    parser.add_argument("--env", action="append", default=[], help="오프라인 서버 환경 변수 (KEY=VALUE, 반복 가능)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="허용하는 p95 악화 비율 (기본 0.2)")
+    args = parser.parse_args()
+
+    if args.write_recording:
+        entries = synthetic_recording(args.requests, args.mix, args.seed)
+        os.makedirs(os.path.dirname(args.write_recording) or ".", exist_ok=True)
+        with open(args.write_recording, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        print(f"{len(entries)}건 저장: {args.write_recording}")
+        return 0
+
+    entries = load_recording(args.recording) if args.recording else synthetic_recording(args.requests, args.mix, args.seed)
+
+    workdir = tempfile.TemporaryDirectory(prefix="ai-load-test-")
+    process = None
+    url = args.url
+    try:
+        if url is None:
+            extra_env = dict(item.split("=", 1) for item in args.env)
+            process, url = start_offline_server(workdir.name, extra_env, args.cache)
+            print(f"오프라인 서버 실행: {url}")
+
+        if args.warmup:
+            run_level(url, entries, 1, min(args.warmup, len(entries)), args.timeout)
+
+        results = []
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            result = run_level(url, entries, concurrency, args.requests, args.timeout)
+            print_level(result)
+            results.append(result)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        workdir.cleanup()
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"requests": args.requests, "results": results}, f, ensure_ascii=False, indent=2)
+
+    failed = any(r["routes"]["ALL"]["errors"] for r in results)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["results"], args.max_regression)
+        for line in regressions:
+            print(f"[regression] {line}")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""기존 pandas 전처리와 컴파일된 FeaturePlan 의 모델 입력 일치 여부 및 속도 비교
+
+    python -m benchmarks.preprocess_parity --samples 2000
+
+app/models 의 모델/인코딩 맵을 사용하며, 두 경로의 float32 행렬이
+비트 단위로 동일하지 않으면 종료 코드 1 로 끝납니다.
+"""
+import argparse
+import random
+import sys
+import time
+import warnings
+from decimal import Decimal
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.schemas.predict_schema import PredictRequest
+from app.services.model_loader import get_model, get_feature_plan
+
+
+def legacy_preprocess(features, encoding_maps):
+    """기존 model_service.preprocess_input (pandas 버전) 그대로"""
+    df = pd.DataFrame([features])
+
+    drop_cols = ["customer_id", "is_delinquent"]
+    df.drop(columns=[c for c in drop_cols if c in df.columns], inplace=True, errors="ignore")
+
+    for col, mapping in encoding_maps.items():
+        if col in df.columns:
+            rev_map = {v: k for k, v in mapping.items()}
+            df[col] = df[col].map(rev_map).fillna(-1).astype(int)
+
+    for col in df.columns:
+        if df[col].dtype == "object":
+            if col.lower() == "repayment_date":
+                df.drop(columns=[col], inplace=True)
+            else:
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    df.replace([np.inf, -np.inf], np.nan, inplace=True)
+    df.fillna(0, inplace=True)
+    return df.astype(np.float32)
+
+
+def random_record(rng: random.Random, encoding_maps):
+    """스키마를 통과한 model_dump() 형태의 임의 입력 (경계값 포함)"""
+    record = {}
+    for name, field in PredictRequest.model_fields.items():
+        annotation = field.annotation
+        if name in encoding_maps:
+            labels = list(encoding_maps[name].values())
+            record[name] = rng.choice(labels + ["UNKNOWN"])
+        elif name == "BAS_YH":
+            record[name] = f"{rng.randint(2019, 2025)}Q{rng.randint(1, 4)}"
+        elif name == "repayment_date":
+            record[name] = rng.choice([None, "2025-01-10"])
+        elif annotation in (int, Optional[int]):
+            record[name] = rng.randint(-5, 10_000_000)
+        else:
+            record[name] = rng.choice([
+                Decimal("0.0"),
+                Decimal(str(round(rng.uniform(-1e6, 1e9), rng.randint(0, 6)))),
+                Decimal(str(rng.uniform(-1, 1))),
+                Decimal("Infinity"),
+                Decimal("1E+40"),
+            ])
+    record["customer_id"] = "C000001"
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # 1E+40 같은 float32 범위 밖 값은 두 경로 모두 overflow 경고를 냄
+    warnings.simplefilter("ignore")
+
+    _, encoding_maps = get_model()
+    plan = get_feature_plan()
+    rng = random.Random(args.seed)
+    records = [random_record(rng, encoding_maps) for _ in range(args.samples)]
+
+    mismatches = 0
+    for record in records:
+        legacy = legacy_preprocess(record, encoding_maps)
+        if list(legacy.columns) != plan.feature_names:
+            print(f"컬럼 순서 불일치: {list(legacy.columns)} != {plan.feature_names}")
+            return 1
+        if legacy.to_numpy().tobytes() != plan.transform(record).tobytes():
+            mismatches += 1
+
+    start = time.perf_counter()
+    for record in records:
+        legacy_preprocess(record, encoding_maps)
+    legacy_us = (time.perf_counter() - start) / len(records) * 1e6
+
+    start = time.perf_counter()
+    for record in records:
+        plan.transform(record)
+    plan_us = (time.perf_counter() - start) / len(records) * 1e6
+
+    print(f"samples={len(records)} mismatches={mismatches}")
+    print(f"pandas preprocess : {legacy_us:8.1f} us/row")
+    print(f"feature plan      : {plan_us:8.1f} us/row  (x{legacy_us / plan_us:.1f})")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""inplace_predict 스코어링 엔진과 기존 DMatrix 경로의 결과 일치 여부 및 지연 비교
+
+    python -m benchmarks.scoring_engine --rounds 100 --depth 6
+    python -m benchmarks.scoring_engine --model app/models/xgb_delinquency_model_v2.pkl \
+        --encode-map app/models/category_encoding_map_v2.json
+
+기본은 임시 디렉터리에 합성 모델을 만들어 사용합니다.
+두 백엔드(및 설명 모드)의 확률 차이가 1e-6 을 넘으면 종료 코드 1 로 끝납니다.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from app.services.feature_plan import compile_feature_plan
+from app.services.scoring_engine import ScoringEngine
+from app.schemas.predict_schema import PredictRequest
+from benchmarks.fixtures import build_synthetic_xgb, sample_predict_record
+
+TOLERANCE = 1e-6
+
+
+def time_per_call(fn, matrix: np.ndarray, repeat: int) -> float:
+    """호출당 평균 지연 (us)"""
+    fn(matrix)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(matrix)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="joblib 으로 저장된 booster (생략 시 합성 모델)")
+    parser.add_argument("--encode-map", help="인코딩 맵 JSON (--model 과 함께 사용)")
+    parser.add_argument("--rounds", type=int, default=100, help="합성 모델 트리 수")
+    parser.add_argument("--depth", type=int, default=6, help="합성 모델 트리 깊이")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--batch-sizes", default="1,8,64,500")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--nthread", type=int, default=1)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    if args.model:
+        model_path, encode_map_path = args.model, args.encode_map
+    else:
+        model_path = os.path.join(tmp.name, "xgb_synthetic.pkl")
+        encode_map_path = os.path.join(tmp.name, "encoding_map.json")
+        build_synthetic_xgb(model_path, encode_map_path, num_rounds=args.rounds, max_depth=args.depth)
+
+    booster = joblib.load(model_path)
+    with open(encode_map_path, "r", encoding="utf-8") as f:
+        encoding_maps = json.load(f)
+    plan = compile_feature_plan(booster, encoding_maps, default_columns=list(PredictRequest.model_fields))
+    inplace = ScoringEngine(booster, plan, backend="inplace", nthread=args.nthread)
+    dmatrix = ScoringEngine(booster, plan, backend="dmatrix", nthread=args.nthread)
+
+    matrix = plan.transform_batch([sample_predict_record(i) for i in range(args.samples)])
+    max_diff = float(np.max(np.abs(inplace.predict(matrix).astype(np.float64) - dmatrix.predict(matrix))))
+    # 행 단위 호출과 배치 호출 결과도 같아야 함
+    row_diff = max(
+        float(np.max(np.abs(inplace.predict(matrix[i:i + 1]) - dmatrix.predict(matrix[i:i + 1]))))
+        for i in range(min(len(matrix), 200))
+    )
+    print(f"samples={len(matrix)} max_abs_diff(batch)={max_diff:.2e} max_abs_diff(row)={row_diff:.2e}")
+
+    print(f"{'rows':>6} {'dmatrix us':>12} {'inplace us':>12} {'speedup':>8}")
+    for size in (int(s) for s in args.batch_sizes.split(",")):
+        batch = matrix[:size]
+        repeat = max(args.repeat // size, 20)
+        d_us = time_per_call(dmatrix.predict, batch, repeat)
+        i_us = time_per_call(inplace.predict, batch, repeat)
+        print(f"{size:>6} {d_us:>12.1f} {i_us:>12.1f} {d_us / i_us:>7.1f}x")
+
+    # 설명 모드: 확률은 기본 경로와 같아야 하고, 배치 한 번 계산이 행별 반복보다 빨라야 함
+    probs, contribs = dmatrix.predict_with_contribs(matrix)
+    explain_diff = float(np.max(np.abs(probs.astype(np.float64) - inplace.predict(matrix))))
+    print(f"\nexplain: max_abs_diff(prob)={explain_diff:.2e} contribs shape={contribs.shape}")
+    for size in (int(s) for s in args.batch_sizes.split(",")):
+        batch = matrix[:size]
+        repeat = max(args.repeat // (size * 10), 5)
+        batch_us = time_per_call(dmatrix.predict_with_contribs, batch, repeat)
+        rows_us = time_per_call(lambda b: [dmatrix.predict_with_contribs(b[i:i + 1]) for i in range(len(b))], batch, repeat)
+        print(f"{size:>6} rows: batch {batch_us:>10.1f} us  per-row loop {rows_us:>10.1f} us  ({rows_us / batch_us:.1f}x)")
+
+    tmp.cleanup()
+    return 1 if max(max_diff, row_diff, explain_diff) > TOLERANCE else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())